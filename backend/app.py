@@ -1,10 +1,42 @@
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from kg_chatbot import KnowledgeGraphChatbot
 import os
+import gzip
+import hashlib
+import threading
+
+# Optional: faster JSON encoding and brotli response compression
+try:
+    import orjson
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    _ORJSON_AVAILABLE = False
+try:
+    import brotli
+    _BROTLI_AVAILABLE = True
+except ImportError:
+    _BROTLI_AVAILABLE = False
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson. Keys are sorted like Flask's default provider so ETags stay
+    stable; objects orjson cannot encode fall back to the default encoder.
+    """
+    def dumps(self, obj, **kwargs):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 # Initialize Flask
 app = Flask(__name__)
+if _ORJSON_AVAILABLE:
+    app.json = OrjsonProvider(app)
 
 # Enhanced CORS Configuration
 CORS(app, resources={
@@ -13,7 +45,7 @@ CORS(app, resources={
         "methods": ["GET", "POST", "OPTIONS"],
         "allow_headers": ["Content-Type"],
         "supports_credentials": True,
-        "expose_headers": ["Content-Type"]
+        "expose_headers": ["Content-Type", "Content-Encoding", "ETag"]
     }
 })
 
@@ -26,8 +58,82 @@ def after_request(response):
     response.headers.add('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
     return response
 
+# Response compression, negotiated from the client's Accept-Encoding header
+COMPRESSION_MIN_BYTES = 500 # Smaller bodies are sent uncompressed
+GZIP_COMPRESSION_LEVEL = 6
+BROTLI_QUALITY = 5
+
+def _choose_encoding(accept_encoding):
+    """
+    Picks 'br' or 'gzip' from an Accept-Encoding header, or None. A coding refused with q=0
+    is never chosen, not even through the '*' wildcard.
+    """
+    accepted = set()
+    refused = set()
+    for item in accept_encoding.lower().split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip()
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) == 0:
+                    refused.add(coding)
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding)
+
+    def is_acceptable(coding):
+        return coding in accepted or ('*' in accepted and coding not in refused)
+
+    if _BROTLI_AVAILABLE and is_acceptable('br'):
+        return 'br'
+    if is_acceptable('gzip'):
+        return 'gzip'
+    return None
+
+@app.after_request
+def compress_response(response):
+    # Set on every response, including 304s and small bodies, so caches keep one entry per encoding
+    response.vary.add('Accept-Encoding')
+    if response.direct_passthrough or response.status_code != 200 or 'Content-Encoding' in response.headers:
+        return response
+    encoding = _choose_encoding(request.headers.get('Accept-Encoding', ''))
+    data = response.get_data()
+    if not encoding or len(data) < COMPRESSION_MIN_BYTES:
+        return response
+    if encoding == 'br':
+        response.set_data(brotli.compress(data, quality=BROTLI_QUALITY))
+    else:
+        response.set_data(gzip.compress(data, compresslevel=GZIP_COMPRESSION_LEVEL))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+def conditional_json(etag_key, build_payload):
+    """
+    jsonify(build_payload()) for read-only endpoints whose payload only depends on the KG and etag_key
+    (e.g. the route argument). The weak ETag (valid across content encodings) is derived from the KG
+    version and etag_key, so an If-None-Match revalidation is answered with 304 Not Modified before
+    the payload is built.
+    """
+    etag = hashlib.md5(f"{chatbot.kg_version}|{etag_key}".encode('utf-8')).hexdigest()
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        response = jsonify(build_payload())
+    response.set_etag(etag, weak=True)
+    return response
+
 # Configuration
 KG_FILE = r"C:\backup folder\backend\data\all_extracted_kg.json"
+WARMUP_ON_STARTUP = True # Run WARMUP_QUERIES before /api/ready reports the worker as ready
+WARMUP_QUERIES = [
+    "What is INSAT-3D?",
+    "Which satellite provides Sea Surface Temperature?",
+    "Tell me about Rainfall Estimate products",
+    "What formats is INSAT-3D data distributed in?",
+    "What does MOSDAC provide?"
+]
 
 # Initialize chatbot at startup
 try:
@@ -37,6 +143,13 @@ except Exception as e:
     print(f"FATAL: Failed to initialize chatbot - {str(e)}")
     exit(1)
 
+# Warm up in the background so /api/health answers immediately while /api/ready returns 503
+threading.Thread(
+    target=chatbot.warmup,
+    args=(WARMUP_QUERIES if WARMUP_ON_STARTUP else [],),
+    daemon=True
+).start()
+
 @app.route('/api/chat', methods=['POST', 'OPTIONS'])
 def handle_chat():
     if request.method == 'OPTIONS':
@@ -69,13 +182,29 @@ def health_check():
         'version': '1.0'
     })
 
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    status = chatbot.get_status()
+    return jsonify(status), (200 if status['ready'] else 503)
+
+@app.route('/api/kg/stats', methods=['GET'])
+def kg_stats():
+    return conditional_json('kg_stats', chatbot.get_kg_stats)
+
+@app.route('/api/entity/<path:name>', methods=['GET'])
+def entity_summary(name):
+    return conditional_json(f"entity|{name}", lambda: chatbot.get_entity_summary(name))
+
 @app.route('/')
 def index():
     return jsonify({
         'service': 'MOSDAC Knowledge Graph API',
         'endpoints': {
             '/api/chat': 'POST {query: "your_question"}',
-            '/api/health': 'GET health check'
+            '/api/health': 'GET health check',
+            '/api/ready': 'GET readiness (KG version, counts, build timings, warmup state)',
+            '/api/kg/stats': 'GET knowledge graph statistics (ETag cached)',
+            '/api/entity/<name>': 'GET triples about an entity grouped by predicate (ETag cached)'
         }
     })
 
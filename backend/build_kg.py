@@ -0,0 +1,407 @@
+# build_kg.py
+#
+# Builds the knowledge graph file consumed by KnowledgeGraphChatbot from the layer-2 processed JSON outputs.
+# Extraction runs on a process pool: spaCy is loaded once per worker and documents are dispatched
+# in size-balanced chunks, whose texts are parsed together with nlp.pipe. Results are cached per
+# document content hash, so a rebuild only re-extracts documents (or rules) that changed.
+# The KG is written either as one JSON file or as a sharded JSON Lines directory (kg_store.py)
+# that is appended to as documents finish. A final consolidation pass (kg_consolidate.py) merges
+# surface forms of the same entity or page and writes an alias table next to the KG.
+#
+# Usage: python build_kg.py [--input DIR ...] [--output PATH] [--format json|shards] [--workers N]
+#                           [--cache FILE | --no-cache] [--no-consolidate]
+
+import os
+import sys
+import json
+import time
+import heapq
+import shutil
+import hashlib
+import logging
+import argparse
+import multiprocessing
+
+from extraction_cache import ExtractionCache
+from kg_store import KGShardWriter, ALIASES_FILE, iter_kg_records, get_aliases_path
+from kg_consolidate import build_consolidation_map, consolidate_triples
+
+# --- Configuration ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INPUT_DIRS = [os.path.join(BASE_DIR, "data", "layer2", "processed")] # Layer-2 output roots (scanned recursively)
+OUTPUT_FILE = os.path.join(BASE_DIR, "data", "all_extracted_kg.json")
+SHARDED_OUTPUT_DIR = os.path.join(BASE_DIR, "data", "kg") # Default output for --format shards
+OUTPUT_FORMAT = "json" # "json" (single file, built in memory) or "shards" (streamed to kg_store shards)
+CHUNKS_PER_WORKER = 4 # More chunks than workers keeps every worker busy when chunk costs differ
+EXTRACT_BODY_TRIPLES = True # Also run content extraction over each document's cleaned_text
+USE_SPACY_DOCBIN = True # Reuse the body parse layer 2 saved as <doc_id>.spacy (SAVE_SPACY_DOCBIN) when it matches cleaned_text
+CACHE_FILE = os.path.join(BASE_DIR, "data", "kg_extraction_cache.db") # Per-document extraction cache (None disables it)
+CONSOLIDATE_ENTITIES = True # Merge surface forms of the same entity/page into one node and write an alias table
+
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s',
+                    handlers=[logging.StreamHandler()])
+
+# kg_extractor loads spaCy at import time, so it is only imported inside worker processes
+_extractor = None
+
+def _init_worker():
+    global _extractor
+    import kg_extractor
+    _extractor = kg_extractor
+
+
+def _get_extraction_fingerprint():
+    """
+    Cache fingerprint of this build's extraction settings (runs where kg_extractor is loaded).
+    """
+    return hashlib.md5(f"{_extractor.get_rules_fingerprint()}|body={EXTRACT_BODY_TRIPLES}".encode("utf-8")).hexdigest()
+
+
+def _get_canonical_entities():
+    return _extractor.CANONICAL_ENTITIES
+
+
+def file_content_hash(file_path):
+    with open(file_path, 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+def iter_document_files(input_dirs):
+    """
+    Streams (path, size_in_bytes) for every layer-2 JSON document under the input directories.
+    """
+    for input_dir in input_dirs:
+        if not os.path.isdir(input_dir):
+            logging.warning(f"Input directory not found: {input_dir}. Skipping.")
+            continue
+        for dirpath, _, filenames in os.walk(input_dir):
+            for filename in sorted(filenames):
+                if filename.endswith(".json"):
+                    file_path = os.path.join(dirpath, filename)
+                    yield file_path, os.path.getsize(file_path)
+
+
+def make_size_balanced_chunks(files, num_chunks):
+    """
+    Splits (path, size) pairs into num_chunks lists of roughly equal total size
+    (largest file first onto the currently lightest chunk).
+    """
+    chunks = [[] for _ in range(max(1, num_chunks))]
+    heap = [(0, i) for i in range(len(chunks))]
+    for file_path, size in sorted(files, key=lambda item: item[1], reverse=True):
+        total_size, i = heapq.heappop(heap)
+        chunks[i].append(file_path)
+        heapq.heappush(heap, (total_size + size, i))
+    return [chunk for chunk in chunks if chunk]
+
+
+def load_document_node(file_path):
+    """
+    Loads a layer-2 JSON document as a DOCUMENT NODE. KG nodes are keyed by the page's original URL;
+    documents without one keep their layer-2 UUID.
+    Returns (doc_data, content_hash), the hash being taken over the exact bytes that were parsed.
+    """
+    with open(file_path, 'rb') as f:
+        raw = f.read()
+    doc_data = json.loads(raw.decode('utf-8'))
+    doc_data["doc_id"] = doc_data.get("original_url") or doc_data.get("doc_id")
+    return doc_data, hashlib.md5(raw).hexdigest()
+
+
+def get_document_nlp_texts(doc_data):
+    """
+    Returns every text extracted for one document node: the metadata-table texts used by
+    process_document_node plus the document body.
+    """
+    texts = _extractor.collect_nlp_texts(doc_data)
+    body = doc_data.get("cleaned_text")
+    if EXTRACT_BODY_TRIPLES and body and body not in texts:
+        texts.append(body)
+    return texts
+
+
+def build_document_triples(doc_data, parsed_texts=None):
+    """
+    Extracts all triples for one document node: the structured triples from process_document_node
+    plus content triples from the document body. parsed_texts optionally holds pre-computed
+    {text: (triples, entities)} results for get_document_nlp_texts(doc_data).
+    """
+    if parsed_texts is None:
+        texts = get_document_nlp_texts(doc_data)
+        parsed_texts = dict(zip(texts, _extractor.extract_content_triples_batch((text, doc_data.get("entities")) for text in texts)))
+    triples = set(_extractor.process_document_node(doc_data, parsed_texts))
+    if EXTRACT_BODY_TRIPLES and doc_data.get("cleaned_text"):
+        content_triples, _ = parsed_texts[doc_data["cleaned_text"]]
+        triples.update(content_triples)
+    return triples
+
+
+def load_body_doc(file_path, body):
+    """
+    Returns the layer-2 spaCy Doc saved next to file_path if it was parsed from exactly body, else None.
+    """
+    docbin_path = os.path.splitext(file_path)[0] + ".spacy"
+    if not os.path.exists(docbin_path):
+        return None
+    try:
+        docs = _extractor.load_spacy_docs(docbin_path)
+    except Exception as e:
+        logging.warning(f"Could not load {docbin_path}: {e}. Parsing the text instead.")
+        return None
+    if len(docs) == 1 and docs[0].text == body:
+        return docs[0]
+    return None
+
+
+def _process_chunk(file_paths):
+    """
+    Worker entry point: returns [(content_hash, doc_id, triples), ...] for a chunk of layer-2 files.
+    Every text of the chunk is parsed in one nlp.pipe stream before the rules run per document.
+    """
+    documents = []
+    for file_path in file_paths:
+        try:
+            doc_data, content_hash = load_document_node(file_path)
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            logging.error(f"Could not load {file_path}: {e}")
+            continue
+        if not doc_data.get("doc_id"):
+            logging.warning(f"Skipping {file_path}: no original_url or doc_id.")
+            continue
+        documents.append((file_path, content_hash, doc_data, get_document_nlp_texts(doc_data)))
+
+    # Existing entities differ per document, so results are keyed by (document, text).
+    # Bodies with a matching layer-2 DocBin are passed as Docs and skip the model.
+    items = []
+    for file_path, _, doc_data, texts in documents:
+        body = doc_data.get("cleaned_text") if EXTRACT_BODY_TRIPLES else None
+        body_doc = load_body_doc(file_path, body) if USE_SPACY_DOCBIN and body else None
+        for text in texts:
+            items.append((body_doc if body_doc is not None and text == body else text, doc_data.get("entities")))
+    batch_results = iter(_extractor.extract_content_triples_batch(items))
+
+    results = []
+    for file_path, content_hash, doc_data, texts in documents:
+        parsed_texts = {text: next(batch_results) for text in texts}
+        try:
+            results.append((content_hash, doc_data["doc_id"], build_document_triples(doc_data, parsed_texts)))
+        except Exception as e:
+            logging.error(f"Extraction failed for {file_path}: {e}", exc_info=True)
+    return results
+
+
+def write_kg(kg, output_file):
+    """
+    Writes the merged KG as {doc_id: [[s, p, o], ...]} via a temporary file, so a failed build
+    never leaves a truncated KG behind.
+    """
+    output_dir = os.path.dirname(output_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    serializable_kg = {doc_id: [list(triple) for triple in sorted(kg[doc_id])] for doc_id in sorted(kg)}
+    temp_file = output_file + ".tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(serializable_kg, f, ensure_ascii=False)
+    os.replace(temp_file, output_file)
+
+
+def write_aliases(aliases, output_file):
+    """
+    Writes the consolidation alias table next to a JSON KG, via a temporary file.
+    """
+    aliases_path = get_aliases_path(output_file)
+    temp_file = aliases_path + ".tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(aliases, f, ensure_ascii=False)
+    os.replace(temp_file, aliases_path)
+
+
+def consolidate_kg(kg, canonical_entities):
+    """
+    Rewrites an in-memory KG ({doc_id: set of triples}) to consolidated node ids.
+    Returns (consolidated_kg, aliases, stats).
+    """
+    node_map, aliases, stats = build_consolidation_map(kg.items(), canonical_entities)
+    consolidated = {}
+    for doc_id, triples in kg.items():
+        new_doc_id, new_triples = consolidate_triples(doc_id, triples, node_map)
+        consolidated.setdefault(new_doc_id, set()).update(new_triples)
+    return consolidated, aliases, stats
+
+
+def consolidate_shards(raw_dir, output_dir, canonical_entities):
+    """
+    Streams a raw shard directory twice (once to cluster surface forms, once to rewrite records)
+    into a consolidated shard directory holding the alias table. Returns (manifest, stats).
+    """
+    node_map, aliases, stats = build_consolidation_map(iter_kg_records(raw_dir), canonical_entities)
+    writer = KGShardWriter(output_dir)
+    try:
+        for doc_id, triples in iter_kg_records(raw_dir):
+            writer.write(*consolidate_triples(doc_id, triples, node_map))
+    except BaseException:
+        writer.abort()
+        raise
+    manifest = writer.close(extra_files={ALIASES_FILE: aliases})
+    shutil.rmtree(raw_dir)
+    return manifest, stats
+
+
+def build_kg(input_dirs, output_file, workers, cache_file=CACHE_FILE, output_format=OUTPUT_FORMAT, consolidate=CONSOLIDATE_ENTITIES):
+    """
+    Runs extraction over every layer-2 document and merges per-document triples into output_file.
+    Documents whose content hash is in the extraction cache (under the current rules fingerprint)
+    reuse their stored triples; only the others are sent to the workers.
+    With output_format "shards", each document is appended to a kg_store shard directory as soon
+    as it finishes instead of being held in memory until the end (into a ".raw" directory first
+    when the consolidation pass rewrites it afterwards).
+    Returns a dict of build statistics.
+    """
+    started_at = time.perf_counter()
+    files = list(iter_document_files(input_dirs))
+
+    kg = {}
+    documents_processed = 0
+    raw_shard_dir = output_file.rstrip("/\\") + ".raw" if consolidate else output_file
+    writer = KGShardWriter(raw_shard_dir) if output_format == "shards" else None
+    canonical_entities = None
+
+    seen_cache_keys = set() # (content_hash, doc_id) of every document in this build, kept by the final cache prune
+
+    def merge(chunk_results, from_cache=False):
+        nonlocal documents_processed
+        new_cache_entries = []
+        for content_hash, doc_id, triples in chunk_results:
+            seen_cache_keys.add((content_hash, doc_id))
+            triples = {tuple(str(part) for part in triple) for triple in triples}
+            if writer is not None:
+                # Repeated doc_ids become separate records, merged by the reader
+                writer.write(doc_id, sorted(triples))
+            else:
+                # The same URL can appear in several layer-2 files (e.g. one per crawl); merge their triples
+                kg.setdefault(doc_id, set()).update(triples)
+            documents_processed += 1
+            if cache is not None and not from_cache:
+                new_cache_entries.append((content_hash, doc_id, triples))
+        if new_cache_entries:
+            cache.store_many(fingerprint, new_cache_entries)
+
+    cache = ExtractionCache(cache_file) if cache_file else None
+    pool = None
+    try:
+        if workers == 1:
+            _init_worker()
+            fingerprint = _get_extraction_fingerprint()
+            canonical_entities = _get_canonical_entities() if consolidate else None
+        else:
+            pool = multiprocessing.Pool(workers, initializer=_init_worker)
+            fingerprint = pool.apply(_get_extraction_fingerprint)
+            canonical_entities = pool.apply(_get_canonical_entities) if consolidate else None
+
+        # Split documents into cache hits and files that need extraction
+        pending_files = files
+        cached_documents = 0
+        if cache is not None:
+            cached = cache.load(fingerprint)
+            pending_files = []
+            for file_path, size in files:
+                try:
+                    content_hash = file_content_hash(file_path)
+                except OSError as e:
+                    logging.error(f"Could not read {file_path}: {e}")
+                    continue
+                entry = cached.get(content_hash)
+                if entry:
+                    doc_id, triples_json = entry
+                    merge([(content_hash, doc_id, json.loads(triples_json))], from_cache=True)
+                    cached_documents += 1
+                else:
+                    pending_files.append((file_path, size))
+            del cached
+
+        chunks = make_size_balanced_chunks(pending_files, workers * CHUNKS_PER_WORKER)
+        logging.info(f"Building KG from {len(files)} documents ({cached_documents} cached, {len(pending_files)} to extract) "
+                     f"in {len(chunks)} chunks with {workers} worker(s).")
+
+        if pool is None:
+            for chunk in chunks:
+                merge(_process_chunk(chunk))
+        else:
+            for chunk_results in pool.imap_unordered(_process_chunk, chunks):
+                merge(chunk_results)
+    except BaseException:
+        if writer is not None:
+            writer.abort()
+        raise
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+    consolidation_stats = None
+    if writer is not None:
+        manifest = writer.close()
+        if consolidate:
+            raw_triples = manifest["triples"]
+            manifest, consolidation_stats = consolidate_shards(raw_shard_dir, output_file, canonical_entities)
+            consolidation_stats["triples_before"] = raw_triples
+        kg_nodes, triple_count = manifest["documents"], manifest["triples"]
+    else:
+        if consolidate:
+            raw_triples = sum(len(triples) for triples in kg.values())
+            kg, aliases, consolidation_stats = consolidate_kg(kg, canonical_entities)
+            consolidation_stats["triples_before"] = raw_triples
+        write_kg(kg, output_file)
+        if consolidate:
+            write_aliases(aliases, output_file)
+        elif os.path.exists(get_aliases_path(output_file)):
+            os.remove(get_aliases_path(output_file)) # A stale table would map queries to nodes this KG no longer has
+        kg_nodes, triple_count = len(kg), sum(len(triples) for triples in kg.values())
+
+    if consolidation_stats is not None:
+        logging.info(f"Merged {consolidation_stats['merged_forms']} surface form(s) into {consolidation_stats['merged_clusters']} nodes "
+                     f"({consolidation_stats['triples_before']} -> {triple_count} triples).")
+
+    if cache is not None:
+        pruned = cache.prune(fingerprint, seen_cache_keys)
+        if pruned:
+            logging.info(f"Pruned {pruned} stale cache entries (previous extraction rules, or documents no longer in the input).")
+        cache.close()
+
+    elapsed = time.perf_counter() - started_at
+    stats = {
+        "documents": documents_processed,
+        "cached_documents": cached_documents,
+        "extracted_documents": documents_processed - cached_documents,
+        "kg_nodes": kg_nodes,
+        "triples": triple_count,
+        "consolidation": consolidation_stats,
+        "workers": workers,
+        "seconds": elapsed,
+        "documents_per_second": documents_processed / elapsed if elapsed > 0 else 0.0
+    }
+    logging.info(f"Wrote {stats['triples']} triples for {stats['kg_nodes']} KG nodes to {output_file}.")
+    logging.info(f"Processed {stats['documents']} documents ({stats['cached_documents']} from cache) in {elapsed:.2f}s "
+                 f"({stats['documents_per_second']:.2f} documents/sec, {workers} worker(s)).")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the MOSDAC knowledge graph from layer-2 processed documents.")
+    parser.add_argument("--input", nargs="+", default=INPUT_DIRS, help="Layer-2 output directories to scan recursively.")
+    parser.add_argument("--output", default=None, help="Path of the KG JSON file (or shard directory) to write.")
+    parser.add_argument("--format", choices=["json", "shards"], default=OUTPUT_FORMAT, help="Single JSON file or sharded JSON Lines directory.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of extraction processes.")
+    parser.add_argument("--cache", default=CACHE_FILE, help="Path of the per-document extraction cache database.")
+    parser.add_argument("--no-cache", action="store_true", help="Re-extract every document and leave the cache untouched.")
+    parser.add_argument("--no-consolidate", action="store_true", help="Skip the entity consolidation pass.")
+    args = parser.parse_args(argv)
+    output = args.output or (SHARDED_OUTPUT_DIR if args.format == "shards" else OUTPUT_FILE)
+    build_kg(args.input, output, max(1, args.workers), cache_file=None if args.no_cache else args.cache,
+             output_format=args.format, consolidate=CONSOLIDATE_ENTITIES and not args.no_consolidate)
+
+
+if __name__ == "__main__":
+    # Required for multiprocessing on Windows, where worker processes re-import this module
+    multiprocessing.freeze_support()
+    main(sys.argv[1:])
@@ -0,0 +1,131 @@
+# cache_benchmark.py
+#
+# Throughput of CacheManager.update_metadata() from several threads, with one commit per update
+# (the default) and in write-behind mode (WAL + batched writer thread), on a fresh database.
+# Then the cache lookups of link admission: pages with thousands of outlinks checked against a
+# cache of --cached-urls rows, one get_metadata() per link vs one get_many() per page, with and
+# without preload().
+#
+# Usage: python cache_benchmark.py [--updates N] [--threads N] [--batch-size N]
+#                                  [--cached-urls N] [--pages N] [--outlinks N]
+
+import os
+import time
+import logging
+import argparse
+import sqlite3
+import tempfile
+import threading
+import tracemalloc
+from datetime import datetime
+
+from web_scraper.cache_manager import CacheManager
+
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s',
+                    handlers=[logging.StreamHandler()])
+
+DEFAULT_UPDATES = 20000
+DEFAULT_THREADS = 8
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_CACHED_URLS = 200000
+DEFAULT_PAGES = 20
+DEFAULT_OUTLINKS = 5000
+
+
+def benchmark_updates(cache_manager, updates, threads):
+    """
+    Runs updates update_metadata() calls spread over threads, each followed by a get_metadata()
+    of the same URL (as the crawler does). Returns (seconds until every update is committed,
+    number of updates that could not be read back).
+    """
+    misses = []
+    def run(offset):
+        for i in range(offset, updates, threads):
+            url = f"https://www.mosdac.gov.in/catalog/product-{i}"
+            cache_manager.update_metadata(url, datetime.now().isoformat(), f"{i:032x}", f'"{i}"', None, "text/html", 200, "en")
+            metadata = cache_manager.get_metadata(url)
+            if not metadata or metadata["md5_hash"] != f"{i:032x}":
+                misses.append(url)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=run, args=(offset,)) for offset in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    cache_manager.flush()
+    return time.perf_counter() - started, len(misses)
+
+
+def _catalogue_url(i):
+    return f"https://www.mosdac.gov.in/catalog/satellite.php?format=HDF5&page={i}&product=3RIMG_L2B_SST&satellite=INSAT-3D"
+
+
+def benchmark_admission_lookups(cached_urls, pages, outlinks):
+    """
+    Logs links/sec for the 404/410 lookups of link admission, per mode. Half of every page's
+    outlinks are in the cache (every tenth of those as a 404).
+    """
+    db_path = os.path.join(tempfile.mkdtemp(prefix="cache_"), "crawled_urls.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE crawled_urls (url TEXT PRIMARY KEY, last_crawled TEXT, md5_hash TEXT, etag TEXT, last_modified TEXT, content_type TEXT, http_status INTEGER, language TEXT)")
+    now = datetime.now().isoformat()
+    with conn:
+        conn.executemany("INSERT INTO crawled_urls VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                         ((_catalogue_url(i), now, f"{i:032x}", f'"{i}"', None, "text/html", 404 if i % 10 == 0 else 200, "en") for i in range(cached_urls)))
+    conn.close()
+    page_links = [[_catalogue_url((page * outlinks + i) * 2 % (cached_urls * 2)) for i in range(outlinks)] for page in range(pages)]
+    links = pages * outlinks
+
+    def get_metadata_per_link(cache_manager):
+        return sum(1 for page in page_links for url in page if cache_manager.get_metadata(url))
+
+    def get_many_per_page(cache_manager):
+        return sum(len(cache_manager.get_many(page)) for page in page_links)
+
+    for label, preload, lookup in (("get_metadata per link", False, get_metadata_per_link),
+                                   ("get_many per page", False, get_many_per_page),
+                                   ("preload + get_many", True, get_many_per_page)):
+        cache_manager = CacheManager(db_path)
+        started = time.perf_counter()
+        if preload:
+            tracemalloc.start()
+            cache_manager.preload()
+            index_bytes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            preload_seconds = time.perf_counter() - started
+            started = time.perf_counter()
+        found = lookup(cache_manager)
+        seconds = time.perf_counter() - started
+        cache_manager.close()
+        logging.info(f"{label:<24} {links} links ({found} cached) in {seconds:6.2f}s  {links / seconds:10,.0f} links/sec")
+    logging.info(f"preload() of {cached_urls} rows: {preload_seconds:.2f}s, index {index_bytes / cached_urls:.0f} bytes per row")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CacheManager update throughput.")
+    parser.add_argument("--updates", type=int, default=DEFAULT_UPDATES, help="update_metadata() calls per mode.")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="Threads issuing the updates.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per transaction in write-behind mode.")
+    parser.add_argument("--cached-urls", type=int, default=DEFAULT_CACHED_URLS, help="Rows in the cache for the admission lookups.")
+    parser.add_argument("--pages", type=int, default=DEFAULT_PAGES, help="Pages whose outlinks are admitted.")
+    parser.add_argument("--outlinks", type=int, default=DEFAULT_OUTLINKS, help="Outlinks per page.")
+    args = parser.parse_args()
+
+    for label, write_behind in (("commit per update", False), ("write-behind", True)):
+        db_path = os.path.join(tempfile.mkdtemp(prefix="cache_"), "crawled_urls.db")
+        cache_manager = CacheManager(db_path, write_behind=write_behind, write_batch_size=args.batch_size)
+        seconds, misses = benchmark_updates(cache_manager, args.updates, args.threads)
+        cache_manager.close()
+        conn = sqlite3.connect(db_path)
+        stored = conn.execute("SELECT COUNT(*) FROM crawled_urls").fetchone()[0]
+        conn.close()
+        logging.info(f"{label:<20} {args.updates} updates from {args.threads} threads in {seconds:6.2f}s  "
+                     f"{args.updates / seconds:10,.0f} updates/sec  ({stored} rows stored, {misses} not read back)")
+
+    benchmark_admission_lookups(args.cached_urls, args.pages, args.outlinks)
+
+
+if __name__ == "__main__":
+    main()
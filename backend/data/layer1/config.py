@@ -12,7 +12,8 @@ LOG_DIR = "logs"
 # --- Crawl Behavior ---
 CRAWL_DEPTH = 3  # Max depth to crawl from TARGET_URLS (0 for only target, 1 for target and its direct links, etc.)
 MAX_PAGES_TO_CRAWL = None  # Set a number (e.g., 100) to limit the total pages crawled, or None for no limit.
-CRAWL_DELAY_SECONDS = 0.5 # Delay between requests *per worker*. Adjust for politeness.
+CRAWL_DELAY_SECONDS = 0.2 # Minimum seconds between two requests to the same host. A larger robots.txt Crawl-delay wins.
+                          # Workers fetch from other eligible hosts meanwhile instead of sleeping.
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
 # Domain Whitelist: Only crawl links within these domains.
@@ -26,12 +27,31 @@ DOMAIN_WHITELIST = [
 # --- Concurrency Settings ---
 MAX_CONCURRENT_WORKERS = 5 # Number of threads to use for concurrent scraping.
                           # Start with 5-10, increase if your network/server allows, decrease if you get blocked.
+ASSET_DOWNLOAD_WORKERS = 5 # Concurrent downloads of page assets (images, CSS, JS), separate from the page workers.
+                           # Each asset URL is downloaded at most once per crawl. 0 downloads assets inside the page task instead.
+                           # Asset fetches share the per-host CRAWL_DELAY_SECONDS with page fetches.
+ASSET_QUEUE_SIZE = 1000 # Assets waiting for download at most; page tasks wait for room beyond that.
+
+# --- Crawl Engine ---
+CRAWL_ENGINE = "threads" # "threads" (thread pool with blocking requests) or "asyncio" (aiohttp event loop, needs `pip install aiohttp`)
+ASYNC_MAX_CONNECTIONS = 200 # Concurrent fetches in the asyncio engine (all on one thread)
+ASYNC_MAX_CONNECTIONS_PER_HOST = 10 # Concurrent fetches to any single host in the asyncio engine. Keep low for politeness.
 
 # --- Delta Crawling Settings ---
 ENABLE_DELTA_CRAWLING = True # Set to True to enable intelligent re-crawling based on changes.
 CACHE_DB_PATH = os.path.join("output", "crawled_urls.db") # SQLite database to store crawled URL metadata.
+CACHE_WRITE_BEHIND = True # Batch cache updates in a writer thread (WAL mode) instead of one commit per URL.
+CACHE_WRITE_BATCH_SIZE = 500 # Cache updates per transaction in write-behind mode.
+CACHE_WRITE_FLUSH_SECONDS = 1.0 # Maximum time an update waits in write-behind mode before it is committed.
+CACHE_PRELOAD = True # Load the whole cache into memory at crawl start (one scan) instead of one SQLite query per lookup.
 CHANGED_FILES_LOG_PATH = os.path.join("output", "changed_files.json") # Log of newly crawled or modified files.
 
+# --- Resumable Crawl Settings ---
+FRONTIER_DB_PATH = os.path.join("output", "frontier.db") # SQLite journal of pending and visited URLs.
+RESUME_CRAWL = True # Continue an interrupted (or MAX_PAGES_TO_CRAWL-limited) crawl from FRONTIER_DB_PATH instead of restarting from TARGET_URLS.
+FRONTIER_BATCH_SIZE = 1000 # Frontier changes written per SQLite transaction.
+FRONTIER_FLUSH_SECONDS = 1.0 # Maximum age of unwritten frontier changes. A killed crawl re-fetches at most this much work.
+
 # --- Error Handling & Re-check Intervals ---
 # For URLs that returned a 404 (Not Found) or 410 (Gone), don't re-check them for this many days.
 # Set to 0 or None to always re-check 404s.
@@ -0,0 +1,130 @@
+# frontier_benchmark.py
+#
+# Push/pop throughput of the crawl frontier (web_scraper/frontier.py) at millions of URLs,
+# in memory and journaled to a SQLite FrontierStore, plus the time to restore a journaled frontier.
+# Politeness delays are 0 so only the data structures are measured.
+# Also compares the memory per million URLs and the lookup throughput of the fingerprint VisitedSet
+# against a plain set of URL strings, on catalogue-style URLs with long query strings.
+#
+# Usage: python frontier_benchmark.py [--urls N] [--hosts N] [--batch-size N] [--db PATH] [--visited-only]
+
+import os
+import time
+import logging
+import argparse
+import tempfile
+import tracemalloc
+
+from web_scraper.frontier import HostFrontier, FrontierStore
+from web_scraper.visited_set import VisitedSet
+from web_scraper.utils import normalize_url
+
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s',
+                    handlers=[logging.StreamHandler()])
+
+DEFAULT_URLS = 1_000_000
+DEFAULT_HOSTS = 50
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _urls(count, hosts):
+    for i in range(count):
+        yield f"https://host{i % hosts}.example.org/catalog/product-{i}?page={i % 7}", i % 4
+
+
+def run(count, hosts, store=None):
+    """
+    Pushes count URLs, then pops and completes all of them. Returns (push seconds, pop seconds).
+    """
+    frontier = HostFrontier(lambda host: 0.0, store)
+    started = time.perf_counter()
+    for url, depth in _urls(count, hosts):
+        frontier.push(url, depth)
+    if store is not None:
+        store.flush()
+    pushed = time.perf_counter()
+    while True:
+        item = frontier.pop_ready()
+        if item is None:
+            break
+        frontier.done(item[0])
+    if store is not None:
+        store.flush()
+    return pushed - started, time.perf_counter() - pushed
+
+
+def _catalogue_urls(count, offset=0):
+    for i in range(offset, offset + count):
+        yield normalize_url(f"https://www.mosdac.gov.in/catalog/satellite.php?satellite=INSAT-3D&sensor=IMAGER&product=3RIMG_L2B_SST"
+                            f"&start_date=2024-{i % 12 + 1:02d}-01&end_date=2024-{i % 12 + 1:02d}-28&format=HDF5&page={i}")
+
+
+def benchmark_visited(count):
+    """
+    Logs memory per million URLs and lookups/sec (hits and misses) for a set of strings and a VisitedSet.
+    """
+    for label, make in (("set of URL strings", set), ("VisitedSet", VisitedSet)):
+        tracemalloc.start()
+        visited = make()
+        for url in _catalogue_urls(count):
+            visited.add(url)
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        hits = list(_catalogue_urls(min(count, 200_000)))
+        misses = list(_catalogue_urls(min(count, 200_000), offset=count))
+        started = time.perf_counter()
+        found = sum(1 for url in hits if url in visited)
+        missed = sum(1 for url in misses if url not in visited)
+        seconds = time.perf_counter() - started
+        assert found == len(hits) and missed == len(misses)
+        logging.info(f"{label:<28} {memory / count * 1_000_000 / 2**20:8.1f} MiB per million URLs, "
+                     f"{(len(hits) + len(misses)) / seconds:12,.0f} lookups/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark crawl frontier push/pop throughput.")
+    parser.add_argument("--urls", type=int, default=DEFAULT_URLS, help="URLs pushed and popped.")
+    parser.add_argument("--hosts", type=int, default=DEFAULT_HOSTS, help="Distinct hosts the URLs are spread over.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="FrontierStore operations per transaction.")
+    parser.add_argument("--db", help="SQLite file for the journaled runs (default: a temporary file).")
+    parser.add_argument("--visited-only", action="store_true", help="Only run the visited-set comparison.")
+    args = parser.parse_args()
+
+    benchmark_visited(args.urls)
+    if args.visited_only:
+        return
+
+    def report(label, count, seconds):
+        logging.info(f"{label:<28} {count:>10} URLs in {seconds:7.2f}s  {count / seconds:12,.0f} URLs/sec")
+
+    push_seconds, pop_seconds = run(args.urls, args.hosts)
+    report("in memory: push", args.urls, push_seconds)
+    report("in memory: pop + done", args.urls, pop_seconds)
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="frontier_"), "frontier.db")
+    store = FrontierStore(db_path, batch_size=args.batch_size, flush_seconds=float("inf"))
+    store.reset()
+    push_seconds, pop_seconds = run(args.urls, args.hosts, store)
+    report("journaled: push", args.urls, push_seconds)
+    report("journaled: pop + done", args.urls, pop_seconds)
+
+    # Restore: journal every URL as pending (as if the crawl was killed before popping any), then reload
+    store.reset()
+    frontier = HostFrontier(lambda host: 0.0, store)
+    for url, depth in _urls(args.urls, args.hosts):
+        frontier.push(url, depth)
+    store.close()
+    logging.info(f"Journal size with {args.urls} pending URLs: {os.path.getsize(db_path) / 2**20:.1f} MiB")
+    started = time.perf_counter()
+    store = FrontierStore(db_path, batch_size=args.batch_size)
+    restored = HostFrontier(lambda host: 0.0, store).restore()
+    visited = sum(1 for _ in store.iter_visited())
+    report("restore (pending + visited)", restored, time.perf_counter() - started)
+    assert restored == visited == args.urls
+    store.reset()
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
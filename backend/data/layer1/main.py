@@ -1,12 +1,11 @@
 import os
 import logging
 import time
-from collections import deque
-from urllib.parse import urlparse, urljoin
-from urllib import robotparser
+import asyncio
+from urllib.parse import urlparse
 import json
 from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import threading
 
 # --- Import configurations ---
@@ -14,14 +13,22 @@ from config import (
     TARGET_URLS, OUTPUT_DIR, LOG_DIR, CRAWL_DEPTH, DOMAIN_WHITELIST,
     CRAWL_DELAY_SECONDS, MAX_PAGES_TO_CRAWL, USER_AGENT,
     ENABLE_DELTA_CRAWLING, CACHE_DB_PATH, CHANGED_FILES_LOG_PATH,
-    MAX_CONCURRENT_WORKERS, ENABLE_DYNAMIC_CONTENT_LOADING,
-    FOUR_OH_FOUR_RECHECK_INTERVAL_DAYS
+    CACHE_WRITE_BEHIND, CACHE_WRITE_BATCH_SIZE, CACHE_WRITE_FLUSH_SECONDS, CACHE_PRELOAD,
+    MAX_CONCURRENT_WORKERS, ASSET_DOWNLOAD_WORKERS, ASSET_QUEUE_SIZE, ENABLE_DYNAMIC_CONTENT_LOADING,
+    FOUR_OH_FOUR_RECHECK_INTERVAL_DAYS, CRAWL_ENGINE,
+    ASYNC_MAX_CONNECTIONS, ASYNC_MAX_CONNECTIONS_PER_HOST,
+    FRONTIER_DB_PATH, RESUME_CRAWL, FRONTIER_BATCH_SIZE, FRONTIER_FLUSH_SECONDS
 )
 
 # --- Import WebScraper components ---
 from web_scraper.web_scraper import WebScraper
 from web_scraper.cache_manager import CacheManager
 from web_scraper.download_manager import DownloadManager
+from web_scraper.asset_pool import AssetPool
+from web_scraper.async_fetcher import AsyncFetcher, _AIOHTTP_AVAILABLE
+from web_scraper.frontier import HostFrontier, FrontierStore
+from web_scraper.robots_cache import RobotsCache
+from web_scraper.visited_set import VisitedSet
 from web_scraper.utils import get_domain, normalize_url, is_downloadable_asset # Corrected: Removed is_asset_url
 
 # --- Setup Logging ---
@@ -40,241 +47,391 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # --- Global Variables and Locks ---
-crawl_queue = deque() # Stores tuples of (url, depth)
-visited_urls = set()  # Stores normalized URLs that have been added to the queue or visited
-crawl_queue_lock = threading.Lock()
-visited_urls_lock = threading.Lock()
+# robots.txt rules and politeness delay per host, loaded the first time a host is seen
+robots = RobotsCache(USER_AGENT, default_delay=CRAWL_DELAY_SECONDS)
+crawl_frontier = None # HostFrontier: stores (url, depth) per host, hands out URLs whose host may be fetched now. Created in main()
+asset_pool = None # AssetPool downloading page assets in the background, or None (ASSET_DOWNLOAD_WORKERS = 0). Created in main()
+visited_urls = VisitedSet() # Fingerprints of normalized URLs that have been added to the queue or visited (thread-safe)
+crawled_pages_lock = threading.Lock()
 crawled_pages_count = 0
+stop_crawl = threading.Event() # Set once MAX_PAGES_TO_CRAWL pages have been crawled
 changed_files_log = [] # To store details of new/modified files
 
-# --- Robots.txt Parser (Global) ---
-rp = robotparser.RobotFileParser()
-if TARGET_URLS:
-    try:
-        # Assuming all target URLs are on the same domain for robots.txt parsing simplicity
-        # or that each target URL's domain's robots.txt will be fetched dynamically if needed.
-        # For a simple setup, we'll try to fetch for the first TARGET_URL's domain.
-        base_url = TARGET_URLS[0] if isinstance(TARGET_URLS, list) else TARGET_URLS
-        rp_url = urljoin(base_url, '/robots.txt')
-        rp.set_url(rp_url)
-        rp.read()
-        logger.info(f"Loaded robots.txt from: {rp_url}")
-    except Exception as e:
-        logger.warning(f"Could not load robots.txt for {base_url}: {e}. Proceeding without robots.txt rules.")
-
-
-# --- Helper function for adding URLs to the queue and visited set ---
-def add_url_to_queue(url, depth, cache_manager): # cache_manager passed for 404 check
-    # Normalize URL before any checks or adding to visited set
-    parsed_url = urlparse(url)
-    
-    # Normalize the path component to handle trailing slashes consistently
-    normalized_path = parsed_url.path.strip('/')
-    if not normalized_path:
-        normalized_path = '/' # Ensures base path is always '/'
-    
-    # Reconstruct URL with normalized path and sorted query parameters
-    normalized_url_base = urljoin(url, normalized_path)
-    
-    normalized_url = normalized_url_base
-    if parsed_url.query:
-        query_params = sorted(parsed_url.query.split('&'))
-        normalized_url += '?' + '&'.join(query_params)
-    
+# --- Helper functions for admitting URLs to the frontier ---
+def is_recent_error(normalized_url, cached_metadata):
+    """
+    True if the cache says the URL returned 404/410 less than FOUR_OH_FOUR_RECHECK_INTERVAL_DAYS ago.
+    """
+    if not cached_metadata:
+        return False
+    status = cached_metadata.get('http_status')
+    last_crawled_str = cached_metadata.get('last_crawled')
+
+    if status in [404, 410]: # Check for 404 or 410
+        if last_crawled_str:
+            try:
+                last_crawled_dt = datetime.fromisoformat(last_crawled_str)
+                if datetime.now() - last_crawled_dt < timedelta(days=FOUR_OH_FOUR_RECHECK_INTERVAL_DAYS):
+                    logger.info(f"Skipping {normalized_url} due to previous {status} status (re-check in {FOUR_OH_FOUR_RECHECK_INTERVAL_DAYS} days).")
+                    return True # Do not add to queue
+                else:
+                    logger.info(f"Re-queuing {normalized_url} as its {status} status is older than {FOUR_OH_FOUR_RECHECK_INTERVAL_DAYS} days.")
+            except ValueError:
+                logger.warning(f"Invalid last_crawled timestamp in cache for {normalized_url}: {last_crawled_str}. Will re-crawl.")
+        else: # If no last_crawled timestamp for a 404/410, assume recent and skip for now to avoid immediate re-attempt
+            logger.info(f"Skipping {normalized_url} due to previous {status} status (no last_crawled time, assuming recent).")
+            return True # Do not add to queue
+    return False
+
+
+def url_filter_reason(normalized_url):
+    """
+    Reason normalized_url is never crawled (unsupported scheme, no host, not in DOMAIN_WHITELIST), or None if it may be.
+    """
+    parsed_url = urlparse(normalized_url)
+    if parsed_url.scheme not in ('http', 'https') or not parsed_url.netloc:
+        return "Not an HTTP/HTTPS link"
+    if DOMAIN_WHITELIST and get_domain(normalized_url) not in DOMAIN_WHITELIST:
+        return "Not in allowed domains (whitelist)"
+    return None
+
+
+def admit_urls(urls, depth, cache_manager): # cache_manager passed for 404 check
+    """
+    Applies every crawl filter (depth, scheme, whitelist, already visited, robots.txt, recent 404/410)
+    to the URLs discovered on one page and marks them visited. Returns the normalized URLs to crawl.
+    The 404/410 check looks all of them up with one cache_manager.get_many() call.
+    Shared by both crawl engines.
+    """
     # --- DEPTH CHECK: IMMEDIATELY FILTER OUT URLs EXCEEDING CRAWL_DEPTH ---
     if CRAWL_DEPTH is not None and depth > CRAWL_DEPTH:
-        logger.debug(f"Skipping {normalized_url}: Exceeds max crawl depth ({CRAWL_DEPTH}) before queuing.")
-        return
+        logger.debug(f"Skipping {len(urls)} links: Exceed max crawl depth ({CRAWL_DEPTH}) before queuing.")
+        return []
 
-    # Check against DOMAIN_WHITELIST
-    if DOMAIN_WHITELIST and get_domain(normalized_url) not in DOMAIN_WHITELIST:
-        logger.debug(f"Skipping {normalized_url}: Not in allowed domains (whitelist).")
-        return
+    candidates = []
+    for url in urls:
+        # Normalize URL before any checks or adding to visited set (fragments like #section1 are dropped)
+        normalized_url = normalize_url(url)
 
-    # Check robots.txt rules
-    if not rp.can_fetch(USER_AGENT, normalized_url):
-        logger.debug(f"Skipping {normalized_url}: Disallowed by robots.txt.")
-        return
+        # Check for invalid schemes (mailto:, tel:, ftp:, ...), empty netloc and DOMAIN_WHITELIST
+        reason = url_filter_reason(normalized_url)
+        if reason:
+            logger.debug(f"Skipping {url}: {reason}.")
+            continue
 
-    # Check cache for previous errors like 404 (only if delta crawling is enabled)
-    if ENABLE_DELTA_CRAWLING and FOUR_OH_FOUR_RECHECK_INTERVAL_DAYS is not None:
-        cached_metadata = cache_manager.get_metadata(normalized_url)
-        if cached_metadata:
-            status = cached_metadata.get('http_status')
-            last_crawled_str = cached_metadata.get('last_crawled')
-
-            if status in [404, 410]: # Check for 404 or 410
-                if last_crawled_str:
-                    try:
-                        last_crawled_dt = datetime.fromisoformat(last_crawled_str)
-                        if datetime.now() - last_crawled_dt < timedelta(days=FOUR_OH_FOUR_RECHECK_INTERVAL_DAYS):
-                            logger.info(f"Skipping {normalized_url} due to previous {status} status (re-check in {FOUR_OH_FOUR_RECHECK_INTERVAL_DAYS} days).")
-                            return # Do not add to queue
-                        else:
-                            logger.info(f"Re-queuing {normalized_url} as its {status} status is older than {FOUR_OH_FOUR_RECHECK_INTERVAL_DAYS} days.")
-                    except ValueError:
-                        logger.warning(f"Invalid last_crawled timestamp in cache for {normalized_url}: {last_crawled_str}. Will re-crawl.")
-                else: # If no last_crawled timestamp for a 404/410, assume recent and skip for now to avoid immediate re-attempt
-                    logger.info(f"Skipping {normalized_url} due to previous {status} status (no last_crawled time, assuming recent).")
-                    return # Do not add to queue
-
-
-    with visited_urls_lock:
-        if normalized_url in visited_urls:
+        # Add to visited set immediately; the checks below give the same answer for every later sighting
+        if not visited_urls.add(normalized_url):
             logger.debug(f"Skipping already visited link: {normalized_url}")
-            return
-        visited_urls.add(normalized_url) # Add to visited set immediately
-
-    # Check for invalid schemes, empty netloc, or fragment-only links
-    if parsed_url.scheme not in ('http', 'https') or \
-       not parsed_url.netloc or \
-       parsed_url.fragment: # Check for fragment-only links like #section1
-        logger.debug(f"Skipping invalid scheme or fragment-only link: {url}")
-        return # Do not add to queue if it's not a valid crawlable URL
-
-    # Check for mailto, tel, etc. (using original URL as they don't parse well into standard http/s links)
-    if any(url.startswith(scheme) for scheme in ['mailto:', 'tel:', 'ftp:', 'file:']):
-        logger.debug(f"Skipping non-HTTP/HTTPS scheme: {url}")
-        return
-
-    with crawl_queue_lock:
-        crawl_queue.append((normalized_url, depth))
+            continue
+
+        # Check robots.txt rules
+        if not robots.can_fetch(normalized_url):
+            logger.debug(f"Skipping {normalized_url}: Disallowed by robots.txt.")
+            continue
+
+        candidates.append(normalized_url)
+
+    # Check cache for previous errors like 404 (only if delta crawling is enabled)
+    if candidates and ENABLE_DELTA_CRAWLING and FOUR_OH_FOUR_RECHECK_INTERVAL_DAYS is not None:
+        cached = cache_manager.get_many(candidates)
+        candidates = [normalized_url for normalized_url in candidates if not is_recent_error(normalized_url, cached.get(normalized_url))]
+    return candidates
+
+
+def add_urls_to_queue(urls, depth, cache_manager):
+    for normalized_url in admit_urls(urls, depth, cache_manager):
+        crawl_frontier.push(normalized_url, depth)
         logger.debug(f"Added {normalized_url} (depth {depth}) to queue.")
 
+
+def add_url_to_queue(url, depth, cache_manager):
+    add_urls_to_queue([url], depth, cache_manager)
+
+# --- Result bookkeeping shared by both crawl engines ---
+def record_page_result(url, content_md5, asset_info_list, language_detected, cache_manager):
+    """
+    Logs new/modified assets of a scraped page, and the page itself if its content changed.
+    """
+    # Log asset changes
+    for asset_url, asset_status, asset_type in asset_info_list:
+        if asset_status in ["NEWLY_DOWNLOADED", "MODIFIED"]:
+            changed_files_log.append({
+                "url": asset_url,
+                "status": asset_status,
+                "type": asset_type,
+                "timestamp": datetime.now().isoformat()
+            })
+
+    # Check if the HTML content itself was new or modified
+    cached_metadata = cache_manager.get_metadata(url)
+    if cached_metadata and cached_metadata.get('md5_hash') != content_md5:
+        # If MD5 is different, or it's a new entry, log it
+        changed_files_log.append({
+            "url": url,
+            "status": "NEWLY_DOWNLOADED" if not cached_metadata else "MODIFIED",
+            "type": "html",
+            "timestamp": datetime.now().isoformat(),
+            "language": language_detected # Include detected language
+        })
+
+
+def record_download_result(url, download_status, file_type):
+    if download_status in ["NEWLY_DOWNLOADED", "MODIFIED"]:
+        changed_files_log.append({
+            "url": url,
+            "status": download_status,
+            "type": file_type,
+            "timestamp": datetime.now().isoformat()
+        })
+
+
+def count_crawled_page(url, depth, http_status_code):
+    """
+    Counts a successful HTML scrape or asset download, stopping the crawl at MAX_PAGES_TO_CRAWL.
+    """
+    global crawled_pages_count
+    if http_status_code and 200 <= http_status_code < 300:
+        with crawled_pages_lock: # Protect shared counter
+            crawled_pages_count += 1
+            logger.info(f"Crawled: {url} (Depth: {depth}, Status: {http_status_code}). Total processed: {crawled_pages_count}")
+            if MAX_PAGES_TO_CRAWL and crawled_pages_count >= MAX_PAGES_TO_CRAWL and not stop_crawl.is_set():
+                logger.info(f"Max pages to crawl ({MAX_PAGES_TO_CRAWL}) reached. Stopping.")
+                # Signal the scheduler to stop submitting tasks and drop the rest of the frontier (it stays journaled for a resume)
+                stop_crawl.set()
+                crawl_frontier.clear()
+                if asset_pool is not None:
+                    asset_pool.stop() # Queued assets are dropped too
+    elif http_status_code:
+        logger.warning(f"Failed/Skipped: {url} (Depth: {depth}, Status: {http_status_code})")
+    else:
+        logger.warning(f"Failed/Skipped: {url} (Depth: {depth}, No HTTP Status Recorded)")
+
+
 # --- Worker function for ThreadPoolExecutor ---
 def worker(url, depth, web_scraper, download_manager, cache_manager):
-    global crawled_pages_count, changed_files_log
-
     page_links = []
-    content_md5 = None
     http_status_code = None # Initialize http_status_code
-    
+
     # Delta crawling check: check if content changed
     is_html_page = not is_downloadable_asset(url) # This heuristic helps decide if we should use scrape_page or download_file
-    
+
     if is_html_page:
         # For HTML pages, scrape_page handles delta crawling internally
         extracted_links, content_md5, etag, last_modified, asset_info_list, http_status_code, language_detected = web_scraper.scrape_page(url, download_manager)
         page_links.extend(extracted_links)
-        
-        # Log asset changes
-        for asset_url, asset_status, asset_type in asset_info_list:
-            if asset_status in ["NEWLY_DOWNLOADED", "MODIFIED"]:
-                changed_files_log.append({
-                    "url": asset_url,
-                    "status": asset_status,
-                    "type": asset_type,
-                    "timestamp": datetime.now().isoformat()
-                })
-        
-        # Check if the HTML content itself was new or modified
-        cached_metadata = cache_manager.get_metadata(url)
-        if cached_metadata and cached_metadata.get('md5_hash') != content_md5:
-            # If MD5 is different, or it's a new entry, log it
-            changed_files_log.append({
-                "url": url,
-                "status": "NEWLY_DOWNLOADED" if not cached_metadata else "MODIFIED",
-                "type": "html",
-                "timestamp": datetime.now().isoformat(),
-                "language": language_detected # Include detected language
-            })
+        record_page_result(url, content_md5, asset_info_list, language_detected, cache_manager)
+    elif web_scraper.asset_pool is not None and web_scraper.asset_pool.claim(url) is None:
+        logger.debug(f"Skipping {url}: already downloaded as an asset of another page.")
+        return page_links, depth + 1, None
     else:
         # For assets, download_file handles delta crawling internally
         download_status, file_type, http_status_code = download_manager.download_file(url)
-        if download_status in ["NEWLY_DOWNLOADED", "MODIFIED"]:
-            changed_files_log.append({
-                "url": url,
-                "status": download_status,
-                "type": file_type,
-                "timestamp": datetime.now().isoformat()
-            })
-    
-    # Increment crawled pages count if successful HTML scrape or asset download
-    if http_status_code and 200 <= http_status_code < 300:
-        with threading.Lock(): # Protect shared counter
-            global crawled_pages_count
-            crawled_pages_count += 1
-            logger.info(f"Crawled: {url} (Depth: {depth}, Status: {http_status_code}). Total processed: {crawled_pages_count}")
-            if MAX_PAGES_TO_CRAWL and crawled_pages_count >= MAX_PAGES_TO_CRAWL:
-                logger.info(f"Max pages to crawl ({MAX_PAGES_TO_CRAWL}) reached. Stopping.")
-                # Signal to stop processing by clearing queue and preventing new additions
-                with crawl_queue_lock:
-                    crawl_queue.clear()
-    elif http_status_code:
-        logger.warning(f"Failed/Skipped: {url} (Depth: {depth}, Status: {http_status_code})")
-    else:
-        logger.warning(f"Failed/Skipped: {url} (Depth: {depth}, No HTTP Status Recorded)")
-    
-    time.sleep(CRAWL_DELAY_SECONDS) # Be polite
+        record_download_result(url, download_status, file_type)
+
+    count_crawled_page(url, depth, http_status_code)
 
     return page_links, depth + 1, http_status_code # Return extracted links and next depth
 
 
+def timed_worker(*args):
+    """
+    Runs worker(*args) and returns (its result, seconds it took).
+    """
+    started = time.perf_counter()
+    result = worker(*args)
+    return result, time.perf_counter() - started
+
+
+def crawl_with_threads(web_scraper, download_manager, cache_manager):
+    """
+    Thread-pool engine. Continuous scheduling: a slot freed by a finished task is refilled from the
+    frontier right away, instead of waiting for the whole batch of submitted tasks to finish.
+    Only URLs whose host is past its politeness delay are submitted; while every queued host is
+    waiting, the scheduler waits for whichever comes first, a finished task or the next eligible host.
+    """
+    crawl_started = time.perf_counter()
+    busy_seconds = 0.0 # Summed task run time, for worker utilization
+    tasks_done = 0
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_WORKERS) as executor:
+        futures = {} # Future -> URL of every in-flight task
+
+        while True:
+            # Fill every free worker slot from the frontier
+            while len(futures) < MAX_CONCURRENT_WORKERS and not stop_crawl.is_set():
+                next_url = crawl_frontier.pop_ready()
+                if next_url is None:
+                    break # Frontier empty, or every queued host is still within its delay
+                current_url, current_depth = next_url
+                logger.debug(f"Popped {current_url} (depth {current_depth}) from queue.")
+                future = executor.submit(timed_worker, current_url, current_depth, web_scraper, download_manager, cache_manager)
+                futures[future] = current_url
+
+            ready_in = crawl_frontier.seconds_until_ready()
+            if not futures:
+                if ready_in is None or stop_crawl.is_set():
+                    break # Frontier empty (or max pages reached) and nothing left in flight
+                time.sleep(ready_in) # Only delayed hosts left: wait for the first to become eligible
+                continue
+
+            # Block until a task finishes (its links may refill the frontier) or a queued host becomes eligible
+            done, _ = wait(futures, timeout=ready_in if len(futures) < MAX_CONCURRENT_WORKERS and not stop_crawl.is_set() else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                task_url = futures.pop(future)
+                try:
+                    (new_links, next_depth, _), seconds = future.result() # Discard HTTP status for link processing
+                    busy_seconds += seconds
+                    tasks_done += 1
+                    # Also after max pages is reached: the links are journaled for a resume and the page is not fetched again
+                    add_urls_to_queue(new_links, next_depth, cache_manager)
+                    crawl_frontier.done(task_url)
+                except Exception as exc:
+                    logger.error(f'Task for {task_url} generated an exception: {exc}')
+                    crawl_frontier.done(task_url)
+
+        logger.info("Crawl queue is empty and all tasks are completed.")
+
+    if web_scraper.asset_pool is not None:
+        web_scraper.asset_pool.join() # Let the background asset downloads finish
+    crawl_seconds = time.perf_counter() - crawl_started
+    if crawl_seconds > 0:
+        logger.info(f"Crawled {crawled_pages_count} pages in {crawl_seconds:.2f}s ({crawled_pages_count / crawl_seconds:.2f} pages/sec, "
+                    f"worker utilization {busy_seconds / (crawl_seconds * MAX_CONCURRENT_WORKERS):.0%}, "
+                    f"{busy_seconds / max(tasks_done, 1) * 1000:.0f} ms per task).")
+
+
+# --- Asyncio engine ---
+async def async_worker(url, depth, web_scraper, download_manager, cache_manager, fetcher):
+    """
+    worker() for the asyncio engine: same delta logic and bookkeeping, without blocking the event loop.
+    """
+    page_links = []
+    if not is_downloadable_asset(url):
+        extracted_links, content_md5, etag, last_modified, asset_info_list, http_status_code, language_detected = await web_scraper.scrape_page_async(url, fetcher, download_manager)
+        page_links.extend(extracted_links)
+        record_page_result(url, content_md5, asset_info_list, language_detected, cache_manager)
+    elif web_scraper.asset_pool is not None and web_scraper.asset_pool.claim(url) is None:
+        logger.debug(f"Skipping {url}: already downloaded as an asset of another page.")
+        return page_links, depth + 1, None
+    else:
+        download_status, file_type, http_status_code = await download_manager.download_file_async(url, fetcher)
+        record_download_result(url, download_status, file_type)
+
+    count_crawled_page(url, depth, http_status_code)
+
+    # Load robots.txt for the links' new hosts through the fetcher, so admitting the links on the
+    # event loop (add_urls_to_queue) never falls back to RobotsCache's blocking request
+    if page_links and (CRAWL_DEPTH is None or depth + 1 <= CRAWL_DEPTH):
+        normalized_links = (normalize_url(link) for link in page_links)
+        await robots.load_async([link for link in normalized_links if url_filter_reason(link) is None], fetcher)
+
+    return page_links, depth + 1, http_status_code
+
+
+async def crawl_with_asyncio(web_scraper, download_manager, cache_manager):
+    """
+    Asyncio engine: the same scheduling as crawl_with_threads, with up to ASYNC_MAX_CONNECTIONS tasks
+    in flight on one aiohttp session and at most ASYNC_MAX_CONNECTIONS_PER_HOST requests per host.
+    URL filtering, per-host politeness, cache delta logic and the on-disk layout are the same as the
+    thread-pool engine's.
+    """
+    crawl_started = time.perf_counter()
+    async with AsyncFetcher(ASYNC_MAX_CONNECTIONS, ASYNC_MAX_CONNECTIONS_PER_HOST) as fetcher:
+        tasks = {} # Task -> URL of every in-flight fetch
+
+        while True:
+            while len(tasks) < ASYNC_MAX_CONNECTIONS and not stop_crawl.is_set():
+                next_url = crawl_frontier.pop_ready()
+                if next_url is None:
+                    break
+                current_url, current_depth = next_url
+                task = asyncio.create_task(async_worker(current_url, current_depth, web_scraper, download_manager, cache_manager, fetcher))
+                tasks[task] = current_url
+
+            ready_in = crawl_frontier.seconds_until_ready()
+            if not tasks:
+                if ready_in is None or stop_crawl.is_set():
+                    break
+                await asyncio.sleep(ready_in)
+                continue
+
+            done, _ = await asyncio.wait(tasks, timeout=ready_in if len(tasks) < ASYNC_MAX_CONNECTIONS and not stop_crawl.is_set() else None, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task_url = tasks.pop(task)
+                try:
+                    new_links, next_depth, _ = task.result()
+                    add_urls_to_queue(new_links, next_depth, cache_manager)
+                    crawl_frontier.done(task_url)
+                except Exception as exc:
+                    logger.error(f'Task for {task_url} generated an exception: {exc}')
+                    crawl_frontier.done(task_url)
+
+        if web_scraper.asset_pool is not None:
+            await web_scraper.asset_pool.join_async() # Before the fetcher's session is closed
+
+    logger.info("Crawl queue is empty and all tasks are completed.")
+    crawl_seconds = time.perf_counter() - crawl_started
+    if crawl_seconds > 0:
+        logger.info(f"Crawled {crawled_pages_count} pages in {crawl_seconds:.2f}s ({crawled_pages_count / crawl_seconds:.2f} pages/sec, "
+                    f"up to {ASYNC_MAX_CONNECTIONS} concurrent fetches).")
+
+
 def main():
+    global crawl_frontier, asset_pool
     if not os.path.exists(OUTPUT_DIR):
         os.makedirs(OUTPUT_DIR)
 
     # 1. Initialize Managers
-    cache_manager = CacheManager(CACHE_DB_PATH)
+    cache_manager = CacheManager(CACHE_DB_PATH, CACHE_WRITE_BEHIND, CACHE_WRITE_BATCH_SIZE, CACHE_WRITE_FLUSH_SECONDS)
+    download_manager = DownloadManager(OUTPUT_DIR, cache_manager)
+    frontier_store = FrontierStore(FRONTIER_DB_PATH, FRONTIER_BATCH_SIZE, FRONTIER_FLUSH_SECONDS)
+    crawl_frontier = HostFrontier(robots.crawl_delay, frontier_store)
+    # Page assets are downloaded in the background, each at most once per crawl
+    if ASSET_DOWNLOAD_WORKERS:
+        asset_pool = AssetPool(download_manager, crawl_frontier, ASSET_DOWNLOAD_WORKERS, ASSET_QUEUE_SIZE, on_result=record_download_result)
     web_scraper = WebScraper(
         output_dir=OUTPUT_DIR,
         cache_manager=cache_manager,
-        enable_dynamic_content_loading=ENABLE_DYNAMIC_CONTENT_LOADING
+        enable_dynamic_content_loading=ENABLE_DYNAMIC_CONTENT_LOADING,
+        asset_pool=asset_pool,
+        host_clock=crawl_frontier.clock # Inline asset downloads keep to the same per-host delays as pages
     )
-    download_manager = DownloadManager(OUTPUT_DIR, cache_manager)
+    if ENABLE_DELTA_CRAWLING and CACHE_PRELOAD:
+        cache_manager.preload() # One table scan; every later cache lookup is answered from memory
 
-    # 2. Add initial URLs to queue
-    for url in TARGET_URLS:
-        add_url_to_queue(url, 0, cache_manager)
+    # 2. Resume the journaled frontier of an interrupted crawl, or add initial URLs to queue
+    if RESUME_CRAWL and frontier_store.pending_count():
+        visited_urls.update(frontier_store.iter_visited())
+        restored = crawl_frontier.restore()
+        logger.info(f"Resuming interrupted crawl from {FRONTIER_DB_PATH}: {restored} pending URLs, {len(visited_urls)} already queued.")
+    else:
+        frontier_store.reset()
+        for url in TARGET_URLS:
+            add_url_to_queue(url, 0, cache_manager)
 
-    # 3. Start crawling with ThreadPoolExecutor
-    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_WORKERS) as executor:
-        futures = set()
-        
-        while crawl_queue or futures:
-            # Check if max pages reached, clear queue if so
-            if MAX_PAGES_TO_CRAWL and crawled_pages_count >= MAX_PAGES_TO_CRAWL:
-                with crawl_queue_lock:
-                    if crawl_queue: # Clear only if not already empty
-                        logger.info("Max pages reached, clearing crawl queue.")
-                        crawl_queue.clear()
-                # Also cancel any waiting futures if possible, though ThreadPoolExecutor doesn't easily allow
-                # direct cancellation of submitted tasks before they start execution.
-                # The worker function itself has a check for MAX_PAGES_TO_CRAWL to stop adding new links.
-            
-            # Submit new tasks if there's capacity
-            while len(futures) < MAX_CONCURRENT_WORKERS and crawl_queue:
-                with crawl_queue_lock:
-                    if crawl_queue:
-                        current_url, current_depth = crawl_queue.popleft()
-                        logger.debug(f"Popped {current_url} (depth {current_depth}) from queue.")
-                    else:
-                        break # Queue became empty while acquiring lock
-                
-                # Check for max pages again before submitting
-                if MAX_PAGES_TO_CRAWL and crawled_pages_count >= MAX_PAGES_TO_CRAWL:
-                    logger.info("Max pages reached during submission, not submitting new tasks.")
-                    break
-                
-                future = executor.submit(worker, current_url, current_depth, web_scraper, download_manager, cache_manager)
-                futures.add(future)
-            
-            # Process completed futures
-            for future in as_completed(futures):
-                futures.remove(future)
-                try:
-                    new_links, next_depth, _ = future.result() # Discard HTTP status for link processing
-                    for link in new_links:
-                        add_url_to_queue(link, next_depth, cache_manager)
-                except Exception as exc:
-                    logger.error(f'Task generated an exception: {exc}')
+    # 3. Crawl with the configured engine
+    engine = CRAWL_ENGINE
+    if engine == "asyncio" and not _AIOHTTP_AVAILABLE:
+        logger.warning("CRAWL_ENGINE is 'asyncio' but aiohttp is not installed. Falling back to the thread-pool engine.")
+        engine = "threads"
+    if engine == "asyncio" and web_scraper.enable_dynamic_content_loading:
+        logger.warning("Dynamic content loading (Selenium) is not supported by the asyncio engine. Falling back to the thread-pool engine.")
+        engine = "threads"
 
-            # Implement a small delay if the queue is empty but futures are still running
-            if not crawl_queue and futures:
-                time.sleep(0.5) # Wait a bit for currently running tasks to finish and potentially add new links
+    try:
+        if engine == "asyncio":
+            asyncio.run(crawl_with_asyncio(web_scraper, download_manager, cache_manager))
+        else:
+            crawl_with_threads(web_scraper, download_manager, cache_manager)
+    finally:
+        # 4. Keep the frontier for a resume unless the crawl ran to completion
+        pending = frontier_store.pending_count()
+        if pending:
+            logger.info(f"Crawl stopped with {pending} pending URLs journaled in {FRONTIER_DB_PATH}; the next run resumes them.")
+        else:
+            frontier_store.reset()
+        frontier_store.close()
+        cache_manager.flush() # Commit queued cache updates even if the crawl was interrupted
 
-        logger.info("Crawl queue is empty and all tasks are completed.")
-    
     # 5. Finalization
     web_scraper.close_browser()
     cache_manager.close()
@@ -0,0 +1,113 @@
+import os
+import sys
+import json
+import threading
+import subprocess
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+LAYER1_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = 12
+
+# Crawls the site with the asyncio engine in a fresh interpreter. Records every blocking robots.txt
+# request and every process_page call, with whether it ran on the event loop's thread.
+RUNNER = """
+import asyncio, json, sys
+sys.path.insert(0, {layer1!r})
+import config
+config.TARGET_URLS = [{target!r}]
+config.DOMAIN_WHITELIST = {hosts!r}
+config.CRAWL_DELAY_SECONDS = 0
+config.CRAWL_DEPTH = 10
+config.MAX_PAGES_TO_CRAWL = None
+config.CRAWL_ENGINE = "asyncio"
+config.RESUME_CRAWL = False
+import main
+from web_scraper import robots_cache
+from web_scraper.web_scraper import WebScraper
+
+def on_event_loop():
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+blocking_robots = []
+requests_get = robots_cache.requests.get
+def recording_get(url, *args, **kwargs):
+    blocking_robots.append([url, on_event_loop()])
+    return requests_get(url, *args, **kwargs)
+robots_cache.requests.get = recording_get
+
+pages_on_loop = []
+process_page = WebScraper.process_page
+def recording_process_page(self, url, *args):
+    pages_on_loop.append(on_event_loop())
+    return process_page(self, url, *args)
+WebScraper.process_page = recording_process_page
+
+main.main()
+print("RESULT " + json.dumps({{"blocking_robots": blocking_robots, "pages_on_loop": pages_on_loop}}))
+"""
+
+
+class _Site(BaseHTTPRequestHandler):
+    """
+    / links to /page1 ... /page{PAGES - 1}, alternately on the host it was requested from and on its other name.
+    """
+    protocol_version = "HTTP/1.1"
+    requests_seen = []
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        host = self.headers["Host"]
+        with self.lock:
+            self.requests_seen.append(f"{host}{self.path}")
+        if self.path == "/robots.txt":
+            body = b"User-agent: *\nDisallow: /page3\n"
+        else:
+            port = host.rsplit(":", 1)[1]
+            links = "".join(f'<a href="http://{("127.0.0.1", "localhost")[n % 2]}:{port}/page{n}">Product {n}</a>' for n in range(1, PAGES))
+            body = f"<html><body><p>INSAT-3D products.</p>{links if self.path == '/' else ''}</body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def site():
+    _Site.requests_seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Site)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def test_asyncio_engine_does_not_block_the_event_loop(tmp_path, site):
+    pytest.importorskip("aiohttp")
+    hosts = [f"127.0.0.1:{site}", f"localhost:{site}"]
+    script = RUNNER.format(layer1=LAYER1_DIR, target=f"http://{hosts[0]}/", hosts=hosts)
+    result = subprocess.run([sys.executable, "-c", script], cwd=str(tmp_path), capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    line = next(line for line in result.stdout.splitlines() if line.startswith("RESULT "))
+    report = json.loads(line[len("RESULT "):])
+
+    # Only the seed's robots.txt is requested with requests, before the event loop starts;
+    # the second host's is loaded through the aiohttp session
+    assert report["blocking_robots"] == [[f"http://{hosts[0]}/robots.txt", False]]
+    seen = _Site.requests_seen
+    assert sorted(path for path in seen if path.endswith("/robots.txt")) == sorted(f"{host}/robots.txt" for host in hosts)
+
+    # Every page but the one disallowed by the second host's robots.txt was crawled, and saved off the event loop
+    pages = {path for path in seen if not path.endswith("/robots.txt")}
+    assert pages == {f"{hosts[0]}/"} | {f"{hosts[n % 2]}/page{n}" for n in range(1, PAGES) if n != 3}
+    assert report["pages_on_loop"] == [False] * len(pages)
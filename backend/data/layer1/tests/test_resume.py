@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import sqlite3
+import threading
+import subprocess
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+LAYER1_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = 120
+FANOUT = 5
+STOP_AFTER = 30
+
+# Runs one crawl in a fresh interpreter, as a restarted crawler would. Prints the restored frontier
+# (if any) and whether every URL visited before the restart is in the visited set again.
+RUNNER = """
+import json, os, sys
+sys.path.insert(0, {layer1!r})
+import config
+config.TARGET_URLS = [{target!r}]
+config.DOMAIN_WHITELIST = [{host!r}]
+config.CRAWL_DELAY_SECONDS = 0
+config.CRAWL_DEPTH = 10
+config.MAX_PAGES_TO_CRAWL = {max_pages!r}
+config.MAX_CONCURRENT_WORKERS = 4
+config.CRAWL_ENGINE = {engine!r}
+config.RESUME_CRAWL = True
+import main
+restored = []
+restore = main.HostFrontier.restore
+def recording_restore(self):
+    restored.extend(url for url, _, _ in self.store.iter_pending())
+    return restore(self)
+main.HostFrontier.restore = recording_restore
+main.main()
+before = {visited_before!r}
+print("RESULT " + json.dumps({{"restored": restored, "visited_restored": all(url in main.visited_urls for url in before)}}))
+"""
+
+
+class _Site(BaseHTTPRequestHandler):
+    """
+    /, /page1 ... /page{PAGES - 1}: page n links to pages n * FANOUT + 1 ... n * FANOUT + FANOUT.
+    """
+    protocol_version = "HTTP/1.1"
+    requests_seen = []
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/robots.txt":
+            body = b"User-agent: *\nAllow: /\n"
+        else:
+            with self.lock:
+                self.requests_seen.append(self.path)
+            n = 0 if self.path == "/" else int(self.path.replace("/page", ""))
+            links = "".join(f'<a href="/page{c}">Product {c}</a>' for c in range(n * FANOUT + 1, n * FANOUT + FANOUT + 1) if c < PAGES)
+            body = f"<html><body><p>INSAT-3D product page {n}.</p>{links}</body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def site():
+    _Site.requests_seen = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Site)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def _crawl(work_dir, host, engine, max_pages, visited_before=()):
+    script = RUNNER.format(layer1=LAYER1_DIR, target=f"http://{host}/", host=host, max_pages=max_pages,
+                           engine=engine, visited_before=list(visited_before))
+    result = subprocess.run([sys.executable, "-c", script], cwd=work_dir, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    line = next(line for line in result.stdout.splitlines() if line.startswith("RESULT "))
+    return json.loads(line[len("RESULT "):])
+
+
+def _journal(work_dir):
+    conn = sqlite3.connect(os.path.join(work_dir, "output", "frontier.db"))
+    pending = {url for (url,) in conn.execute("SELECT url FROM pending")}
+    visited = {url for (url,) in conn.execute("SELECT url FROM visited")}
+    conn.close()
+    return pending, visited
+
+
+@pytest.mark.parametrize("engine", ["threads", "asyncio"])
+def test_interrupted_crawl_resumes_without_refetching(tmp_path, site, engine):
+    if engine == "asyncio":
+        pytest.importorskip("aiohttp")
+    work_dir = str(tmp_path)
+
+    # Interrupted after STOP_AFTER pages: the rest of the frontier stays journaled
+    _crawl(work_dir, site, engine, STOP_AFTER)
+    first_run = list(_Site.requests_seen)
+    pending, visited = _journal(work_dir)
+    assert STOP_AFTER <= len(first_run) < PAGES
+    assert pending and visited >= pending
+
+    # Resumed: exactly the journaled frontier comes back, and the crawl completes
+    resumed = _crawl(work_dir, site, engine, None, visited)
+    assert set(resumed["restored"]) == pending
+    assert len(resumed["restored"]) == len(pending)
+    assert resumed["visited_restored"]
+
+    fetched = _Site.requests_seen
+    assert len(fetched) == len(set(fetched)), "a page was fetched twice"
+    assert len(fetched) == PAGES
+    assert _journal(work_dir) == (set(), set()) # Cleared once the crawl has finished
@@ -0,0 +1,23 @@
+import os
+import sys
+from urllib.parse import urljoin
+
+LAYER1_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if LAYER1_DIR not in sys.path:
+    sys.path.insert(0, LAYER1_DIR)
+
+from web_scraper.utils import normalize_url
+
+
+def test_normalize_url_canonical_form():
+    assert normalize_url("HTTPS://WWW.Mosdac.gov.in:443/Catalog/?b=2&&a=1#top") == "https://www.mosdac.gov.in/Catalog/?a=1&b=2"
+    assert normalize_url("http://www.mosdac.gov.in:80") == "http://www.mosdac.gov.in/"
+    assert normalize_url("https://www.mosdac.gov.in:8080/page") == "https://www.mosdac.gov.in:8080/page"
+
+
+def test_directory_url_keeps_its_trailing_slash_as_link_base():
+    # Links on a page are resolved against its normalized URL (WebScraper.process_page)
+    directory = normalize_url("https://www.mosdac.gov.in/catalog/")
+    assert directory == "https://www.mosdac.gov.in/catalog/"
+    assert urljoin(directory, "item.php?id=1") == "https://www.mosdac.gov.in/catalog/item.php?id=1"
+    assert urljoin(normalize_url("https://www.mosdac.gov.in/catalog/index.html"), "item.php?id=1") == "https://www.mosdac.gov.in/catalog/item.php?id=1"
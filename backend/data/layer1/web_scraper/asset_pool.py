@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import threading
+
+from web_scraper.frontier import HostFrontier
+from web_scraper.utils import normalize_url
+from web_scraper.visited_set import VisitedSet
+
+logger = logging.getLogger(__name__)
+
+class AssetPool:
+    """
+    Downloads the assets (images, scripts, stylesheets, ...) found on crawled pages in the background,
+    separately from the page workers, so a page task ends once its HTML is stored. A crawl-wide
+    seen-set makes every asset URL (normalized) download at most once per run, however many pages
+    reference it. on_result(url, status, file_type) is called after every download.
+
+    Queued assets wait in a HostFrontier that shares the crawl frontier's HostClock, so page and asset
+    fetches together keep to each host's politeness delay. At most max_queued assets wait at a time;
+    submitting more blocks the caller until there is room. After stop() (the crawl hit its page limit)
+    queued assets are dropped and new ones refused.
+    The thread-pool engine uses submit()/join(); the asyncio engine submit_async()/join_async(),
+    with max_workers downloads in flight at most either way.
+    """
+    def __init__(self, download_manager, crawl_frontier, max_workers, max_queued, on_result=None):
+        self.download_manager = download_manager
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.on_result = on_result
+        self.queue = HostFrontier(crawl_frontier.delay_for_host, clock=crawl_frontier.clock)
+        self.seen = VisitedSet() # Fingerprints of every asset URL claimed so far
+        self.downloaded = 0
+        self.duplicates = 0 # References to assets that were already claimed
+        self.dropped = 0 # Claimed assets not downloaded because the crawl stopped
+        self._stopped = False
+        self._closing = False # Set by join(): workers exit once the queue is empty
+        self._cond = threading.Condition() # Guards the state above; signals new work, free room and stop
+        self._threads = [] # Started on first use by submit()
+        self._tasks = [] # Worker tasks, started on first use by submit_async()
+        self._wakeup = None # asyncio.Event for the worker tasks, created on the running loop
+        self._room = None # asyncio.Event for submit_async() waiting on a full queue
+
+    def claim(self, url):
+        """
+        Normalizes url and records it as seen. Returns the normalized URL if it was not seen yet, else None.
+        Also used by the crawl workers for asset URLs taken from the frontier, so those are not fetched twice.
+        """
+        normalized_url = normalize_url(url)
+        if self.seen.add(normalized_url):
+            return normalized_url
+        with self._cond:
+            self.duplicates += 1
+        return None
+
+    def stop(self):
+        """
+        Drops the queued assets and refuses new ones; downloads already running finish.
+        """
+        with self._cond:
+            self._stopped = True
+            self.dropped += len(self.queue)
+            self.queue.clear()
+            self._cond.notify_all()
+        if self._wakeup is not None:
+            self._wakeup.set()
+            self._room.set()
+
+    def _finish(self, url, result):
+        status, file_type, _ = result
+        with self._cond:
+            self.downloaded += 1
+        if self.on_result:
+            self.on_result(url, status, file_type)
+
+    # --- Thread-pool engine ---
+    def submit(self, asset_urls):
+        """
+        Queues the unseen asset URLs for download on the pool's threads. Returns once they are queued,
+        which only waits if the queue is full.
+        """
+        with self._cond:
+            if not self._threads:
+                self._threads = [threading.Thread(target=self._run, name=f"asset-{i}", daemon=True) for i in range(self.max_workers)]
+                for thread in self._threads:
+                    thread.start()
+        for url in asset_urls:
+            normalized_url = self.claim(url)
+            if normalized_url is None:
+                continue
+            with self._cond:
+                while len(self.queue) >= self.max_queued and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    self.dropped += 1
+                    continue
+                self.queue.push(normalized_url, 0)
+                self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped:
+                        return
+                    item = self.queue.pop_ready()
+                    if item is not None:
+                        self._cond.notify_all() # Room for a blocked submit()
+                        break
+                    if self._closing and not len(self.queue):
+                        return
+                    self._cond.wait(self.queue.seconds_until_ready()) # Until the next host is eligible, or new work
+            url = item[0]
+            try:
+                self._finish(url, self.download_manager.download_file(url))
+            except Exception as e:
+                logger.error(f"Asset download of {url} failed: {e}", exc_info=True)
+
+    def join(self):
+        """
+        Waits until every queued download has finished (or, after stop(), every running one), then ends the threads.
+        """
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join()
+        self._log_summary()
+
+    # --- Asyncio engine ---
+    async def submit_async(self, asset_urls, fetcher):
+        """
+        submit() for the asyncio engine: queues the unseen asset URLs for the pool's worker tasks on
+        the running loop, which download them through fetcher.
+        """
+        if not self._tasks:
+            self._wakeup = asyncio.Event()
+            self._room = asyncio.Event()
+            self._tasks = [asyncio.create_task(self._run_async(fetcher)) for _ in range(self.max_workers)]
+        for url in asset_urls:
+            normalized_url = self.claim(url)
+            if normalized_url is None:
+                continue
+            while len(self.queue) >= self.max_queued and not self._stopped:
+                self._room.clear()
+                await self._room.wait()
+            if self._stopped:
+                self.dropped += 1
+                continue
+            self.queue.push(normalized_url, 0)
+            self._wakeup.set()
+
+    async def _run_async(self, fetcher):
+        while not self._stopped:
+            item = self.queue.pop_ready()
+            if item is None:
+                if self._closing and not len(self.queue):
+                    return
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.queue.seconds_until_ready())
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            self._room.set()
+            url = item[0]
+            try:
+                self._finish(url, await self.download_manager.download_file_async(url, fetcher))
+            except Exception as e:
+                logger.error(f"Asset download of {url} failed: {e}", exc_info=True)
+
+    async def join_async(self):
+        """
+        join() for the asyncio engine. Call it before the fetcher is closed.
+        """
+        self._closing = True
+        tasks, self._tasks = self._tasks, []
+        if tasks:
+            self._wakeup.set()
+            await asyncio.gather(*tasks)
+        self._log_summary()
+
+    def _log_summary(self):
+        if self.downloaded or self.duplicates or self.dropped:
+            logger.info(f"Asset pool: {self.downloaded} assets downloaded, {self.duplicates} repeated references skipped, "
+                        f"{self.dropped} dropped when the crawl stopped.")
@@ -0,0 +1,96 @@
+import asyncio
+import hashlib
+import logging
+from urllib.parse import urlparse
+
+# Conditional import for the asyncio crawl engine
+try:
+    import aiohttp
+    _AIOHTTP_AVAILABLE = True
+except ImportError:
+    _AIOHTTP_AVAILABLE = False
+
+from config import USER_AGENT
+
+logger = logging.getLogger(__name__)
+
+class FetchHTTPError(Exception):
+    """Raised for 4xx/5xx responses, like requests' HTTPError."""
+    def __init__(self, status, reason):
+        super().__init__(f"{status} {reason}")
+        self.status = status
+        self.reason = reason
+
+class FetchError(Exception):
+    """Raised for connection errors and timeouts (no HTTP status)."""
+
+class AsyncFetcher:
+    """
+    aiohttp client shared by every task of the asyncio crawl engine. The connector caps the total
+    number of open connections and a semaphore per host caps concurrent requests to each host.
+    Use as an async context manager.
+    """
+    def __init__(self, max_connections, max_connections_per_host, timeout=10):
+        if not _AIOHTTP_AVAILABLE:
+            raise RuntimeError("aiohttp is not installed; the asyncio crawl engine is unavailable.")
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.session = None
+        self._host_semaphores = {}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=0)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers={'User-Agent': USER_AGENT},
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+        self.session = None
+
+    def _host_semaphore(self, url):
+        host = urlparse(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return self._host_semaphores[host]
+
+    async def get_page(self, url, headers):
+        """
+        Fetches a page. Returns (http_status, text, etag, last_modified); text is "" for a 304.
+        """
+        try:
+            async with self._host_semaphore(url):
+                async with self.session.get(url, headers=headers) as response:
+                    if response.status >= 400:
+                        raise FetchHTTPError(response.status, response.reason)
+                    text = "" if response.status == 304 else await response.text(errors="replace")
+                    return response.status, text, response.headers.get('ETag'), response.headers.get('Last-Modified')
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise FetchError(f"{type(e).__name__}: {e}") from e
+
+    async def download(self, url, headers, part_path, chunk_size=8192):
+        """
+        Streams a file to part_path. Returns (http_status, etag, last_modified, md5, size);
+        nothing is written for a 304, in which case md5 is None.
+        """
+        try:
+            async with self._host_semaphore(url):
+                async with self.session.get(url, headers=headers) as response:
+                    if response.status == 304:
+                        return response.status, None, None, None, 0
+                    if response.status >= 400:
+                        raise FetchHTTPError(response.status, response.reason)
+                    total_size = 0
+                    hasher = hashlib.md5()
+                    with open(part_path, 'wb') as f:
+                        async for chunk in response.content.iter_chunked(chunk_size):
+                            f.write(chunk)
+                            hasher.update(chunk)
+                            total_size += len(chunk)
+                    return response.status, response.headers.get('ETag'), response.headers.get('Last-Modified'), hasher.hexdigest(), total_size
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise FetchError(f"{type(e).__name__}: {e}") from e
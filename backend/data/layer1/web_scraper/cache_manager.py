@@ -1,15 +1,42 @@
+import time
+import queue
 import sqlite3
 import logging
 from datetime import datetime
 import threading
 
+from web_scraper.utils import url_fingerprint
+
 logger = logging.getLogger(__name__)
 
+METADATA_COLUMNS = ("last_crawled", "md5_hash", "etag", "last_modified", "content_type", "http_status", "language")
+GET_MANY_CHUNK_SIZE = 500 # URLs per "WHERE url IN (...)" query, below SQLite's bound-parameter limit
+
 class CacheManager:
-    def __init__(self, db_path: str):
+    """
+    SQLite cache of crawled URL metadata. By default every update_metadata() is its own committed
+    transaction. With write_behind=True the database runs in WAL mode and updates are queued to a
+    writer thread that commits them in batches (write_batch_size rows, or after write_flush_seconds);
+    get_metadata() answers from the queued rows first, so a thread always reads its own writes.
+    flush() waits for the queue to be written, and close() flushes.
+    After preload(), lookups are answered from an in-memory index of every row (keyed by URL
+    fingerprint) that update_metadata() keeps current, without touching SQLite.
+    """
+    def __init__(self, db_path: str, write_behind: bool = False, write_batch_size: int = 500, write_flush_seconds: float = 1.0):
         self.db_path = db_path
         self._local = threading.local()
+        self.write_behind = write_behind
+        self.write_batch_size = write_batch_size
+        self.write_flush_seconds = write_flush_seconds
+        self._unwritten = {} # url -> metadata row queued but not yet committed (write-behind mode)
+        self._unwritten_lock = threading.Lock()
+        self._write_queue = queue.Queue()
+        self._writer = None
+        self._index = None # url_fingerprint -> metadata row, once preload() has run
         self._initialize_db()
+        if self.write_behind:
+            self._writer = threading.Thread(target=self._write_loop, name="cache-writer", daemon=True)
+            self._writer.start()
 
     def _get_db_connection(self):
         if not hasattr(self._local, 'conn'):
@@ -33,6 +60,8 @@ class CacheManager:
                     language TEXT       -- NEW COLUMN
                 )
             ''')
+            if self.write_behind:
+                cursor.execute("PRAGMA journal_mode=WAL").fetchone() # Readers do not block the writer thread (persists in the DB file)
             conn.commit()
             logger.info(f"Database initialized at {self.db_path}")
         except sqlite3.Error as e:
@@ -43,24 +72,106 @@ class CacheManager:
         Updates the metadata for a given URL in the cache.
         If the URL does not exist, a new entry is created.
         """
+        row = (last_crawled, md5_hash, etag, last_modified, content_type, http_status, language)
+        if self._index is not None:
+            self._index[url_fingerprint(url)] = row
+        if self.write_behind:
+            with self._unwritten_lock:
+                self._unwritten[url] = row
+            self._write_queue.put((url, row))
+            return
         conn, cursor = self._get_db_connection()
         try:
             cursor.execute('''
                 INSERT OR REPLACE INTO crawled_urls
                 (url, last_crawled, md5_hash, etag, last_modified, content_type, http_status, language)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (url, last_crawled, md5_hash, etag, last_modified, content_type, http_status, language))
+            ''', (url,) + row)
             conn.commit()
             logger.debug(f"Updated cache for {url} with status {http_status}")
         except sqlite3.Error as e:
             logger.error(f"Error updating metadata for {url}: {e}")
             conn.rollback()
 
+    def _write_loop(self):
+        """
+        Writer thread of write-behind mode: commits queued updates in batches until close() sends None.
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA synchronous=NORMAL") # Safe with WAL: a crash can lose the last commits, never corrupt the DB
+        running = True
+        while running:
+            batch = [self._write_queue.get()]
+            deadline = time.monotonic() + self.write_flush_seconds
+            while len(batch) < self.write_batch_size and batch[-1] is not None:
+                try:
+                    batch.append(self._write_queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                running = False
+            rows = [item for item in batch if item is not None]
+            if rows:
+                try:
+                    with conn:
+                        conn.executemany('''
+                            INSERT OR REPLACE INTO crawled_urls
+                            (url, last_crawled, md5_hash, etag, last_modified, content_type, http_status, language)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        ''', [(url,) + row for url, row in rows])
+                    logger.debug(f"Committed {len(rows)} cache updates")
+                except sqlite3.Error as e:
+                    logger.error(f"Error writing {len(rows)} cache updates: {e}")
+                with self._unwritten_lock:
+                    for url, row in rows:
+                        if self._unwritten.get(url) is row: # Not superseded by a newer queued update
+                            del self._unwritten[url]
+            for _ in batch:
+                self._write_queue.task_done()
+        conn.close()
+
+    def flush(self):
+        """
+        Blocks until every queued update has been committed (write-behind mode).
+        """
+        if self._writer is not None:
+            self._write_queue.join()
+
+    def preload(self):
+        """
+        Loads every cached row into the in-memory index with one table scan. Returns the number of rows.
+        """
+        started = time.perf_counter()
+        self.flush()
+        conn, cursor = self._get_db_connection()
+        index = {}
+        shared_values = {} # content_type / language strings repeat on almost every row: keep one copy
+        try:
+            cursor.execute('SELECT url, last_crawled, md5_hash, etag, last_modified, content_type, http_status, language FROM crawled_urls')
+            for url, last_crawled, md5_hash, etag, last_modified, content_type, http_status, language in cursor:
+                content_type = shared_values.setdefault(content_type, content_type)
+                language = shared_values.setdefault(language, language)
+                index[url_fingerprint(url)] = (last_crawled, md5_hash, etag, last_modified, content_type, http_status, language)
+        except sqlite3.Error as e:
+            logger.error(f"Error preloading the cache index: {e}. Lookups will query the database.")
+            return 0
+        self._index = index
+        logger.info(f"Preloaded {len(index)} cache entries in {time.perf_counter() - started:.2f}s")
+        return len(index)
+
     def get_metadata(self, url: str) -> dict | None:
         """
         Retrieves metadata for a given URL from the cache.
         Returns a dictionary of metadata including http_status and language, or None if not found.
         """
+        if self._index is not None:
+            row = self._index.get(url_fingerprint(url))
+            return dict(zip(METADATA_COLUMNS, row)) if row else None
+        if self.write_behind:
+            with self._unwritten_lock:
+                row = self._unwritten.get(url)
+            if row is not None:
+                return dict(zip(METADATA_COLUMNS, row))
         conn, cursor = self._get_db_connection()
         try:
             cursor.execute('SELECT last_crawled, md5_hash, etag, last_modified, content_type, http_status, language FROM crawled_urls WHERE url = ?', (url,))
@@ -80,7 +191,42 @@ class CacheManager:
             logger.error(f"Error retrieving metadata for {url}: {e}")
             return None
 
+    def get_many(self, urls) -> dict:
+        """
+        get_metadata() for many URLs at once: returns {url: metadata dict} for the URLs found in the cache,
+        from the in-memory index or with one query per GET_MANY_CHUNK_SIZE URLs.
+        """
+        found = {}
+        if self._index is not None:
+            for url in urls:
+                row = self._index.get(url_fingerprint(url))
+                if row:
+                    found[url] = dict(zip(METADATA_COLUMNS, row))
+            return found
+        urls = list(dict.fromkeys(urls))
+        if self.write_behind: # Queued rows first, as in get_metadata()
+            with self._unwritten_lock:
+                for url in urls:
+                    row = self._unwritten.get(url)
+                    if row is not None:
+                        found[url] = dict(zip(METADATA_COLUMNS, row))
+            urls = [url for url in urls if url not in found]
+        conn, cursor = self._get_db_connection()
+        try:
+            for start in range(0, len(urls), GET_MANY_CHUNK_SIZE):
+                chunk = urls[start:start + GET_MANY_CHUNK_SIZE]
+                cursor.execute(f'SELECT url, last_crawled, md5_hash, etag, last_modified, content_type, http_status, language FROM crawled_urls WHERE url IN ({",".join("?" * len(chunk))})', chunk)
+                for row in cursor.fetchall():
+                    found[row[0]] = dict(zip(METADATA_COLUMNS, row[1:]))
+        except sqlite3.Error as e:
+            logger.error(f"Error retrieving metadata for {len(urls)} URLs: {e}")
+        return found
+
     def close(self):
+        if self._writer is not None:
+            self._write_queue.put(None)
+            self._writer.join()
+            self._writer = None
         if hasattr(self._local, 'conn') and self._local.conn:
             self._local.conn.close()
             logger.debug(f"Closed SQLite connection for thread {threading.get_ident()}")
\ No newline at end of file
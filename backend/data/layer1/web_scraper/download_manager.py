@@ -7,6 +7,7 @@ import mimetypes
 from datetime import datetime
 
 from web_scraper.utils import compute_md5
+from web_scraper.async_fetcher import FetchHTTPError, FetchError
 from config import USER_AGENT # OUTPUT_DIR is imported via self.output_base_dir
 
 logger = logging.getLogger(__name__)
@@ -18,29 +19,14 @@ class DownloadManager:
         self.session = requests.Session()
         self.session.headers.update({'User-Agent': USER_AGENT})
 
-    def download_file(self, url):
+    def _prepare_target(self, url):
         """
-        Downloads a file (e.g., PDF, image) if it's new or modified.
-        Saves it to a structured path within the output directory.
-        Returns a tuple (status_string, file_type, http_status_code) for logging.
+        Works out where an asset is saved: returns (file_path, file_type), with file_path made unique
+        by a counter suffix if a file already exists there.
         """
-        status = "SKIPPED"
-        file_type = "UNKNOWN"
-        http_status_code = None # Initialize http_status_code
-        downloaded_md5 = None # Initialize MD5 for potential cache update
-
-        # --- FIX: Initialize etag and last_modified ---
-        etag = None
-        last_modified = None
-        # --- END FIX ---
-
         parsed_url = urlparse(url)
-        if not parsed_url.netloc:
-            logger.debug(f"Skipping download, invalid URL: {url}")
-            return "INVALID_URL", file_type, 0 # 0 for invalid/non-HTTP status
-
         path_without_query = parsed_url.path.split('?')[0].split('#')[0]
-        
+
         extension = os.path.splitext(path_without_query)[1].lower()
         if extension:
             mime_type = mimetypes.guess_type(path_without_query)[0]
@@ -51,7 +37,7 @@ class DownloadManager:
         file_type = mime_type if mime_type else "application/octet-stream"
 
         path_segments = [seg for seg in parsed_url.path.split('/') if seg]
-        
+
         if not path_segments or not os.path.splitext(path_segments[-1])[1]:
             # If no clear filename in path, use MD5 hash of URL as filename
             filename_base = hashlib.md5(url.encode()).hexdigest()
@@ -72,38 +58,80 @@ class DownloadManager:
         while os.path.exists(file_path):
             counter += 1
             file_path = f"{original_file_path_base}_{counter}{original_file_path_ext}"
+        return file_path, file_type
+
+    def _conditional_headers(self, cached_metadata):
+        headers = {'User-Agent': USER_AGENT}
+        if cached_metadata:
+            if cached_metadata.get('etag'):
+                headers['If-None-Match'] = cached_metadata['etag']
+            if cached_metadata.get('last_modified'):
+                headers['If-Modified-Since'] = cached_metadata['last_modified']
+        return headers
+
+    def _finish_download(self, url, file_path, cached_metadata, downloaded_md5, total_size):
+        """
+        Moves a completed ".part" download into place unless its content matches the cache. Returns the status string.
+        """
+        if cached_metadata and cached_metadata.get('md5_hash') == downloaded_md5:
+            logger.debug(f"File content unchanged: {url}")
+            os.remove(file_path + ".part") # Remove temp file
+            return "SKIPPED_SAME_CONTENT"
+        os.rename(file_path + ".part", file_path) # Rename temp file to final name
+        if not cached_metadata:
+            logger.info(f"Downloaded new file: {url} to {file_path}. Size: {total_size} bytes")
+            return "NEWLY_DOWNLOADED"
+        logger.info(f"Updated modified file: {url} to {file_path}. Size: {total_size} bytes")
+        return "MODIFIED"
+
+    def _record_download(self, url, cached_metadata, downloaded_md5, etag, last_modified, file_type, http_status_code):
+        """
+        Updates the cache entry of a download, keeping the cached MD5/ETag/Last-Modified where this attempt has none.
+        """
+        self.cache_manager.update_metadata(
+            url=url,
+            last_crawled=datetime.now().isoformat(),
+            md5_hash=downloaded_md5 if downloaded_md5 else (cached_metadata.get('md5_hash') if cached_metadata else None),
+            etag=etag if etag else (cached_metadata.get('etag') if cached_metadata else None),
+            last_modified=last_modified if last_modified else (cached_metadata.get('last_modified') if cached_metadata else None),
+            content_type=file_type,
+            http_status=http_status_code
+        )
+
+    def download_file(self, url):
+        """
+        Downloads a file (e.g., PDF, image) if it's new or modified.
+        Saves it to a structured path within the output directory.
+        Returns a tuple (status_string, file_type, http_status_code) for logging.
+        """
+        status = "SKIPPED"
+        file_type = "UNKNOWN"
+        http_status_code = None # Initialize http_status_code
+        downloaded_md5 = None # Initialize MD5 for potential cache update
+        etag = None
+        last_modified = None
+        cached_metadata = None
+
+        if not urlparse(url).netloc:
+            logger.debug(f"Skipping download, invalid URL: {url}")
+            return "INVALID_URL", file_type, 0 # 0 for invalid/non-HTTP status
+
+        file_path, file_type = self._prepare_target(url)
 
         try:
             cached_metadata = self.cache_manager.get_metadata(url)
-            is_modified = True # Assume modified until proven otherwise by 304 or content hash
-
-            headers = {'User-Agent': USER_AGENT}
+            headers = self._conditional_headers(cached_metadata)
             if cached_metadata:
                 etag = cached_metadata.get('etag')
                 last_modified = cached_metadata.get('last_modified')
-                if etag:
-                    headers['If-None-Match'] = etag
-                if last_modified:
-                    headers['If-Modified-Since'] = last_modified
 
             response = self.session.get(url, headers=headers, stream=True, timeout=10)
             http_status_code = response.status_code
 
             if response.status_code == 304: # Not Modified
                 status = "SKIPPED_NOT_MODIFIED"
-                is_modified = False
                 logger.debug(f"File not modified: {url}")
-                downloaded_md5 = cached_metadata.get('md5_hash') # Retain old MD5
-                # Update last_crawled time even if not modified
-                self.cache_manager.update_metadata(
-                    url=url,
-                    last_crawled=datetime.now().isoformat(),
-                    md5_hash=downloaded_md5,
-                    etag=etag,
-                    last_modified=last_modified,
-                    content_type=file_type,
-                    http_status=http_status_code
-                )
+                downloaded_md5 = cached_metadata.get('md5_hash') # Retain old MD5; last_crawled is updated in finally
                 return status, file_type, http_status_code
 
             response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
@@ -120,33 +148,9 @@ class DownloadManager:
                         f.write(chunk)
                         hasher.update(chunk)
                         total_size += len(chunk)
-            
-            downloaded_md5 = hasher.hexdigest()
 
-            if cached_metadata and cached_metadata.get('md5_hash') == downloaded_md5:
-                status = "SKIPPED_SAME_CONTENT"
-                is_modified = False
-                logger.debug(f"File content unchanged: {url}")
-                os.remove(file_path + ".part") # Remove temp file
-            else:
-                os.rename(file_path + ".part", file_path) # Rename temp file to final name
-                if not cached_metadata:
-                    status = "NEWLY_DOWNLOADED"
-                    logger.info(f"Downloaded new file: {url} to {file_path}. Size: {total_size} bytes")
-                else:
-                    status = "MODIFIED"
-                    logger.info(f"Updated modified file: {url} to {file_path}. Size: {total_size} bytes")
-
-            # Update cache after successful download or confirmed unchanged
-            self.cache_manager.update_metadata(
-                url=url,
-                last_crawled=datetime.now().isoformat(),
-                md5_hash=downloaded_md5,
-                etag=etag,
-                last_modified=last_modified,
-                content_type=file_type,
-                http_status=http_status_code
-            )
+            downloaded_md5 = hasher.hexdigest()
+            status = self._finish_download(url, file_path, cached_metadata, downloaded_md5, total_size)
             return status, file_type, http_status_code
 
         except requests.exceptions.RequestException as e:
@@ -163,15 +167,65 @@ class DownloadManager:
         finally:
             if os.path.exists(file_path + ".part"):
                 os.remove(file_path + ".part") # Clean up partial downloads
-            
-            # Ensure metadata is always updated with the final status code
-            self.cache_manager.update_metadata(
-                url=url,
-                last_crawled=datetime.now().isoformat(),
-                md5_hash=downloaded_md5 if downloaded_md5 else (cached_metadata.get('md5_hash') if cached_metadata else None),
-                etag=etag if etag else (cached_metadata.get('etag') if cached_metadata else None),
-                last_modified=last_modified if last_modified else (cached_metadata.get('last_modified') if cached_metadata else None),
-                content_type=file_type,
-                http_status=http_status_code
-            )
-            return status, file_type, http_status_code
\ No newline at end of file
+
+            # The one cache update of every attempt, with the final status code
+            self._record_download(url, cached_metadata, downloaded_md5, etag, last_modified, file_type, http_status_code)
+            return status, file_type, http_status_code
+
+    async def download_file_async(self, url, fetcher):
+        """
+        download_file for the asyncio crawl engine, fetching through an AsyncFetcher.
+        Same on-disk layout, cache updates and return value as download_file.
+        """
+        status = "SKIPPED"
+        file_type = "UNKNOWN"
+        http_status_code = None
+        downloaded_md5 = None
+        etag = None
+        last_modified = None
+        cached_metadata = None
+
+        if not urlparse(url).netloc:
+            logger.debug(f"Skipping download, invalid URL: {url}")
+            return "INVALID_URL", file_type, 0
+
+        file_path, file_type = self._prepare_target(url)
+
+        try:
+            cached_metadata = self.cache_manager.get_metadata(url)
+            headers = self._conditional_headers(cached_metadata)
+            if cached_metadata:
+                etag = cached_metadata.get('etag')
+                last_modified = cached_metadata.get('last_modified')
+
+            http_status_code, response_etag, response_last_modified, md5, total_size = await fetcher.download(url, headers, file_path + ".part")
+
+            if http_status_code == 304: # Not Modified
+                status = "SKIPPED_NOT_MODIFIED"
+                logger.debug(f"File not modified: {url}")
+                downloaded_md5 = cached_metadata.get('md5_hash') # Retain old MD5; last_crawled is updated in finally
+                return status, file_type, http_status_code
+
+            etag, last_modified, downloaded_md5 = response_etag, response_last_modified, md5
+            status = self._finish_download(url, file_path, cached_metadata, downloaded_md5, total_size)
+            return status, file_type, http_status_code
+
+        except FetchHTTPError as e:
+            logger.error(f"HTTP/Network error downloading {url}: {e}")
+            status = "FAILED_HTTP_ERROR"
+            http_status_code = e.status
+        except FetchError as e:
+            logger.error(f"HTTP/Network error downloading {url}: {e}")
+            status = "FAILED_HTTP_ERROR"
+            http_status_code = 0
+        except Exception as e:
+            logger.error(f"An unexpected error occurred downloading {url}: {e}", exc_info=True)
+            status = "FAILED_GENERIC_ERROR"
+            http_status_code = 0
+        finally:
+            if os.path.exists(file_path + ".part"):
+                os.remove(file_path + ".part") # Clean up partial downloads
+
+            # The one cache update of every attempt, with the final status code
+            self._record_download(url, cached_metadata, downloaded_md5, etag, last_modified, file_type, http_status_code)
+        return status, file_type, http_status_code
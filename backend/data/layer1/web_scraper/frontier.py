@@ -0,0 +1,237 @@
+import time
+import heapq
+import sqlite3
+import threading
+import itertools
+
+from web_scraper.utils import get_domain
+
+class FrontierStore:
+    """
+    SQLite journal of the crawl frontier: a pending table (url, depth, priority) of URLs queued but
+    not yet finished, and a visited table of every URL ever queued. Writes are buffered and
+    committed in batches (every batch_size operations or flush_seconds), each batch in one
+    transaction, so a killed crawl loses at most the last batch and resumes from a consistent state.
+    """
+    def __init__(self, db_path, batch_size=1000, flush_seconds=1.0):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._added = [] # (url, depth, priority) not yet written
+        self._done = [] # (url,) not yet deleted from pending
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS pending (
+                    seq INTEGER PRIMARY KEY, -- Insertion order, for FIFO among equal priorities
+                    url TEXT UNIQUE NOT NULL,
+                    depth INTEGER NOT NULL,
+                    priority INTEGER NOT NULL
+                )
+            ''')
+            self.conn.execute("CREATE TABLE IF NOT EXISTS visited (url TEXT PRIMARY KEY)")
+
+    def add(self, url, depth, priority):
+        with self._lock:
+            self._added.append((url, depth, priority))
+            self._flush_if_due()
+
+    def mark_done(self, url):
+        with self._lock:
+            self._done.append((url,))
+            self._flush_if_due()
+
+    def _flush_if_due(self):
+        if len(self._added) + len(self._done) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_seconds:
+            self._flush()
+
+    def _flush(self):
+        # A URL's add always comes before its done (URLs are only queued once), so adds go first
+        with self.conn:
+            if self._added:
+                self.conn.executemany("INSERT OR IGNORE INTO visited (url) VALUES (?)", ((url,) for url, _, _ in self._added))
+                self.conn.executemany("INSERT OR IGNORE INTO pending (url, depth, priority) VALUES (?, ?, ?)", self._added)
+            if self._done:
+                self.conn.executemany("DELETE FROM pending WHERE url = ?", self._done)
+        self._added = []
+        self._done = []
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def pending_count(self):
+        self.flush()
+        return self.conn.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+
+    def iter_pending(self):
+        """
+        Yields (url, depth, priority) of every pending URL, in queueing order.
+        """
+        self.flush()
+        yield from self.conn.execute("SELECT url, depth, priority FROM pending ORDER BY seq")
+
+    def iter_visited(self):
+        self.flush()
+        for (url,) in self.conn.execute("SELECT url FROM visited"):
+            yield url
+
+    def reset(self):
+        """
+        Forgets the stored frontier, e.g. once a crawl has finished or when starting over.
+        """
+        with self._lock:
+            self._added = []
+            self._done = []
+            with self.conn:
+                self.conn.execute("DELETE FROM pending")
+                self.conn.execute("DELETE FROM visited")
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+class HostClock:
+    """
+    Next-allowed-fetch time per host, shared by everything that fetches from the crawled hosts
+    (the page frontier, asset downloads), so together they never go faster than delay_for_host(host).
+    Thread-safe.
+    """
+    def __init__(self, delay_for_host):
+        self.delay_for_host = delay_for_host # host -> minimum seconds between two fetches from it
+        self._next_allowed = {} # host -> time.monotonic() of its next allowed fetch
+        self._lock = threading.Lock()
+
+    def next_allowed(self, host):
+        with self._lock:
+            return self._next_allowed.get(host, 0.0)
+
+    def try_claim(self, host, now):
+        """
+        Takes the host's fetch slot if it is free at now (the host's delay starts now). Returns whether it was.
+        """
+        with self._lock:
+            if self._next_allowed.get(host, 0.0) > now:
+                return False
+            self._next_allowed[host] = now + self.delay_for_host(host)
+            return True
+
+    def reserve(self, host):
+        """
+        Books the host's next free fetch slot and returns the seconds to wait for it (0 if it is free now).
+        For callers that wait themselves instead of being scheduled, e.g. inline asset downloads.
+        """
+        now = time.monotonic()
+        with self._lock:
+            start = max(now, self._next_allowed.get(host, 0.0))
+            self._next_allowed[host] = start + self.delay_for_host(host)
+        return start - now
+
+
+class HostFrontier:
+    """
+    Crawl frontier with per-host politeness. URLs are queued per host, and each host has a
+    next-allowed-fetch time: a URL is only handed out once its host's delay since the previous
+    fetch has passed. pop_ready() returns a URL from any host that is eligible right now, so
+    workers move on to other hosts instead of sleeping. Within a host, lower priority values
+    (by default the depth) come first, then queueing order. With a FrontierStore every queued URL
+    is journaled until done() is called for it, so an interrupted crawl can be restored.
+    The next-allowed times live in a HostClock; pass clock to share one with other fetchers. Thread-safe.
+    """
+    def __init__(self, delay_for_host, store=None, clock=None):
+        self.clock = clock if clock is not None else HostClock(delay_for_host)
+        self.delay_for_host = self.clock.delay_for_host # host -> minimum seconds between two fetches from it
+        self.store = store
+        self._queues = {} # host -> heap of (priority, seq, url, depth)
+        self._ready_heap = [] # (next allowed time, host), one entry per host with queued URLs. May be early if
+                              # another user of the clock fetched from the host since; pop_ready() re-queues those
+        self._seq = itertools.count()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def _enqueue(self, url, depth, priority):
+        host = get_domain(url)
+        queue = self._queues.get(host)
+        if queue is None:
+            queue = self._queues[host] = []
+        if not queue:
+            heapq.heappush(self._ready_heap, (self.clock.next_allowed(host), host))
+        heapq.heappush(queue, (priority, next(self._seq), url, depth))
+        self._size += 1
+
+    def push(self, url, depth, priority=None):
+        if priority is None:
+            priority = depth
+        with self._lock:
+            self._enqueue(url, depth, priority)
+        if self.store is not None:
+            self.store.add(url, depth, priority)
+
+    def restore(self):
+        """
+        Re-queues the pending URLs of the store (without journaling them again). Returns how many were restored.
+        """
+        restored = 0
+        with self._lock:
+            for url, depth, priority in self.store.iter_pending():
+                self._enqueue(url, depth, priority)
+                restored += 1
+        return restored
+
+    def pop_ready(self):
+        """
+        Returns (url, depth) from a host that may be fetched now, or None if every host with queued
+        URLs is still waiting out its delay (or the frontier is empty). The host's delay starts now.
+        """
+        now = time.monotonic()
+        with self._lock:
+            while self._ready_heap and self._ready_heap[0][0] <= now:
+                _, host = heapq.heappop(self._ready_heap)
+                if not self.clock.try_claim(host, now):
+                    # The host was fetched from elsewhere (e.g. an asset download) since it was queued
+                    heapq.heappush(self._ready_heap, (self.clock.next_allowed(host), host))
+                    continue
+                queue = self._queues[host]
+                _, _, url, depth = heapq.heappop(queue)
+                self._size -= 1
+                if queue:
+                    heapq.heappush(self._ready_heap, (self.clock.next_allowed(host), host))
+                else:
+                    del self._queues[host]
+                return url, depth
+            return None
+
+    def done(self, url):
+        """
+        Marks a popped URL as finished. Call it after the URLs found on it have been pushed, so a
+        restored frontier never misses them.
+        """
+        if self.store is not None:
+            self.store.mark_done(url)
+
+    def seconds_until_ready(self):
+        """
+        Seconds until pop_ready() can return a URL: 0 if one is ready now, None if the frontier is empty.
+        """
+        with self._lock:
+            if not self._ready_heap:
+                return None
+            return max(0.0, self._ready_heap[0][0] - time.monotonic())
+
+    def clear(self):
+        """
+        Drops the queued URLs from memory. The store keeps them, so they are restored on resume.
+        """
+        with self._lock:
+            self._queues.clear()
+            self._ready_heap.clear()
+            self._size = 0
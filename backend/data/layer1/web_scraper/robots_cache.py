@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import threading
+import requests
+from urllib import robotparser
+from urllib.parse import urlparse
+
+from web_scraper.async_fetcher import FetchHTTPError, FetchError
+
+logger = logging.getLogger(__name__)
+
+class RobotsCache:
+    """
+    robots.txt rules per host, fetched once on the first URL seen for that host.
+    Gives both the allow/disallow check and the host's politeness delay (Crawl-delay / Request-rate).
+    The asyncio engine loads the rules of new hosts with load_async() first, so can_fetch() never
+    blocks its event loop on a robots.txt request.
+    """
+    def __init__(self, user_agent, default_delay=0.0, timeout=10):
+        self.user_agent = user_agent
+        self.default_delay = default_delay # Used when robots.txt asks for no (or a shorter) delay
+        self.timeout = timeout
+        self._parsers = {} # host -> RobotFileParser
+        self._lock = threading.Lock()
+        self._async_loads = {} # host -> task loading its robots.txt through an AsyncFetcher
+
+    @staticmethod
+    def _robots_url(parsed):
+        return f"{parsed.scheme or 'https'}://{parsed.netloc}/robots.txt"
+
+    def _parse(self, robots_url, http_status, text):
+        rp = robotparser.RobotFileParser(robots_url)
+        if http_status in (401, 403):
+            rp.disallow_all = True # Same rules as RobotFileParser.read()
+        elif http_status >= 400:
+            rp.allow_all = True
+        else:
+            rp.parse(text.splitlines())
+        logger.info(f"Loaded robots.txt from: {robots_url} (HTTP {http_status})")
+        return rp
+
+    def _unreachable(self, robots_url, error):
+        logger.warning(f"Could not load {robots_url}: {error}. Proceeding without robots.txt rules for this host.")
+        rp = robotparser.RobotFileParser(robots_url)
+        rp.allow_all = True
+        return rp
+
+    def _fetch(self, robots_url):
+        try:
+            response = requests.get(robots_url, headers={'User-Agent': self.user_agent}, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            return self._unreachable(robots_url, e)
+        return self._parse(robots_url, response.status_code, response.text)
+
+    async def _fetch_async(self, host, robots_url, fetcher):
+        try:
+            http_status, text, _, _ = await fetcher.get_page(robots_url, {})
+            rp = self._parse(robots_url, http_status, text)
+        except FetchHTTPError as e:
+            rp = self._parse(robots_url, e.status, "")
+        except FetchError as e:
+            rp = self._unreachable(robots_url, e)
+        with self._lock:
+            self._parsers.setdefault(host, rp)
+
+    async def load_async(self, urls, fetcher):
+        """
+        Loads the robots.txt rules of the hosts of urls that are not loaded yet through fetcher (an
+        AsyncFetcher). Concurrent calls share one request per host.
+        """
+        loads = {}
+        for url in urls:
+            parsed = urlparse(url)
+            host = parsed.netloc
+            with self._lock:
+                if host in self._parsers:
+                    continue
+            if host not in self._async_loads:
+                task = asyncio.ensure_future(self._fetch_async(host, self._robots_url(parsed), fetcher))
+                task.add_done_callback(lambda _, host=host: self._async_loads.pop(host, None))
+                self._async_loads[host] = task
+            loads[host] = self._async_loads[host]
+        if loads:
+            await asyncio.gather(*loads.values())
+
+    def _parser(self, url):
+        parsed = urlparse(url)
+        host = parsed.netloc
+        with self._lock:
+            rp = self._parsers.get(host)
+        if rp is None:
+            rp = self._fetch(self._robots_url(parsed))
+            with self._lock:
+                rp = self._parsers.setdefault(host, rp)
+        return rp
+
+    def can_fetch(self, url):
+        return self._parser(url).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, host):
+        """
+        Minimum seconds between two fetches from host: the larger of default_delay and what its
+        robots.txt asks for. Hosts whose robots.txt has not been loaded get default_delay.
+        """
+        with self._lock:
+            rp = self._parsers.get(host)
+        delay = self.default_delay
+        if rp is None:
+            return delay
+        crawl_delay = rp.crawl_delay(self.user_agent)
+        if crawl_delay:
+            delay = max(delay, float(crawl_delay))
+        request_rate = rp.request_rate(self.user_agent)
+        if request_rate and request_rate.requests:
+            delay = max(delay, request_rate.seconds / request_rate.requests)
+        return delay
@@ -1,5 +1,5 @@
 import hashlib
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlsplit, urlunsplit
 import os # Added for os.path.splitext
 
 def compute_md5(data):
@@ -69,23 +69,28 @@ def is_downloadable_asset(url):
     
     return False
 
+DEFAULT_PORTS = {'http': ':80', 'https': ':443'}
+
 def normalize_url(url):
     """
-    Normalizes a URL by removing fragments and sorting query parameters.
-    Ensures consistency for visited_urls set.
+    Canonical form of a URL, shared by the crawl frontier, the visited set and the cache keys:
+    lowercase scheme and host, default port dropped, '/' for an empty path, empty query parameters
+    dropped and the rest sorted, fragment removed. A trailing slash is kept: the result is also the base
+    relative links are resolved against, and "catalog/" and "catalog" resolve them differently.
     """
-    parsed = urlparse(url)
-    # Remove fragment
-    clean_url = parsed._replace(fragment="").geturl()
-    
-    # Sort query parameters
-    parsed_clean = urlparse(clean_url)
-    query_params = parsed_clean.query.split('&')
-    if query_params and query_params[0]: # Check if query exists and is not empty string
-        query_params.sort()
-        normalized_query = '&'.join(query_params)
-        normalized_url = parsed_clean._replace(query=normalized_query).geturl()
-    else:
-        normalized_url = clean_url
-    
-    return normalized_url
\ No newline at end of file
+    parsed = urlsplit(url)
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    default_port = DEFAULT_PORTS.get(scheme)
+    if default_port and netloc.endswith(default_port):
+        netloc = netloc[:-len(default_port)]
+    path = parsed.path or '/'
+    query = '&'.join(sorted(param for param in parsed.query.split('&') if param))
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+def url_fingerprint(url):
+    """
+    64-bit fingerprint of a URL string, as a non-negative int. Built on Python's (SipHash) string
+    hash, which strings cache, so it is cheap but differs between processes: never persist it.
+    """
+    return hash(url) & 0xFFFFFFFFFFFFFFFF
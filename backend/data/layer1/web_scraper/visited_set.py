@@ -0,0 +1,77 @@
+import threading
+from array import array
+
+from web_scraper.utils import url_fingerprint
+
+class VisitedSet:
+    """
+    Set of URLs kept as 64-bit fingerprints (url_fingerprint) in an open-addressing hash table
+    backed by a flat array('Q'), instead of the URL strings themselves: 8 bytes per slot, at most
+    MAX_LOAD full. Two URLs count as the same if their fingerprints collide; among a million URLs
+    that is expected with a probability of about 3 in 10^8. Thread-safe.
+    """
+    MAX_LOAD = 0.7
+
+    def __init__(self, capacity=1 << 16):
+        size = 1
+        while size * self.MAX_LOAD < capacity:
+            size <<= 1
+        self._table = array('Q', [0]) * size # 0 marks an empty slot
+        self._mask = size - 1
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    @staticmethod
+    def _fingerprint(url):
+        return url_fingerprint(url) or 1 # 0 is reserved for empty slots
+
+    def _slot(self, fingerprint):
+        """
+        Index of fingerprint in the table, or of the empty slot where it would go (linear probing).
+        """
+        table = self._table
+        mask = self._mask
+        i = fingerprint & mask
+        while True:
+            value = table[i]
+            if value == fingerprint or value == 0:
+                return i
+            i = (i + 1) & mask
+
+    def __contains__(self, url):
+        fingerprint = self._fingerprint(url)
+        with self._lock:
+            return self._table[self._slot(fingerprint)] == fingerprint
+
+    def add(self, url):
+        """
+        Adds url. Returns True if it was not in the set yet.
+        """
+        fingerprint = self._fingerprint(url)
+        with self._lock:
+            i = self._slot(fingerprint)
+            if self._table[i] == fingerprint:
+                return False
+            self._table[i] = fingerprint
+            self._count += 1
+            if self._count > len(self._table) * self.MAX_LOAD:
+                self._grow()
+            return True
+
+    def update(self, urls):
+        for url in urls:
+            self.add(url)
+
+    def _grow(self):
+        old_table = self._table
+        self._table = array('Q', [0]) * (len(old_table) * 2)
+        self._mask = len(self._table) - 1
+        for fingerprint in old_table:
+            if fingerprint:
+                self._table[self._slot(fingerprint)] = fingerprint
+
+    def memory_bytes(self):
+        return self._table.buffer_info()[1] * self._table.itemsize
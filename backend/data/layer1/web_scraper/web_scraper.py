@@ -1,9 +1,11 @@
 import os
+import time
 import logging
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse, urljoin
 import hashlib
+import asyncio
 from datetime import datetime
 import mimetypes
 
@@ -32,6 +34,7 @@ except ImportError:
     logging.getLogger(__name__).warning("langdetect not installed. Language detection will be disabled.")
 
 from web_scraper.download_manager import DownloadManager
+from web_scraper.async_fetcher import FetchHTTPError, FetchError
 from config import (
     USER_AGENT, OUTPUT_DIR, ENABLE_DYNAMIC_CONTENT_LOADING, SELENIUM_BROWSER,
     SELENIUM_HEADLESS, SELENIUM_WAIT_TIME, DOMAIN_WHITELIST,
@@ -42,10 +45,12 @@ from web_scraper.utils import get_domain, compute_md5, is_downloadable_asset
 logger = logging.getLogger(__name__)
 
 class WebScraper:
-    def __init__(self, output_dir, cache_manager, enable_dynamic_content_loading=False):
+    def __init__(self, output_dir, cache_manager, enable_dynamic_content_loading=False, asset_pool=None, host_clock=None):
         self.output_dir = output_dir
         self.cache_manager = cache_manager
         self.enable_dynamic_content_loading = enable_dynamic_content_loading
+        self.asset_pool = asset_pool # AssetPool for background asset downloads; None downloads them inside scrape_page
+        self.host_clock = host_clock # HostClock of the crawl frontier; inline asset downloads wait for their host's slot on it
         self.session = requests.Session()
         self.session.headers.update({'User-Agent': USER_AGENT})
         self.driver = None # Selenium WebDriver instance
@@ -91,9 +96,116 @@ class WebScraper:
             self.driver = None
             logger.info("Selenium WebDriver closed.")
 
+    def _conditional_headers(self, cached_metadata):
+        """
+        Request headers for a page fetch, with If-None-Match/If-Modified-Since from the cache for delta crawling.
+        """
+        headers = {'User-Agent': USER_AGENT}
+        if cached_metadata:
+            if cached_metadata.get('etag'):
+                headers['If-None-Match'] = cached_metadata['etag']
+            if cached_metadata.get('last_modified'):
+                headers['If-Modified-Since'] = cached_metadata['last_modified']
+        return headers
+
+    def process_page(self, url, content_text, http_status_code, cached_metadata):
+        """
+        Handles a fetched page independently of how it was fetched: language filtering, 304 handling,
+        MD5 change detection, saving the HTML and extracting links and asset URLs.
+        Returns:
+            tuple: (list of extracted links, list of asset URLs to download, MD5 hash of content, detected_language, outcome)
+                   where outcome is "skipped_language", "not_modified" (304), "unchanged" (same MD5) or "saved".
+                   The cache is not updated for the first two.
+        """
+        extracted_links = []
+        asset_urls = []
+        content_md5 = None
+        detected_language = "unknown" # Default language
+
+        # Language Detection
+        if _LANGDETECT_AVAILABLE:
+            try:
+                detected_language = detect(content_text)
+                if SKIP_UNSUPPORTED_LANGUAGES and detected_language not in PREFERRED_LANGUAGES:
+                    logger.info(f"Skipping {url}: Detected language '{detected_language}' not in preferred list {PREFERRED_LANGUAGES}.")
+                    return [], [], None, detected_language, "skipped_language" # Skip further processing
+            except Exception as e:
+                logger.warning(f"Could not detect language for {url}: {e}. Proceeding assuming 'unknown'.")
+
+        # If 304 Not Modified, skip processing content but record success
+        if http_status_code == 304:
+            logger.info(f"Page not modified (304): {url}. Using cached content for links.")
+            # Retrieve old MD5 and language from cache for consistency
+            if cached_metadata:
+                content_md5 = cached_metadata.get('md5_hash')
+                detected_language = cached_metadata.get('language', 'unknown')
+            # For 304, we don't re-parse links from network. If old links needed, they'd be from cache.
+            # For simplicity here, we'll return an empty list of links and rely on subsequent crawling
+            # to pick up any new links from other pages.
+            return [], [], content_md5, detected_language, "not_modified"
+
+        content_md5 = compute_md5(content_text.encode('utf-8'))
+
+        # Only save and parse if content is new or modified compared to cache
+        if cached_metadata and cached_metadata.get('md5_hash') == content_md5:
+            logger.debug(f"Content unchanged for {url}. MD5: {content_md5}")
+            logger.info(f"Page content for {url} is unchanged based on MD5. Not re-parsing.")
+            # Returning empty links to rely on queue to find new links via other paths
+            return [], [], content_md5, detected_language, "unchanged"
+
+        # Save HTML content
+        parsed_url = urlparse(url)
+        domain_dir = os.path.join(self.output_dir, parsed_url.netloc)
+        os.makedirs(domain_dir, exist_ok=True)
+
+        # Use MD5 hash of the URL as the filename to avoid issues with long/invalid chars in URLs
+        file_name = f"{compute_md5(url.encode('utf-8'))}.html"
+        file_path = os.path.join(domain_dir, file_name)
+
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(content_text)
+        logger.info(f"Saved HTML for {url} to {file_path}")
+
+        # Parse HTML for links and assets
+        soup = BeautifulSoup(content_text, 'html.parser')
+
+        # Extract all links (a href)
+        for a_tag in soup.find_all('a', href=True):
+            extracted_links.append(urljoin(url, a_tag['href']))
+
+        # Extract assets (img src, link href for CSS, script src for JS, etc.)
+        for tag in soup.find_all(['img', 'script', 'link'], src=True):
+            asset_url = urljoin(url, tag['src'])
+            if is_downloadable_asset(asset_url):
+                asset_urls.append(asset_url)
+
+        # Handle <link> tags that might point to assets (e.g., stylesheets, favicons)
+        for link_tag in soup.find_all('link', href=True):
+            if link_tag.get('rel') and ('stylesheet' in link_tag['rel'] or 'icon' in link_tag['rel']):
+                asset_url = urljoin(url, link_tag['href'])
+                if is_downloadable_asset(asset_url):
+                    asset_urls.append(asset_url)
+
+        return extracted_links, asset_urls, content_md5, detected_language, "saved"
+
+    def _record_page(self, url, content_md5, etag, last_modified, http_status_code, detected_language):
+        # Always update cache with the latest status, even if it's an error
+        self.cache_manager.update_metadata(
+            url=url,
+            last_crawled=datetime.now().isoformat(),
+            md5_hash=content_md5, # Will be None if not 2xx or skipped by language filter
+            etag=etag,
+            last_modified=last_modified,
+            content_type='text/html' if content_md5 is not None else 'N/A', # Set content_type based on content availability
+            http_status=http_status_code,
+            language=detected_language # Store detected language
+        )
+
     def scrape_page(self, url, download_manager):
         """
         Scrapes a single URL, extracts links, saves HTML, and returns metadata.
+        With an asset_pool the page's assets are handed to it and downloaded in the background
+        (asset_info is then empty); otherwise they are downloaded here, one after the other.
         Args:
             url (str): The URL to scrape.
             download_manager (DownloadManager): Instance to handle asset downloads.
@@ -106,21 +218,14 @@ class WebScraper:
         last_modified = None
         asset_info_list = [] # List of (asset_url, status, type) for logging changes
         http_status_code = None
-        content_text = "" # To store content for MD5 and language detection
         detected_language = "unknown" # Default language
 
         try:
             cached_metadata = self.cache_manager.get_metadata(url)
-            headers = {'User-Agent': USER_AGENT}
-
-            # Add If-None-Match and If-Modified-Since headers for delta crawling
+            headers = self._conditional_headers(cached_metadata)
             if cached_metadata:
                 etag = cached_metadata.get('etag')
                 last_modified = cached_metadata.get('last_modified')
-                if etag:
-                    headers['If-None-Match'] = etag
-                if last_modified:
-                    headers['If-Modified-Since'] = last_modified
 
             if self.enable_dynamic_content_loading and self.driver:
                 logger.info(f"Scraping dynamically: {url}")
@@ -130,7 +235,6 @@ class WebScraper:
                 http_status_code = 200 # Assume 200 for Selenium unless navigated to error page
                 # Selenium doesn't directly give ETag/Last-Modified from response headers easily
                 # We'll rely on content MD5 for change detection for dynamic content
-                response_headers = {} # Simulate empty headers for now
             else:
                 logger.info(f"Scraping statically: {url}")
                 response = self.session.get(url, headers=headers, timeout=10)
@@ -139,80 +243,21 @@ class WebScraper:
                 content_text = response.text
                 etag = response.headers.get('ETag')
                 last_modified = response.headers.get('Last-Modified')
-                response_headers = response.headers # Keep actual response headers
-
-            # Language Detection
-            if _LANGDETECT_AVAILABLE:
-                try:
-                    detected_language = detect(content_text)
-                    if SKIP_UNSUPPORTED_LANGUAGES and detected_language not in PREFERRED_LANGUAGES:
-                        logger.info(f"Skipping {url}: Detected language '{detected_language}' not in preferred list {PREFERRED_LANGUAGES}.")
-                        return [], None, None, None, [], http_status_code, detected_language # Skip further processing
-                except Exception as e:
-                    logger.warning(f"Could not detect language for {url}: {e}. Proceeding assuming 'unknown'.")
-            
-            # If 304 Not Modified, skip processing content but record success
-            if http_status_code == 304:
-                logger.info(f"Page not modified (304): {url}. Using cached content for links.")
-                # Retrieve old MD5 and language from cache for consistency
-                if cached_metadata:
-                    content_md5 = cached_metadata.get('md5_hash')
-                    detected_language = cached_metadata.get('language', 'unknown')
-                # For 304, we don't re-parse links from network. If old links needed, they'd be from cache.
-                # For simplicity here, we'll return an empty list of links and rely on subsequent crawling
-                # to pick up any new links from other pages.
-                return [], content_md5, etag, last_modified, [], http_status_code, detected_language
 
+            extracted_links, asset_urls, content_md5, detected_language, outcome = self.process_page(url, content_text, http_status_code, cached_metadata)
+            if outcome == "skipped_language":
+                return [], None, None, None, [], http_status_code, detected_language
+            if outcome == "not_modified":
+                return [], content_md5, etag, last_modified, [], http_status_code, detected_language
+            if self.asset_pool is not None:
+                self.asset_pool.submit(asset_urls)
+            else:
+                for asset_url in asset_urls:
+                    if self.host_clock is not None:
+                        time.sleep(self.host_clock.reserve(get_domain(asset_url))) # Same per-host politeness as page fetches
+                    asset_status, asset_type, asset_http_status = download_manager.download_file(asset_url)
+                    asset_info_list.append((asset_url, asset_status, asset_type))
 
-            content_md5 = compute_md5(content_text.encode('utf-8'))
-            
-            # Only save and parse if content is new or modified compared to cache
-            is_modified = True
-            if cached_metadata and cached_metadata.get('md5_hash') == content_md5:
-                is_modified = False
-                logger.debug(f"Content unchanged for {url}. MD5: {content_md5}")
-
-            if is_modified:
-                # Save HTML content
-                parsed_url = urlparse(url)
-                domain_dir = os.path.join(self.output_dir, parsed_url.netloc)
-                os.makedirs(domain_dir, exist_ok=True)
-                
-                # Use MD5 hash of the URL as the filename to avoid issues with long/invalid chars in URLs
-                file_name = f"{compute_md5(url.encode('utf-8'))}.html"
-                file_path = os.path.join(domain_dir, file_name)
-                
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content_text)
-                logger.info(f"Saved HTML for {url} to {file_path}")
-
-                # Parse HTML for links and assets
-                soup = BeautifulSoup(content_text, 'html.parser')
-
-                # Extract all links (a href)
-                for a_tag in soup.find_all('a', href=True):
-                    link = urljoin(url, a_tag['href'])
-                    extracted_links.append(link)
-
-                # Extract assets (img src, link href for CSS, script src for JS, etc.)
-                for tag in soup.find_all(['img', 'script', 'link'], src=True):
-                    asset_url = urljoin(url, tag['src'])
-                    if is_downloadable_asset(asset_url):
-                        asset_status, asset_type, asset_http_status = download_manager.download_file(asset_url)
-                        asset_info_list.append((asset_url, asset_status, asset_type))
-                
-                # Handle <link> tags that might point to assets (e.g., stylesheets, favicons)
-                for link_tag in soup.find_all('link', href=True):
-                    if link_tag.get('rel') and ('stylesheet' in link_tag['rel'] or 'icon' in link_tag['rel']):
-                        asset_url = urljoin(url, link_tag['href'])
-                        if is_downloadable_asset(asset_url):
-                            asset_status, asset_type, asset_http_status = download_manager.download_file(asset_url)
-                            asset_info_list.append((asset_url, asset_status, asset_type))
-            else: # If not modified, use cached links (if available) or return empty for efficiency
-                logger.info(f"Page content for {url} is unchanged based on MD5. Not re-parsing.")
-                # You might choose to re-parse from cached content or simply return no new links
-                # For now, returning empty links to rely on queue to find new links via other paths
-                
         except requests.exceptions.HTTPError as e:
             logger.warning(f"HTTP Error while scraping {url}: {e.response.status_code} - {e.response.reason}")
             http_status_code = e.response.status_code
@@ -231,18 +276,70 @@ class WebScraper:
             logger.error(f"An unexpected error occurred while scraping {url}: {e}", exc_info=True)
             http_status_code = 0 # Generic error, no specific HTTP status
 
-        # Always update cache with the latest status, even if it's an error
-        self.cache_manager.update_metadata(
-            url=url,
-            last_crawled=datetime.now().isoformat(),
-            md5_hash=content_md5, # Will be None if not 2xx or skipped by language filter
-            etag=etag,
-            last_modified=last_modified,
-            content_type='text/html' if content_md5 is not None else 'N/A', # Set content_type based on content availability
-            http_status=http_status_code,
-            language=detected_language # Store detected language
-        )
+        self._record_page(url, content_md5, etag, last_modified, http_status_code, detected_language)
+        return extracted_links, content_md5, etag, last_modified, asset_info_list, http_status_code, detected_language
+
+    async def _download_asset_async(self, asset_url, fetcher, download_manager):
+        """
+        download_file_async once the asset's host may be fetched again. Each call books its own slot on
+        the host clock, so a page's assets are spaced out by the host's delay even when gathered together.
+        """
+        if self.host_clock is not None:
+            await asyncio.sleep(self.host_clock.reserve(get_domain(asset_url)))
+        return await download_manager.download_file_async(asset_url, fetcher)
+
+    async def scrape_page_async(self, url, fetcher, download_manager):
+        """
+        scrape_page for the asyncio crawl engine: fetches through an AsyncFetcher and hands the page's
+        assets to the asset_pool, or without one downloads them concurrently before returning.
+        Dynamic content loading (Selenium) is not used by this engine.
+        Returns the same tuple as scrape_page.
+        """
+        extracted_links = []
+        content_md5 = None
+        etag = None
+        last_modified = None
+        asset_info_list = []
+        http_status_code = None
+        detected_language = "unknown"
+
+        try:
+            cached_metadata = self.cache_manager.get_metadata(url)
+            headers = self._conditional_headers(cached_metadata)
+            if cached_metadata:
+                etag = cached_metadata.get('etag')
+                last_modified = cached_metadata.get('last_modified')
+
+            logger.info(f"Scraping asynchronously: {url}")
+            http_status_code, content_text, etag, last_modified = await fetcher.get_page(url, headers)
+
+            # Saving the HTML and parsing it block, so they run in a worker thread instead of on the event loop
+            extracted_links, asset_urls, content_md5, detected_language, outcome = await asyncio.to_thread(
+                self.process_page, url, content_text, http_status_code, cached_metadata)
+            if outcome == "skipped_language":
+                return [], None, None, None, [], http_status_code, detected_language
+            if outcome == "not_modified":
+                return [], content_md5, etag, last_modified, [], http_status_code, detected_language
+            if self.asset_pool is not None:
+                await self.asset_pool.submit_async(asset_urls, fetcher)
+            else:
+                asset_results = await asyncio.gather(*(self._download_asset_async(asset_url, fetcher, download_manager) for asset_url in asset_urls))
+                for asset_url, (asset_status, asset_type, asset_http_status) in zip(asset_urls, asset_results):
+                    asset_info_list.append((asset_url, asset_status, asset_type))
+
+        except FetchHTTPError as e:
+            logger.warning(f"HTTP Error while scraping {url}: {e.status} - {e.reason}")
+            http_status_code = e.status
+            content_md5 = None
+            logger.warning(f"Did not save content for {url} due to HTTP status {http_status_code}")
+        except FetchError as e:
+            logger.error(f"HTTP/Network error while scraping {url}: {e}")
+            http_status_code = 0 # Indicate a connection/request error without HTTP status
+        except Exception as e:
+            logger.error(f"An unexpected error occurred while scraping {url}: {e}", exc_info=True)
+            http_status_code = 0 # Generic error, no specific HTTP status
 
+        self._record_page(url, content_md5, etag, last_modified, http_status_code, detected_language)
         return extracted_links, content_md5, etag, last_modified, asset_info_list, http_status_code, detected_language
 
     def close_browser(self):
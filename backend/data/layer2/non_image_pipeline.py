@@ -34,6 +34,9 @@ MIN_FILE_SIZE_BYTES = 0
 # After text extraction and cleaning, if the text length is below this, the document is considered unimportant.
 # Set to 0 to process all files regardless of cleaned text length.
 MIN_CLEANED_TEXT_LENGTH = 0
+# Also save each document's spaCy parse as "<doc_id>.spacy" (a DocBin) next to its JSON output,
+# so the KG build (backend/build_kg.py) can reuse it instead of parsing the text again.
+SAVE_SPACY_DOCBIN = False
 
 # --- Logging Setup ---
 logging.basicConfig(level=logging.DEBUG, # Keep DEBUG for verbose output
@@ -74,6 +77,7 @@ except ImportError: logging.warning("BeautifulSoup4 not found. HTML parsing will
 nlp = None
 try:
     import spacy
+    from spacy.tokens import DocBin
     _library_status["spacy"] = True
 except ImportError: logging.warning("spaCy not found. NLP preprocessing will be skipped.")
 
@@ -100,14 +104,21 @@ class NLPProcessor:
             logging.warning(f"spaCy NLP model not loaded in process {os.getpid()}. NLP processing will be unavailable.")
 
     def process_text(self, text):
+        return self.analyze_text(text)[0]
+
+    def analyze_text(self, text):
+        """
+        Returns (nlp_results, doc): the JSON fields produced by process_text plus the spaCy Doc
+        they were read from (None when NLP is unavailable), so the parse can be persisted.
+        """
         global nlp
-        if nlp is None or not text: return {"sentences": [], "tokens": [], "lemmas": [], "entities": []}
+        if nlp is None or not text: return {"sentences": [], "tokens": [], "lemmas": [], "entities": []}, None
         doc = nlp(text)
         sentences = [sent.text for sent in doc.sents]
         tokens = [token.text for token in doc]
         lemmas = [token.lemma_ for token in doc if not token.is_punct and not token.is_space]
         entities = [{"text": ent.text, "label": ent.label_} for ent in doc.ents]
-        return {"sentences": sentences, "tokens": tokens, "lemmas": lemmas, "entities": entities}
+        return {"sentences": sentences, "tokens": tokens, "lemmas": lemmas, "entities": entities}, doc
 
 # --- Base Parser ---
 class BaseParser(ABC):
@@ -123,7 +134,9 @@ class BaseParser(ABC):
         self.metadata["file_creation_time"] = datetime.fromtimestamp(os.path.getctime(self.file_path)).isoformat()
         self.metadata["relative_path"] = os.path.relpath(self.file_path, start=INPUT_ROOT_DIR)
     def _clean_text(self, text):
-        if not text: return ""; text = ' '.join(text.split()); return text.strip()
+        if not text: return ""
+        text = ' '.join(text.split())
+        return text.strip()
     def parse(self):
         try:
             self._extract_metadata(); raw_text = self._extract_text(); self.cleaned_text = self._clean_text(raw_text)
@@ -258,6 +271,17 @@ class XmlParser(BaseParser):
 
 
 # --- Worker function for multiprocessing pool ---
+def _save_docbin(doc, json_output_path):
+    """
+    Saves a document's spaCy Doc as a single-document DocBin next to its processed JSON ("<doc_id>.spacy").
+    """
+    docbin_path = os.path.splitext(json_output_path)[0] + ".spacy"
+    try:
+        DocBin(docs=[doc]).to_disk(docbin_path)
+        logging.debug(f"Saved spaCy DocBin to {docbin_path}")
+    except Exception as e:
+        logging.warning(f"Could not save spaCy DocBin {docbin_path}: {e}")
+
 def _process_single_file(file_path, url_metadata, parser_registry_config, preferred_languages):
     """
     Processes a single file. This function is designed to be run by a multiprocessing worker.
@@ -321,8 +345,9 @@ def _process_single_file(file_path, url_metadata, parser_registry_config, prefer
                 }
                 if 'url' in final_doc['metadata']: del final_doc['metadata']['url']
 
+                spacy_doc = None
                 if final_doc["file_type"] in ["html", "pdf", "docx", "xlsx", "csv", "xml"]:
-                    nlp_results = nlp_processor.process_text(final_doc["cleaned_text"]); final_doc.update(nlp_results)
+                    nlp_results, spacy_doc = nlp_processor.analyze_text(final_doc["cleaned_text"]); final_doc.update(nlp_results)
                 else:
                     final_doc.update({"sentences": [], "tokens": [], "lemmas": [], "entities": []})
 
@@ -336,6 +361,7 @@ def _process_single_file(file_path, url_metadata, parser_registry_config, prefer
 
                 output_filename = f"{final_doc['doc_id']}.json"; output_path = os.path.join(language_output_dir, output_filename)
                 with open(output_path, 'w', encoding='utf-8') as f: json.dump(final_doc, f, ensure_ascii=False, indent=2)
+                if SAVE_SPACY_DOCBIN and spacy_doc is not None: _save_docbin(spacy_doc, output_path)
                 logging.info(f"Worker {os.getpid()}: Saved processed data to {output_path}"); return (True, file_path, original_url, output_path)
             else:
                 logging.info(f"Worker {os.getpid()}: Skipping {file_path} as it did not yield important content or parsing failed. (URL: {original_url})")
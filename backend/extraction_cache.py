@@ -0,0 +1,94 @@
+import json
+import sqlite3
+import logging
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+class ExtractionCache:
+    """
+    On-disk cache of per-document extraction results for build_kg.py.
+    Entries are keyed by the layer-2 document's content hash plus the extraction fingerprint
+    (kg_extractor.get_rules_fingerprint), so an unchanged document is only re-extracted
+    when CANONICAL_ENTITIES, the relationship rules or the extractor itself change.
+    """
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(self.db_path)
+        self._initialize_db()
+
+    def _initialize_db(self):
+        try:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS extractions (
+                    content_hash TEXT,
+                    fingerprint TEXT,
+                    doc_id TEXT,
+                    triples TEXT,
+                    extracted_at TEXT,
+                    PRIMARY KEY (content_hash, fingerprint)
+                )
+            ''')
+            self.conn.commit()
+            logger.info(f"Extraction cache initialized at {self.db_path}")
+        except sqlite3.Error as e:
+            logger.error(f"Error creating extraction cache table: {e}")
+
+    def load(self, fingerprint: str) -> dict:
+        """
+        Returns {content_hash: (doc_id, triples_json)} for every entry stored under fingerprint.
+        triples_json is decoded by the caller, only for the documents it actually reuses.
+        """
+        try:
+            cursor = self.conn.execute('SELECT content_hash, doc_id, triples FROM extractions WHERE fingerprint = ?', (fingerprint,))
+            return {row[0]: (row[1], row[2]) for row in cursor}
+        except sqlite3.Error as e:
+            logger.error(f"Error loading extraction cache: {e}")
+            return {}
+
+    def store_many(self, fingerprint: str, entries: list):
+        """
+        Stores (content_hash, doc_id, triples) entries under fingerprint in a single transaction.
+        """
+        extracted_at = datetime.now().isoformat()
+        try:
+            self.conn.executemany('''
+                INSERT OR REPLACE INTO extractions (content_hash, fingerprint, doc_id, triples, extracted_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(content_hash, fingerprint, doc_id, json.dumps([list(triple) for triple in triples], ensure_ascii=False), extracted_at)
+                  for content_hash, doc_id, triples in entries])
+            self.conn.commit()
+            logger.debug(f"Stored {len(entries)} extraction(s) in cache")
+        except sqlite3.Error as e:
+            logger.error(f"Error storing extractions: {e}")
+            self.conn.rollback()
+
+    def prune(self, fingerprint: str, keep: set) -> int:
+        """
+        Deletes every entry except those stored under fingerprint whose (content_hash, doc_id) is in keep,
+        i.e. the documents of the build that just finished. Entries of other fingerprints can never be
+        reused, and those of documents that changed or left the input would otherwise pile up.
+        Returns the number removed.
+        """
+        try:
+            self.conn.execute('CREATE TEMP TABLE IF NOT EXISTS kept_entries (content_hash TEXT, doc_id TEXT, PRIMARY KEY (content_hash, doc_id))')
+            self.conn.execute('DELETE FROM kept_entries')
+            self.conn.executemany('INSERT OR IGNORE INTO kept_entries (content_hash, doc_id) VALUES (?, ?)', keep)
+            cursor = self.conn.execute('''
+                DELETE FROM extractions
+                WHERE fingerprint != ?
+                   OR NOT EXISTS (SELECT 1 FROM kept_entries
+                                  WHERE kept_entries.content_hash = extractions.content_hash
+                                    AND kept_entries.doc_id = extractions.doc_id)
+            ''', (fingerprint,))
+            self.conn.commit()
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Error pruning extraction cache: {e}")
+            self.conn.rollback()
+            return 0
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+            self.conn = None
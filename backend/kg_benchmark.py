@@ -0,0 +1,246 @@
+# kg_benchmark.py
+#
+# Reproducible extraction benchmark for kg_extractor. Generates a synthetic corpus of layer-2 style
+# DOCUMENT NODEs (metadata, "Core Metadata Elements"/"Definition" tables, extracted_links, long
+# cleaned_text) from CANONICAL_ENTITIES with a fixed seed, runs process_document_node and
+# extract_content_triples over it, and reports time per extraction stage and triples/sec.
+# With --profile the run is done under cProfile and the top functions are logged as well.
+# A report saved with --report can be passed back as --baseline to fail on regressions.
+#
+# Usage: python kg_benchmark.py [--documents N] [--tables N] [--links N] [--text-chars N] [--seed N]
+#                               [--profile] [--report FILE] [--baseline FILE] [--max-regression R]
+
+import io
+import sys
+import json
+import time
+import random
+import pstats
+import logging
+import cProfile
+import argparse
+import platform
+from collections import defaultdict
+
+import kg_extractor
+from kg_extractor import CANONICAL_ENTITIES, STAGE_NAMES, STAGE_TIMINGS, process_document_node, extract_content_triples, reset_stage_timings
+
+# --- Configuration ---
+DEFAULT_DOCUMENTS = 50
+DEFAULT_TABLES_PER_DOCUMENT = 3 # Metadata tables per document
+DEFAULT_LINKS_PER_DOCUMENT = 80 # The crawled pages average roughly this many links (links_to is the largest predicate)
+DEFAULT_TEXT_CHARS = 20000 # Length of each document's cleaned_text
+DEFAULT_SEED = 42
+DEFAULT_MAX_REGRESSION = 0.20 # Allowed slowdown in triples/sec against --baseline before the run fails
+PROFILE_TOP_FUNCTIONS = 25 # Functions listed from the cProfile output
+
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s',
+                    handlers=[logging.StreamHandler()])
+
+# Sentence templates over entity types, modelled on MOSDAC product pages. Each matches a relationship rule or keyword.
+SENTENCE_TEMPLATES = [
+    "{Satellite} carries the {Instrument} instrument.",
+    "The {Product} is derived from {Instrument} observations.",
+    "{Product} is generated using {Satellite} data.",
+    "The {Instrument} measures {Parameter} over the {Location}.",
+    "{Mission} supports {Application} in the {Location}.",
+    "The {Product} is available in {DataType/Format} format through {Service}.",
+    "{Organization} provides the {Product} to registered users.",
+    "Data from {Satellite} is updated {TimeInterval}.",
+    "The {Product} covers the {Location} and includes {Parameter}.",
+    "{Organization} operates {Satellite} for {Application}.",
+]
+FILLER_SENTENCES = [
+    "Users can register on the portal to access archived and near real time products.",
+    "The algorithm theoretical basis document describes the retrieval in detail.",
+    "Validation against in-situ observations shows good agreement during the monsoon season.",
+    "Quick look images are published on the gallery page every half hour.",
+]
+METADATA_ELEMENTS = ["Title", "Abstract", "Data Lineage or Quality", "Update Frequency", "Responsible Party",
+                     "Keywords", "Geographic Extent", "Distribution Information", "Topic Category"]
+
+
+def _entities_by_type():
+    entities = defaultdict(list)
+    for info in CANONICAL_ENTITIES.values():
+        entities[info["type"]].append(info["text"])
+    return {entity_type: sorted(set(texts)) for entity_type, texts in entities.items()}
+
+
+def _sentence(rng, entities):
+    template = rng.choice(SENTENCE_TEMPLATES)
+    values = {entity_type: rng.choice(texts) for entity_type, texts in entities.items()}
+    return template.format(**values)
+
+
+def _paragraph(rng, entities, sentences):
+    return " ".join(_sentence(rng, entities) if rng.random() < 0.7 else rng.choice(FILLER_SENTENCES) for _ in range(sentences))
+
+
+def _metadata_table(rng, entities):
+    definitions = {
+        "Title": f"{rng.choice(entities['Product'])} from {rng.choice(entities['Satellite'])}",
+        "Abstract": _paragraph(rng, entities, 4),
+        "Data Lineage or Quality": _paragraph(rng, entities, 3),
+        "Update Frequency": rng.choice(entities["TimeInterval"]),
+        "Responsible Party": "Dr. Anil Kumar Sharma, MOSDAC, SAC (ISRO), Ahmedabad-380015, India. Email: mosdac@sac.isro.gov.in",
+        "Keywords": ", ".join(rng.sample(entities["Parameter"] + entities["Satellite"] + entities["Product"], 5)),
+        "Geographic Extent": f"{rng.choice(entities['Location'])}, Indian Ocean",
+        "Distribution Information": f"Online Download in {rng.choice(entities['DataType/Format'])} and PNG formats",
+        "Topic Category": rng.choice(entities["Application"]),
+    }
+    return {
+        "headers": ["Core Metadata Elements", "Definition"],
+        "data": [[element, definitions[element]] for element in METADATA_ELEMENTS]
+    }
+
+
+def generate_document(rng, index, entities, tables=DEFAULT_TABLES_PER_DOCUMENT, links=DEFAULT_LINKS_PER_DOCUMENT, text_chars=DEFAULT_TEXT_CHARS):
+    """
+    Returns one synthetic layer-2 DOCUMENT NODE.
+    """
+    doc_id = f"https://www.mosdac.gov.in/synthetic-product-{index}"
+    text_parts = []
+    text_length = 0
+    while text_length < text_chars:
+        paragraph = _paragraph(rng, entities, 8)
+        text_parts.append(paragraph)
+        text_length += len(paragraph) + 1
+    cleaned_text = " ".join(text_parts)[:text_chars]
+    return {
+        "doc_id": doc_id,
+        "metadata": {
+            "original_url": doc_id,
+            "file_type": "html",
+            "language": "en",
+            "html_meta_title": f"Synthetic product {index} | MOSDAC",
+            "html_meta_description": _sentence(rng, entities),
+        },
+        "extracted_tables": [_metadata_table(rng, entities) for _ in range(tables)],
+        "extracted_links": [{"href": f"https://www.mosdac.gov.in/synthetic-product-{rng.randrange(10 * (index + 1))}", "text": "link"}
+                            for _ in range(links)],
+        "entities": [{"text": rng.choice(entities["Satellite"]), "label": "PRODUCT"}],
+        "cleaned_text": cleaned_text,
+    }
+
+
+def generate_corpus(documents=DEFAULT_DOCUMENTS, tables=DEFAULT_TABLES_PER_DOCUMENT, links=DEFAULT_LINKS_PER_DOCUMENT,
+                    text_chars=DEFAULT_TEXT_CHARS, seed=DEFAULT_SEED):
+    """
+    Returns a list of synthetic DOCUMENT NODEs; the same arguments always give the same corpus.
+    """
+    rng = random.Random(seed)
+    entities = _entities_by_type()
+    return [generate_document(rng, i, entities, tables, links, text_chars) for i in range(documents)]
+
+
+def run_benchmark(corpus, profile=False):
+    """
+    Extracts triples from every document of the corpus, the way build_kg.py does (tables and links
+    through process_document_node, cleaned_text through extract_content_triples).
+    Returns a report dict, plus the pstats text when profile is set.
+    """
+    reset_stage_timings()
+    kg_extractor.TIME_STAGES = True
+    profiler = cProfile.Profile() if profile else None
+    triples = 0
+    started_at = time.perf_counter()
+    try:
+        if profiler is not None:
+            profiler.enable()
+        for doc_data in corpus:
+            triples += len(process_document_node(doc_data))
+            body_triples, _ = extract_content_triples(doc_data["cleaned_text"], doc_data.get("entities"))
+            triples += len(body_triples)
+        if profiler is not None:
+            profiler.disable()
+    finally:
+        kg_extractor.TIME_STAGES = False
+    elapsed = time.perf_counter() - started_at
+
+    stages = {stage: STAGE_TIMINGS.get(stage, 0.0) for stage in STAGE_NAMES}
+    stages["other"] = max(0.0, elapsed - sum(stages.values()))
+    report = {
+        "documents": len(corpus),
+        "characters": sum(len(doc_data["cleaned_text"]) for doc_data in corpus),
+        "triples": triples,
+        "seconds": elapsed,
+        "triples_per_second": triples / elapsed if elapsed > 0 else 0.0,
+        "documents_per_second": len(corpus) / elapsed if elapsed > 0 else 0.0,
+        "stages": stages,
+        "python": platform.python_version(),
+        "spacy_model": f"{kg_extractor.nlp.meta.get('lang')}_{kg_extractor.nlp.meta.get('name')}-{kg_extractor.nlp.meta.get('version')}",
+    }
+
+    profile_text = None
+    if profiler is not None:
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        profile_text = stream.getvalue()
+    return report, profile_text
+
+
+def check_regression(report, baseline, max_regression=DEFAULT_MAX_REGRESSION):
+    """
+    Returns a list of regression messages comparing report against a baseline report.
+    Throughput is only compared for the same corpus (document, character and triple counts).
+    """
+    problems = []
+    for key in ("documents", "characters"):
+        if report[key] != baseline.get(key):
+            return [f"Baseline was run on a different corpus ({key}: {baseline.get(key)} vs {report[key]})."]
+    if report["triples"] != baseline.get("triples"):
+        problems.append(f"Triple count changed: {baseline.get('triples')} -> {report['triples']}.")
+    baseline_rate = baseline.get("triples_per_second", 0.0)
+    if baseline_rate and report["triples_per_second"] < baseline_rate * (1 - max_regression):
+        problems.append(f"Throughput dropped from {baseline_rate:.1f} to {report['triples_per_second']:.1f} triples/sec "
+                        f"(more than {max_regression:.0%}).")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark kg_extractor on a synthetic MOSDAC-like corpus.")
+    parser.add_argument("--documents", type=int, default=DEFAULT_DOCUMENTS, help="Number of synthetic documents.")
+    parser.add_argument("--tables", type=int, default=DEFAULT_TABLES_PER_DOCUMENT, help="Metadata tables per document.")
+    parser.add_argument("--links", type=int, default=DEFAULT_LINKS_PER_DOCUMENT, help="Extracted links per document.")
+    parser.add_argument("--text-chars", type=int, default=DEFAULT_TEXT_CHARS, help="Length of each document's cleaned_text.")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Corpus generator seed.")
+    parser.add_argument("--profile", action="store_true", help="Run under cProfile and log the top functions.")
+    parser.add_argument("--report", help="Write the benchmark report to this JSON file.")
+    parser.add_argument("--baseline", help="Earlier --report file to compare against; exits with status 1 on a regression.")
+    parser.add_argument("--max-regression", type=float, default=DEFAULT_MAX_REGRESSION, help="Allowed throughput drop against --baseline (0.2 = 20%%).")
+    args = parser.parse_args(argv)
+
+    corpus = generate_corpus(args.documents, args.tables, args.links, args.text_chars, args.seed)
+    report, profile_text = run_benchmark(corpus, profile=args.profile)
+    report["corpus"] = {"documents": args.documents, "tables": args.tables, "links": args.links,
+                        "text_chars": args.text_chars, "seed": args.seed}
+
+    logging.info(f"Extracted {report['triples']} triples from {report['documents']} documents in {report['seconds']:.2f}s "
+                 f"({report['triples_per_second']:.1f} triples/sec, {report['documents_per_second']:.2f} documents/sec).")
+    for stage, seconds in report["stages"].items():
+        share = seconds / report["seconds"] if report["seconds"] > 0 else 0.0
+        logging.info(f"  {stage:<20} {seconds:8.3f}s  {share:6.1%}")
+    if profile_text:
+        logging.info("cProfile (top functions by cumulative time):\n" + profile_text)
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        logging.info(f"Report written to {args.report}.")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        problems = check_regression(report, baseline, args.max_regression)
+        for problem in problems:
+            logging.error(problem)
+        if problems:
+            return 1
+        logging.info("No regression against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,233 @@
+# kg_consolidate.py
+#
+# Post-extraction entity consolidation for the knowledge graph.
+# Surface forms of the same node (canonical dictionary phrases, spelling variants such as
+# "INSAT 3D" / "insat-3d", http/https/www/trailing-slash/relative variants of the same page URL)
+# are clustered with a union-find structure. Triples are rewritten to one representative per
+# cluster, and every merged form is recorded in an alias table for query-time lookup.
+# Only nodes in entity positions take part: subjects, and objects of ENTITY_VALUED_PREDICATES.
+# Literal objects (keywords, formats, dates, metadata definitions) are kept verbatim.
+
+import re
+from collections import Counter
+from urllib.parse import urlparse, urljoin
+
+MAX_ALIAS_FORM_CHARS = 80 # Longer values (abstracts, definitions) are prose, not entity names, and are never merged
+GENERIC_SUFFIXES = ["data", "dataset", "datasets"] # Trailing words dropped before comparing spellings ("INSAT-3D data" -> "insat 3d")
+# Predicates whose objects are entities (pages, satellites, products, places, organizations, ...).
+# Objects of every other predicate (has_keyword, available_in, updated_every, the has_<metadata element>
+# definitions, ...) are literal values and are never merged or rewritten.
+ENTITY_VALUED_PREDICATES = {
+    "links_to", "contains", "mentions", "describes", "is_about_topic", "has_table",
+    "has_contact_organization", "has_contact_person",
+    "provides", "delivers", "offers", "generates", "includes", "hosts", "supports", "uses", "utilizes", "used_for",
+    "covers_region", "is_over", "located_at", "belongs_to", "manages", "operates", "developed_by",
+    "collaborates_with", "measures", "is_derived_from"
+}
+
+class UnionFind:
+    """
+    Disjoint sets over hashable items, with path compression and union by size.
+    """
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def add(self, item):
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+
+    def find(self, item):
+        self.add(item)
+        root = item
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[item] != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+        return root_a
+
+    def groups(self):
+        clusters = {}
+        for item in self.parent:
+            clusters.setdefault(self.find(item), []).append(item)
+        return list(clusters.values())
+
+
+def normalize_surface_form(text):
+    """
+    Spelling key of an entity name: lowercase, '-', '_' and whitespace unified, punctuation dropped,
+    generic trailing words removed. Returns None for values too long to be entity names.
+    """
+    if len(text) > MAX_ALIAS_FORM_CHARS:
+        return None
+    key = re.sub(r'[\s\-_]+', ' ', text.lower())
+    key = re.sub(r'[^\w ]', '', key).strip()
+    words = key.split()
+    while len(words) > 1 and words[-1] in GENERIC_SUFFIXES:
+        words.pop()
+    return " ".join(words) or None
+
+
+def normalize_url(url):
+    """
+    Page key of an absolute http(s) URL: scheme, "www.", fragment and trailing slash ignored.
+    Returns None for anything else.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.netloc:
+        return None
+    host = parsed.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    key = host + parsed.path.rstrip("/")
+    if parsed.query:
+        key += "?" + parsed.query
+    return key
+
+
+def resolve_node(node, doc_id):
+    """
+    Turns a site-relative link ("/insat-3d") into an absolute URL on the host of the document it
+    was found in, so it can be matched with the absolute forms of the same page. The link is only
+    rewritten to that URL if the match succeeds (see consolidate_triples).
+    """
+    if node.startswith("/") and not node.startswith("//") and urlparse(doc_id).scheme in ("http", "https"):
+        return urljoin(doc_id, node)
+    return node
+
+
+def _pick_representative(forms, form_counts, canonical_texts, doc_ids):
+    """
+    Canonical dictionary text first, then a KG document id, then the most frequent form
+    (https and shorter forms win ties).
+    """
+    return max(forms, key=lambda form: (form in canonical_texts, form in doc_ids, form_counts[form],
+                                        form.startswith("https://"), -len(form), form))
+
+
+def _entity_nodes(doc_id, triples):
+    """
+    The entity-position nodes of one document's triples: its subjects and the objects of ENTITY_VALUED_PREDICATES.
+    """
+    for s, p, o in triples:
+        yield str(s)
+        if p in ENTITY_VALUED_PREDICATES:
+            yield str(o)
+
+
+def build_consolidation_map(records, canonical_entities):
+    """
+    Clusters the entity node strings of a KG.
+
+    Args:
+        records (iterable): (doc_id, triples) records, e.g. kg.items() or kg_store.iter_kg_records().
+        canonical_entities (dict): kg_extractor.CANONICAL_ENTITIES.
+
+    Returns:
+        tuple: (node_map, aliases, stats) where node_map maps every merged surface form (after
+               resolve_node) to its representative, aliases maps lowercased forms to representatives
+               for query lookup, and stats describes the clustering.
+    """
+    form_counts = Counter()
+    doc_ids = set()
+    literal_forms = set() # Forms that occur as written, not only as the resolution of a relative link
+    resolved_forms = set() # Absolute URLs that relative links resolve to
+    for doc_id, triples in records:
+        doc_ids.add(doc_id)
+        form_counts[doc_id] += 1
+        literal_forms.add(doc_id)
+        for node in _entity_nodes(doc_id, triples):
+            form = resolve_node(node, doc_id)
+            form_counts[form] += 1
+            if form == node:
+                literal_forms.add(form)
+            else:
+                resolved_forms.add(form)
+
+    canonical_texts = {info["text"] for info in canonical_entities.values()}
+    uf = UnionFind()
+    first_form_by_key = {}
+
+    def link(kind, key, form):
+        if key is None:
+            return
+        key = (kind, key)
+        if key in first_form_by_key:
+            uf.union(first_form_by_key[key], form)
+        else:
+            first_form_by_key[key] = form
+            uf.add(form)
+
+    # Canonical dictionary: every phrase and its canonical text share a cluster
+    for phrase, info in canonical_entities.items():
+        link("name", normalize_surface_form(info["text"]), info["text"])
+        link("name", normalize_surface_form(phrase), info["text"])
+        form_counts[info["text"]] += 0
+
+    # Normalized spellings and page URLs seen in the KG
+    for form in form_counts:
+        url_key = normalize_url(form)
+        if url_key is not None:
+            link("url", url_key, form)
+        else:
+            link("name", normalize_surface_form(form), form)
+
+    node_map = {}
+    aliases = {}
+    merged_clusters = 0
+    merged_forms = 0
+    for forms in uf.groups():
+        # A relative link resolving to a URL that also occurs as written is merged with it
+        if len(forms) < 2 and not (forms[0] in resolved_forms and forms[0] in literal_forms):
+            continue
+        merged_clusters += 1
+        representative = _pick_representative(forms, form_counts, canonical_texts, doc_ids)
+        for form in forms:
+            # Resolved URLs are mapped even when they are the representative, so their relative links get rewritten
+            if form != representative or form in resolved_forms:
+                node_map[form] = representative
+            if form != representative:
+                merged_forms += 1
+            aliases[form.lower()] = representative
+
+    stats = {
+        "surface_forms": len(form_counts),
+        "merged_clusters": merged_clusters,
+        "merged_forms": merged_forms
+    }
+    return node_map, aliases, stats
+
+
+def _consolidate_node(node, doc_id, node_map):
+    """
+    Representative of an entity node. A relative link keeps its original form unless the URL it
+    resolves to was merged.
+    """
+    form = resolve_node(node, doc_id)
+    return node_map.get(form, node)
+
+
+def consolidate_triples(doc_id, triples, node_map):
+    """
+    Rewrites the entity nodes of one document's triples to representative node ids; literal objects
+    are kept as they are. Returns (doc_id, triples) with the triples de-duplicated and sorted; triples
+    whose subject and object collapse into the same node are dropped.
+    """
+    consolidated = set()
+    for s, p, o in triples:
+        s = _consolidate_node(str(s), doc_id, node_map)
+        o = _consolidate_node(str(o), doc_id, node_map) if p in ENTITY_VALUED_PREDICATES else str(o)
+        if s != o:
+            consolidated.add((s, str(p), o))
+    return node_map.get(doc_id, doc_id), sorted(consolidated)
@@ -3,7 +3,15 @@
 import spacy
 import json
 import re
+import time
+import hashlib
+from bisect import bisect_left
+from functools import lru_cache
+from itertools import chain
 from collections import defaultdict
+from contextlib import contextmanager
+from spacy.matcher import PhraseMatcher
+from spacy.tokens import Doc, DocBin
 
 # --- Load SpaCy English model ---
 try:
@@ -162,11 +170,231 @@ RELATIONSHIP_RULES = [
     ("Product", "be", "LocationFeature", "is_over"),
 ]
 
+# Keyword patterns that also signal a relationship when found in the same sentence as both entities
+RELATIONSHIP_KEYWORDS = {
+    "provides": [r"provides", r"offers", r"delivers", r"generates"],
+    "belongs_to": [r"belongs to", r"is part of", r"is a part of"],
+    "updated_every": [r"updated every", r"updates every", r"is updated every"],
+    "manages": [r"manages", r"managed by", r"oversees"],
+    "developed_by": [r"developed by", r"is developed by", r"built by"],
+    "offers": [r"offers", r"provides"],
+    "covers_region": [r"covers", r"covering", r"is for", r"available for", r"over"],
+    "available_in": [r"available in", r"in format"],
+    "measures": [r"measures", r"measures the"],
+    "is_derived_from": [r"is derived from", r"derived from", r"using"],
+    "supports": [r"supports", r"for supporting"],
+    "includes": [r"includes", r"including"],
+    "utilizes": [r"utilizes", r"uses"],
+    "uses": [r"uses", r"utilizes"],
+    "located_at": [r"located at", r"in", r"from"],
+    "has_processing_level": [r"processing level"],
+    "provides_format": [r"in text", r"and png formats"]
+}
+
+# --- Compiled Rule Engine ---
+# RELATIONSHIP_RULES indexed by (subject type, object type), keeping rule order within each pair
+RULES_BY_TYPES = defaultdict(list)
+for _e1_type, _verb_lemma, _e2_type, _rel_name in RELATIONSHIP_RULES:
+    RULES_BY_TYPES[(_e1_type, _e2_type)].append((_verb_lemma, _rel_name))
+RULES_BY_TYPES = dict(RULES_BY_TYPES)
+COMPILED_RELATIONSHIP_KEYWORDS = {rel_name: [(kw, re.compile(kw)) for kw in keywords] for rel_name, keywords in RELATIONSHIP_KEYWORDS.items()}
+OVER_PATTERN = re.compile(r'\b(over)\b')
+USING_PATTERN = re.compile(r'\busing\b')
+
+# --- Extraction Fingerprint ---
+EXTRACTOR_VERSION = 3 # Bump whenever a code change alters extraction output, so cached extractions are discarded
+
+def get_rules_fingerprint():
+    """
+    Returns a hash of everything besides the document itself that determines extraction output:
+    the spaCy model, CANONICAL_ENTITIES, RELATIONSHIP_RULES, RELATIONSHIP_KEYWORDS and EXTRACTOR_VERSION.
+    """
+    payload = json.dumps({
+        "extractor_version": EXTRACTOR_VERSION,
+        "spacy_model": f"{nlp.meta.get('lang')}_{nlp.meta.get('name')}-{nlp.meta.get('version')}",
+        "canonical_entities": CANONICAL_ENTITIES,
+        "relationship_rules": RELATIONSHIP_RULES,
+        "relationship_keywords": RELATIONSHIP_KEYWORDS
+    }, sort_keys=True)
+    return hashlib.md5(payload.encode("utf-8")).hexdigest()
+
+# --- Batched NLP Settings ---
+NLP_BATCH_SIZE = 64 # Texts per nlp.pipe batch
+NLP_N_PROCESS = 1 # Processes used by nlp.pipe (keep at 1 inside build_kg.py workers, which are already processes)
+# Pipeline components to skip in batched extraction. The rule stage reads sentences and dependencies
+# (parser), entities (ner) and lemmas (tagger/attribute_ruler/lemmatizer), so every component
+# enabled in en_core_web_sm is needed today; list any component added later that the rules ignore.
+NLP_PIPE_DISABLE = []
+
+# --- Long Document Chunking ---
+MAX_CHUNK_CHARS = 100000 # Texts longer than this are parsed chunk by chunk (must stay below nlp.max_length)
+CHUNK_OVERLAP_CHARS = 2000 # Trailing sentences repeated at the start of the next chunk, so relations at a boundary are not lost
+SENTENCE_BOUNDARY_PATTERN = re.compile(r'(?<=[.!?])\s+')
+
+# --- Stage Timing ---
+# Off by default; kg_benchmark.py switches it on to report where extraction time goes.
+TIME_STAGES = False
+STAGE_TIMINGS = defaultdict(float) # Stage name -> cumulative seconds while TIME_STAGES is set
+STAGE_NAMES = ("spacy_pipeline", "ner", "canonical_matching", "overlap_resolution", "rule_matching", "table_handling")
+
+@contextmanager
+def stage_timer(stage):
+    """
+    Adds the time spent in the with-block to STAGE_TIMINGS[stage] when TIME_STAGES is set.
+    """
+    if not TIME_STAGES:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_TIMINGS[stage] += time.perf_counter() - started
+
+def _timed_pipe(docs):
+    """
+    Yields from an nlp.pipe generator, charging the time spent producing each Doc to "spacy_pipeline".
+    """
+    docs = iter(docs)
+    while True:
+        with stage_timer("spacy_pipeline"):
+            item = next(docs, None)
+        if item is None:
+            return
+        yield item
+
+def _separately_timed_ner():
+    """
+    The ner component when TIME_STAGES is set and ner is enabled, else None. While timing, the
+    pipeline runs with ner disabled and this component is applied to each Doc under the "ner" stage;
+    ner is the last component of en_core_web_sm, so the Docs are the same either way.
+    """
+    if TIME_STAGES and "ner" in nlp.pipe_names and "ner" not in NLP_PIPE_DISABLE:
+        return nlp.get_pipe("ner")
+    return None
+
+def _parse_texts(pipe_input, batch_size=NLP_BATCH_SIZE, n_process=NLP_N_PROCESS):
+    """
+    Runs nlp.pipe over (text, context) pairs without the NLP_PIPE_DISABLE components and yields
+    (doc, context) pairs, with the pipeline time charged to "spacy_pipeline" and the ner time to "ner".
+    """
+    disabled = [name for name in NLP_PIPE_DISABLE if name in nlp.pipe_names]
+    ner = _separately_timed_ner()
+    if ner is not None:
+        disabled.append("ner")
+    docs = nlp.pipe(pipe_input, as_tuples=True, batch_size=batch_size, n_process=n_process, disable=disabled)
+    for doc, context in _timed_pipe(docs):
+        if ner is not None:
+            with stage_timer("ner"):
+                doc = ner(doc)
+        yield doc, context
+
+def reset_stage_timings():
+    STAGE_TIMINGS.clear()
+
+# Metadata table elements whose definition text is run through extract_content_triples on its own
+NLP_FIELD_ELEMENTS = ("title", "abstract", "data lineage or quality")
+
+# --- Canonical Entity Matcher ---
+# CANONICAL_ENTITIES is compiled once into a PhraseMatcher over lowercased tokens, so matching costs
+# one pass over the Doc regardless of how many phrases the dictionary holds.
+# Each phrase is its own match key; matches are reported in dictionary order like the old per-phrase regex loop.
+# The matches are defined by that loop's word-boundary regex (kept in CANONICAL_PHRASE_REGEXES): phrase matches
+# are checked against it, and around the few tokens a regex match can start or end inside of (e.g. "Ahmedabad-380015",
+# "sac.isro.gov.in") each word boundary is tried against the phrases sharing its first two characters.
+def _canonical_phrase_patterns(phrase):
+    pattern = nlp.make_doc(phrase)
+    words = [token.text for token in pattern]
+    # The tokenizer leaves a sentence-final period attached to tokens such as "INSAT-3D." or "1A.",
+    # so the phrase is also matched in that form (the period is trimmed from the match span).
+    return [pattern, Doc(nlp.vocab, words=words[:-1] + [words[-1] + "."])]
+
+canonical_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+for _phrase in CANONICAL_ENTITIES:
+    canonical_matcher.add(_phrase, _canonical_phrase_patterns(_phrase))
+CANONICAL_PHRASE_ORDER = {phrase: i for i, phrase in enumerate(CANONICAL_ENTITIES)}
+CANONICAL_PHRASE_REGEXES = {phrase: re.compile(r'\b' + re.escape(phrase) + r'\b') for phrase in CANONICAL_ENTITIES}
+MAX_CANONICAL_PHRASE_CHARS = max(len(phrase) for phrase in CANONICAL_ENTITIES)
+CANONICAL_PHRASES_BY_PREFIX = defaultdict(list)
+for _phrase in CANONICAL_ENTITIES:
+    CANONICAL_PHRASES_BY_PREFIX[_phrase[:2]].append(_phrase)
+CANONICAL_PHRASES_BY_PREFIX = dict(CANONICAL_PHRASES_BY_PREFIX)
+INNER_WORD_BOUNDARY_PATTERN = re.compile(r'\w\W|\W\w') # A token containing this has a word boundary inside it
+WORD_BOUNDARY_PATTERN = re.compile(r'\b')
+
+def match_canonical_entities(doc):
+    """
+    Finds the CANONICAL_ENTITIES phrases in a parsed Doc with canonical_matcher.
+    Returns entity dicts ({"text", "type", "span"}) ordered by phrase in dictionary order, then by
+    position, which is the order the old per-phrase regex loop produced them in.
+    """
+    lower_text = doc.text.lower()
+    canonical_matches = set()
+    for match_id, start, end in canonical_matcher(doc):
+        phrase = nlp.vocab.strings[match_id]
+        span = doc[start:end]
+        end_char = span.end_char - 1 if span[-1].text.endswith(".") and not phrase.endswith(".") else span.end_char
+        match = CANONICAL_PHRASE_REGEXES[phrase].match(lower_text, span.start_char)
+        if match and match.end() == end_char:
+            canonical_matches.add((CANONICAL_PHRASE_ORDER[phrase], span.start_char, end_char, phrase))
+
+    # Matches that start or end inside a token start at most MAX_CANONICAL_PHRASE_CHARS before the end
+    # of a token with an inner word boundary
+    windows = []
+    for token in doc:
+        if INNER_WORD_BOUNDARY_PATTERN.search(token.text):
+            window = (max(0, token.idx - MAX_CANONICAL_PHRASE_CHARS), token.idx + len(token.text))
+            if windows and window[0] <= windows[-1][1]:
+                windows[-1] = (windows[-1][0], window[1])
+            else:
+                windows.append(window)
+    for window_start, window_end in windows:
+        for boundary in WORD_BOUNDARY_PATTERN.finditer(lower_text, window_start, window_end):
+            start_char = boundary.start()
+            for phrase in CANONICAL_PHRASES_BY_PREFIX.get(lower_text[start_char:start_char + 2], ()):
+                if lower_text.startswith(phrase, start_char):
+                    match = CANONICAL_PHRASE_REGEXES[phrase].match(lower_text, start_char)
+                    if match:
+                        canonical_matches.add((CANONICAL_PHRASE_ORDER[phrase], start_char, match.end(), phrase))
+
+    entities = []
+    for _, start_char, end_char, phrase in sorted(canonical_matches):
+        info = CANONICAL_ENTITIES[phrase]
+        entities.append({"text": info["text"], "type": info["type"], "span": (start_char, end_char)})
+    return entities
+
 # Helper function to find canonical entity and type
 def get_canonical_entity_info(text):
     lower_text = text.lower().strip()
     return CANONICAL_ENTITIES.get(lower_text, {"text": text.strip(), "type": "Unknown"})
 
+def resolve_entity_overlaps(found_entities):
+    """
+    Sweep-line overlap resolution over entity spans, in start order. An entity whose span is
+    contained in an already kept one is dropped; one that contains the kept entity starting at the
+    same offset replaces it; partially overlapping entities are both kept.
+
+    Args:
+        found_entities (list): Entity dicts with a "span" (start_char, end_char). Sorted in place.
+
+    Returns:
+        list: The kept entities, sorted by start offset.
+    """
+    found_entities.sort(key=lambda x: (x["span"][0], -len(x["text"])))
+
+    unique_entities_list = []
+    max_end = None # Furthest end offset of any kept entity
+    for ent_data in found_entities:
+        start_char, end_char = ent_data["span"]
+        if max_end is not None and max_end >= end_char:
+            continue
+        if unique_entities_list and unique_entities_list[-1]["span"][0] == start_char:
+            unique_entities_list[-1] = ent_data
+        else:
+            unique_entities_list.append(ent_data)
+        max_end = end_char
+    return unique_entities_list
+
 def extract_content_triples(text, existing_entities=None):
     """
     Extracts domain-specific entities and semantic relationships from cleaned text.
@@ -183,35 +411,143 @@ def extract_content_triples(text, existing_entities=None):
     """
     if not text:
         return [], []
+    if len(text) > MAX_CHUNK_CHARS:
+        return _extract_content_triples_chunked(text, existing_entities)
+
+    ner = _separately_timed_ner()
+    with stage_timer("spacy_pipeline"):
+        doc = nlp(text, disable=["ner"] if ner is not None else [])
+    if ner is not None:
+        with stage_timer("ner"):
+            doc = ner(doc)
+    return extract_content_triples_from_doc(doc, existing_entities)
+
+def _sentence_pieces(text, max_chars):
+    """
+    Lazily yields the (start, end) offsets of the sentences of text, with sentences longer than
+    max_chars cut at whitespace into pieces of at most max_chars.
+    """
+    start = 0
+    for match in chain(SENTENCE_BOUNDARY_PATTERN.finditer(text), [None]):
+        end = match.end() if match else len(text)
+        while end - start > max_chars:
+            cut = text.rfind(" ", start + 1, start + max_chars)
+            cut = cut if cut != -1 else start + max_chars
+            yield start, cut
+            start = cut
+        if end > start:
+            yield start, end
+        start = end
+
+def split_text_into_chunks(text, max_chars=MAX_CHUNK_CHARS, overlap_chars=CHUNK_OVERLAP_CHARS):
+    """
+    Lazily splits text at sentence boundaries into (start_offset, chunk_text) pieces of at most
+    max_chars. Each chunk after the first starts with the trailing sentences (up to overlap_chars)
+    of the previous one. A single sentence longer than max_chars is cut at whitespace.
+    Only the sentence offsets of the current chunk are held, so memory does not grow with the text.
+    """
+    chunk_pieces = [] # Sentence pieces of the chunk being filled
+    for piece in _sentence_pieces(text, max_chars):
+        chunk_pieces.append(piece)
+        while len(chunk_pieces) > 1 and chunk_pieces[-1][1] - chunk_pieces[0][0] > max_chars:
+            chunk_start, chunk_end = chunk_pieces[0][0], chunk_pieces[-2][1]
+            yield chunk_start, text[chunk_start:chunk_end]
+            # Step back over the trailing pieces that fit in the overlap, always moving forward by at least one
+            k = len(chunk_pieces) - 1
+            while k - 1 > 0 and chunk_end - chunk_pieces[k - 1][0] <= overlap_chars:
+                k -= 1
+            chunk_pieces = chunk_pieces[k:]
+    if chunk_pieces:
+        yield chunk_pieces[0][0], text[chunk_pieces[0][0]:chunk_pieces[-1][1]]
+
+def _extract_content_triples_chunked(text, existing_entities=None):
+    """
+    extract_content_triples for texts longer than MAX_CHUNK_CHARS. Chunks are parsed one at a time,
+    so peak memory depends on the chunk size rather than the document size. Triples are merged across
+    chunks; entity spans are shifted to document offsets, de-duplicated (overlap regions yield the
+    same entity twice) and resolved as for a single Doc.
+    Pre-extracted entities are only passed to the chunks whose text contains them.
+    """
+    valid_existing = [ent for ent in existing_entities or [] if isinstance(ent, dict) and ent.get("text")]
+
+    triples = set()
+    entities = {}
+    chunks = split_text_into_chunks(text, MAX_CHUNK_CHARS, CHUNK_OVERLAP_CHARS)
+    for doc, offset in _parse_texts(((chunk_text, offset) for offset, chunk_text in chunks), batch_size=1, n_process=1):
+        chunk_lower = doc.text.lower()
+        chunk_existing = [ent for ent in valid_existing if ent["text"].lower() in chunk_lower]
+        chunk_triples, chunk_entities = extract_content_triples_from_doc(doc, chunk_existing)
+        triples.update(chunk_triples)
+        for ent_data in chunk_entities:
+            span = (ent_data["span"][0] + offset, ent_data["span"][1] + offset)
+            entities.setdefault((ent_data["text"], ent_data["type"], span), {**ent_data, "span": span})
+    return list(triples), resolve_entity_overlaps(list(entities.values()))
+
+def extract_content_triples_batch(items, batch_size=NLP_BATCH_SIZE, n_process=NLP_N_PROCESS):
+    """
+    Batched version of extract_content_triples. All texts are parsed with nlp.pipe, then the
+    rule stage is applied to each Doc. Items may carry an already parsed Doc instead of a text
+    (e.g. one loaded with load_spacy_docs), which skips the model for that item.
+
+    Args:
+        items (iterable): (text or Doc, existing_entities) pairs.
+        batch_size (int): Texts per nlp.pipe batch.
+        n_process (int): Processes used by nlp.pipe.
 
-    doc = nlp(text)
-    extracted_triples = []
+    Returns:
+        list: One (triples, entities) tuple per input pair, in input order.
+    """
+    items = list(items)
+    results = [([], []) for _ in items]
+    pipe_input = []
+    for i, (text, existing_entities) in enumerate(items):
+        if isinstance(text, Doc):
+            results[i] = extract_content_triples_from_doc(text, existing_entities)
+        elif text and len(text) > MAX_CHUNK_CHARS:
+            results[i] = _extract_content_triples_chunked(text, existing_entities)
+        elif text:
+            pipe_input.append((text, i))
+    for doc, i in _parse_texts(pipe_input, batch_size, n_process):
+        results[i] = extract_content_triples_from_doc(doc, items[i][1])
+    return results
+
+def load_spacy_docs(docbin_path):
+    """
+    Loads the Docs of a DocBin saved by the layer-2 pipelines (SAVE_SPACY_DOCBIN) into this module's vocab.
+    The parses are only equivalent to fresh ones if layer 2 ran the same en_core_web_sm version.
+    """
+    return list(DocBin().from_disk(docbin_path).get_docs(nlp.vocab))
 
-    # Combine SpaCy's NER with our canonical entities and any pre-existing entities
+def collect_candidate_entities(doc, existing_entities=None):
+    """
+    Entities found in a parsed Doc before overlap resolution: canonical phrases, spaCy NER entities
+    and the pre-extracted entities from the input JSON, combined in that order.
+    """
+    text = doc.text
     found_entities = []
 
-    # 1. Add entities from CANONICAL_ENTITIES via regex matching
-    for phrase, info in CANONICAL_ENTITIES.items():
-        for match in re.finditer(r'\b' + re.escape(phrase) + r'\b', text.lower()):
-            start_char, end_char = match.span()
-            found_entities.append({"text": info["text"], "type": info["type"], "span": (start_char, end_char)})
+    # 1. Add entities from CANONICAL_ENTITIES via the token-aligned phrase matcher
+    with stage_timer("canonical_matching"):
+        found_entities.extend(match_canonical_entities(doc))
 
     # 2. Add entities from SpaCy's default NER, if not already captured and useful
-    for ent in doc.ents:
-        canonical_info = get_canonical_entity_info(ent.text)
-        if canonical_info["type"] != "Unknown":
-            found_entities.append({"text": canonical_info["text"], "type": canonical_info["type"], "span": (ent.start_char, ent.end_char)})
-        else:
-            if ent.label_ == "ORG":
-                found_entities.append({"text": ent.text, "type": "Organization", "span": (ent.start_char, ent.end_char)})
-            elif ent.label_ == "GPE":
-                found_entities.append({"text": ent.text, "type": "Location", "span": (ent.start_char, ent.end_char)})
-            elif ent.label_ == "PRODUCT":
-                found_entities.append({"text": ent.text, "type": "Product", "span": (ent.start_char, ent.end_char)})
-            elif ent.label_ == "DATE" or ent.label_ == "TIME":
-                 found_entities.append({"text": ent.text, "type": "TimeInterval", "span": (ent.start_char, ent.end_char)})
-            elif ent.label_ == "LOC":
-                 found_entities.append({"text": ent.text, "type": "Location", "span": (ent.start_char, ent.end_char)})
+    # (charged to "ner" along with the ner component itself, see _parse_texts)
+    with stage_timer("ner"):
+        for ent in doc.ents:
+            canonical_info = get_canonical_entity_info(ent.text)
+            if canonical_info["type"] != "Unknown":
+                found_entities.append({"text": canonical_info["text"], "type": canonical_info["type"], "span": (ent.start_char, ent.end_char)})
+            else:
+                if ent.label_ == "ORG":
+                    found_entities.append({"text": ent.text, "type": "Organization", "span": (ent.start_char, ent.end_char)})
+                elif ent.label_ == "GPE":
+                    found_entities.append({"text": ent.text, "type": "Location", "span": (ent.start_char, ent.end_char)})
+                elif ent.label_ == "PRODUCT":
+                    found_entities.append({"text": ent.text, "type": "Product", "span": (ent.start_char, ent.end_char)})
+                elif ent.label_ == "DATE" or ent.label_ == "TIME":
+                     found_entities.append({"text": ent.text, "type": "TimeInterval", "span": (ent.start_char, ent.end_char)})
+                elif ent.label_ == "LOC":
+                     found_entities.append({"text": ent.text, "type": "Location", "span": (ent.start_char, ent.end_char)})
 
 
     # 3. Add entities from the input JSON's `entities` array
@@ -236,175 +572,383 @@ def extract_content_triples(text, existing_entities=None):
                  found_entities.append({"text": canonical_info["text"], "type": canonical_info["type"], "span": (text.lower().find(entity_text.lower()), text.lower().find(entity_text.lower()) + len(entity_text))})
             else:
                  found_entities.append({"text": entity_text, "type": entity_type, "span": (text.lower().find(entity_text.lower()), text.lower().find(entity_text.lower()) + len(entity_text))})
+    return found_entities
 
-
-    # Remove duplicate/overlapping entities and sort
-    unique_entities_list = []
-    found_entities.sort(key=lambda x: (x["span"][0], -len(x["text"])))
-
-    for ent_data in found_entities:
-        start_char, end_char = ent_data["span"]
-        is_overlap = False
-        for existing_ent in unique_entities_list:
-            ex_start, ex_end = existing_ent["span"]
-            if start_char >= ex_start and end_char <= ex_end:
-                is_overlap = True
-                break
-            elif start_char <= ex_start and end_char >= ex_end:
-                unique_entities_list.remove(existing_ent)
-                unique_entities_list.append(ent_data)
-                is_overlap = True
-                break
-        if not is_overlap:
-            unique_entities_list.append(ent_data)
-
-    unique_entities_list.sort(key=lambda x: x["span"][0])
-
+def map_entity_tokens(doc, entities):
+    """
+    Maps the index of every token lying fully inside an entity's span to that entity.
+    Where spans share a token, the later entity wins.
+    """
     token_to_entity_map = {}
-    for ent_data in unique_entities_list:
+    token_starts = [token.idx for token in doc]
+    for ent_data in entities:
         if not isinstance(ent_data, dict) or "text" not in ent_data or "type" not in ent_data:
             print(f"DEBUG: Malformed entity in unique_entities_list, skipping: {ent_data}")
             continue
 
+        # Tokens lying fully inside the entity span, found by bisecting the token start offsets
         start_char, end_char = ent_data["span"]
-        entity_tokens_in_doc = [token for token in doc if token.idx >= start_char and (token.idx + len(token.text)) <= end_char]
-        for token in entity_tokens_in_doc:
+        for token in doc[bisect_left(token_starts, start_char):]:
+            if token.idx + len(token.text) > end_char:
+                break
             token_to_entity_map[token.i] = ent_data
+    return token_to_entity_map
+
+def extract_content_triples_from_doc(doc, existing_entities=None):
+    """
+    Rule stage of extract_content_triples for an already parsed spaCy Doc.
+    Returns the same (triples, entities) tuple as extract_content_triples(doc.text, existing_entities).
+    """
+    text = doc.text
+    if not text:
+        return [], []
+
+    found_entities = collect_candidate_entities(doc, existing_entities)
+
+    # Remove duplicate/overlapping entities and sort
+    with stage_timer("overlap_resolution"):
+        unique_entities_list = resolve_entity_overlaps(found_entities)
+
+        token_to_entity_map = map_entity_tokens(doc, unique_entities_list)
 
 
     # 2. Extract Relationships using Dependency Parsing and Rule-Matching
-    for sent in doc.sents:
-        sentence_entities = []
-        added_sent_entities_texts = set()
-        for token in sent:
-            if token.i in token_to_entity_map:
-                ent_data = token_to_entity_map[token.i]
-                if ent_data["text"] not in added_sent_entities_texts:
-                    sentence_entities.append(ent_data)
-                    added_sent_entities_texts.add(ent_data["text"])
-
-        sentence_entities.sort(key=lambda x: x["span"][0])
-
-        for i, ent1_data in enumerate(sentence_entities):
-            if not isinstance(ent1_data, dict) or "text" not in ent1_data or "type" not in ent1_data:
-                print(f"DEBUG: Malformed ent1_data CAUGHT in relationship extraction: {ent1_data}")
-                print(f"Warning: Skipping malformed ent1_data in relationship extraction: {ent1_data}")
+    with stage_timer("rule_matching"):
+        extracted_triples = {} # Triple -> None, keeping the order in which the rules found them
+        for sent in doc.sents:
+            sentence_entities = []
+            added_sent_entities_texts = set()
+            for token in sent:
+                if token.i in token_to_entity_map:
+                    ent_data = token_to_entity_map[token.i]
+                    if ent_data["text"] not in added_sent_entities_texts:
+                        sentence_entities.append(ent_data)
+                        added_sent_entities_texts.add(ent_data["text"])
+
+            sentence_entities.sort(key=lambda x: x["span"][0])
+            if len(sentence_entities) > 1:
+                _extract_sentence_relationships(sent, sentence_entities, extracted_triples)
+
+    return list(extracted_triples), unique_entities_list
+
+def _child_within(token, span, sent):
+    """
+    True if token belongs to sent and lies fully inside the (start_char, end_char) span.
+    """
+    return sent.start <= token.i < sent.end and token.idx >= span[0] and (token.idx + len(token.text)) <= span[1]
+
+def _extract_sentence_relationships(sent, sentence_entities, extracted_triples):
+    """
+    Applies RELATIONSHIP_RULES to every ordered entity pair of one sentence, adding triples to the
+    extracted_triples dict (used as an insertion-ordered set). Only the rules indexed under the pair's (type1, type2) are tried; the
+    sentence's lowercase text, token offsets and keyword hits are computed once.
+    """
+    sent_lower = sent.text.lower()
+    token_by_idx = {}
+    for token in sent:
+        token_by_idx.setdefault(token.idx, token)
+    keyword_hits = {} # rel_name -> keyword patterns found in this sentence
+
+    for i, ent1_data in enumerate(sentence_entities):
+        if not isinstance(ent1_data, dict) or "text" not in ent1_data or "type" not in ent1_data:
+            print(f"Warning: Skipping malformed ent1_data in relationship extraction: {ent1_data}")
+            continue
+
+        ent1_text = ent1_data["text"]
+        ent1_type = ent1_data["type"]
+        ent1_token_obj = token_by_idx.get(ent1_data["span"][0])
+        if not ent1_token_obj:
+            continue
+
+        for j, ent2_data in enumerate(sentence_entities):
+            if i == j:
                 continue
 
-            for j, ent2_data in enumerate(sentence_entities):
-                if i == j:
-                    continue
+            if not isinstance(ent2_data, dict) or "text" not in ent2_data or "type" not in ent2_data:
+                print(f"Warning: Skipping malformed ent2_data in relationship extraction: {ent2_data}")
+                continue
 
-                if not isinstance(ent2_data, dict) or "text" not in ent2_data or "type" not in ent2_data:
-                    print(f"DEBUG: Malformed ent2_data CAUGHT in relationship extraction: {ent2_data}")
-                    print(f"Warning: Skipping malformed ent2_data in relationship extraction: {ent2_data}")
-                    continue
+            ent2_text = ent2_data["text"]
+            ent2_type = ent2_data["type"]
+            rules = RULES_BY_TYPES.get((ent1_type, ent2_type))
+            if not rules:
+                continue
 
-                ent1_text = ent1_data["text"]
-                ent1_type = ent1_data["type"]
-                ent2_text = ent2_data["text"]
-                ent2_type = ent2_data["type"]
+            ent2_token_obj = token_by_idx.get(ent2_data["span"][0])
+            if not ent2_token_obj:
+                continue
 
-                ent1_token_obj = None
-                for token in sent:
-                    if token.idx == ent1_data["span"][0]:
-                        ent1_token_obj = token
-                        break
-                ent2_token_obj = None
-                for token in sent:
-                    if token.idx == ent2_data["span"][0]:
-                        ent2_token_obj = token
-                        break
+            for verb_lemma, rel_name in rules:
+                triple = (ent1_text, rel_name, ent2_text)
 
-                if not ent1_token_obj or not ent2_token_obj:
-                    continue
+                if ent1_token_obj.dep_ == "nsubj" and ent1_token_obj.head.lemma_ == verb_lemma:
+                    for child in ent1_token_obj.head.children:
+                        if _child_within(child, ent2_data["span"], sent) and child.dep_ in ("dobj", "attr", "pobj"):
+                            extracted_triples[triple] = None
+                            break
 
-                for rule_e1_type, verb_lemma, rule_e2_type, rel_name in RELATIONSHIP_RULES:
-                    if (ent1_type == rule_e1_type) and (ent2_type == rule_e2_type):
+                elif ent2_token_obj.dep_ == "nsubjpass" and ent2_token_obj.head.lemma_ == verb_lemma:
+                    for child in ent2_token_obj.head.children:
+                        if child.dep_ == "agent" or (child.dep_ == "prep" and child.lemma_ == "by"):
+                            if any(_child_within(grand_child, ent1_data["span"], sent) for grand_child in child.children):
+                                extracted_triples[triple] = None
 
-                        if ent1_token_obj.dep_ == "nsubj" and ent1_token_obj.head.lemma_ == verb_lemma:
-                            for child in ent1_token_obj.head.children:
-                                if child in sent and child.idx >= ent2_data["span"][0] and (child.idx + len(child.text)) <= ent2_data["span"][1] and \
-                                   (child.dep_ == "dobj" or child.dep_ == "attr" or child.dep_ == "pobj"):
-                                    extracted_triples.append((ent1_text, rel_name, ent2_text))
+                if rel_name == "covers_region" and verb_lemma == "cover" and ent1_token_obj.head.lemma_ == "be":
+                    span_between_lower = sent_lower[ent1_data["span"][1]-sent.start_char : ent2_data["span"][0]-sent.start_char]
+                    if OVER_PATTERN.search(span_between_lower):
+                        extracted_triples[triple] = None
+
+                if rel_name not in COMPILED_RELATIONSHIP_KEYWORDS or triple in extracted_triples:
+                    continue
+                if rel_name not in keyword_hits:
+                    keyword_hits[rel_name] = [kw for kw, pattern in COMPILED_RELATIONSHIP_KEYWORDS[rel_name] if pattern.search(sent_lower)]
+                if not keyword_hits[rel_name] or ent1_text.lower() not in sent_lower or ent2_text.lower() not in sent_lower:
+                    continue
+
+                for kw_pattern in keyword_hits[rel_name]:
+                    if kw_pattern == r"using" and rel_name == "is_derived_from":
+                        if ent1_type == "Product" and (ent2_type == "Satellite" or ent2_type == "Instrument"):
+                            prod_idx = sent_lower.find(ent1_text.lower())
+                            inst_idx = sent_lower.find(ent2_text.lower())
+                            if prod_idx != -1 and inst_idx != -1 and prod_idx < inst_idx:
+                                if USING_PATTERN.search(sent_lower[prod_idx:inst_idx]):
+                                    extracted_triples[triple] = None
                                     break
+                    elif rel_name == "provides_format":
+                        if ent1_type == "Service" and ent2_type == "DataType/Format":
+                            if ent1_text.lower() == "online download" and kw_pattern in sent_lower:
+                                extracted_triples[triple] = None
+                                break
+                    else:
+                        extracted_triples[triple] = None
+                        break
+
+# --- Metadata Table Handling ---
+METADATA_ELEMENT_COLUMN = "core metadata elements"
+METADATA_DEFINITION_COLUMN = "definition"
+KEYWORD_SPLIT_PATTERN = re.compile(r'[,/]')
+ELEMENT_NAME_CLEAN_PATTERN = re.compile(r'[^a-zA-Z0-9_]')
+CONTACT_ORGANIZATION_PATTERN = re.compile(r'(SAC \(ISRO\)|ISRO|MOSDAC|Indian Navy|WMO|IMD)', re.IGNORECASE)
+CONTACT_PERSON_PATTERN = re.compile(r'\b[A-Z][a-z]+(?: [A-Z][a-z]+)*\b')
+GEOGRAPHIC_LOCATION_PATTERN = re.compile(r'\b(Indian Region|India|Ukai reservoir|Brahmaputra River|Tropics|Ocean|Indian Ocean|Asia Sector|Western Himalayan region|All-India beaches|New Delhi|Ahmedabad)\b', re.IGNORECASE)
+DISTRIBUTION_FORMAT_PATTERN = re.compile(r'\b(text|PNG|HDF|netCDF|geoTiff|JPG|GIF)\b', re.IGNORECASE)
+ORGANIZATION_PHRASES = {phrase.lower() for phrase, info in CANONICAL_ENTITIES.items() if info["type"] == "Organization"}
+
+@lru_cache(maxsize=1024)
+def _element_keys(element_name):
+    """
+    Returns (lowercase element name, "has_<name>" predicate or None). Element names repeat across
+    every metadata table of a crawl, so both are derived once per distinct name.
+    """
+    element = element_name.lower()
+    clean_element_name = ELEMENT_NAME_CLEAN_PATTERN.sub('', element.replace(" ", "_"))
+    return element, f"has_{clean_element_name}" if clean_element_name else None
+
+def _split_keywords(definition_text):
+    return [k.strip() for k in KEYWORD_SPLIT_PATTERN.split(definition_text) if k.strip()]
+
+def _get_metadata_rows(table):
+    """
+    Returns the (element_name, definition_text) rows of a metadata table, i.e. one with
+    "core metadata elements" and "definition" columns. Other tables yield no rows.
+    """
+    headers = [h.lower() for h in table.get("headers", [])]
+    try:
+        core_metadata_col_idx = headers.index(METADATA_ELEMENT_COLUMN)
+        definition_col_idx = headers.index(METADATA_DEFINITION_COLUMN)
+    except ValueError:
+        return []
+
+    # Both columns are sliced out of the table in one pass; short rows are skipped
+    min_row_length = max(core_metadata_col_idx, definition_col_idx) + 1
+    columns = [(row[core_metadata_col_idx].strip(), row[definition_col_idx].strip())
+               for row in table.get("data", []) if len(row) >= min_row_length]
+    return [(element_name, definition_text) for element_name, definition_text in columns if element_name and definition_text]
 
-                        elif ent2_token_obj.dep_ == "nsubjpass" and ent2_token_obj.head.lemma_ == verb_lemma:
-                             for child in ent2_token_obj.head.children:
-                                 if child.dep_ == "agent":
-                                     for grand_child in child.children:
-                                         if grand_child in sent and grand_child.idx >= ent1_data["span"][0] and (grand_child.idx + len(grand_child.text)) <= ent1_data["span"][1]:
-                                            extracted_triples.append((ent1_text, rel_name, ent2_text))
-                                            break
-                                 if child.dep_ == "prep" and child.lemma_ == "by":
-                                     for grand_child in child.children:
-                                         if grand_child in sent and grand_child.idx >= ent1_data["span"][0] and (grand_child.idx + len(grand_child.text)) <= ent1_data["span"][1]:
-                                            extracted_triples.append((ent1_text, rel_name, ent2_text))
-                                            break
-
-                        if rel_name == "covers_region" and verb_lemma == "cover" and ent1_token_obj.head.lemma_ == "be":
-                            span_between_lower = sent.text[ent1_data["span"][1]-sent.start_char : ent2_data["span"][0]-sent.start_char].lower()
-                            if re.search(r'\b(over)\b', span_between_lower):
-                                extracted_triples.append((ent1_text, rel_name, ent2_text))
-
-                        keywords_for_rel = {
-                            "provides": [r"provides", r"offers", r"delivers", r"generates"],
-                            "belongs_to": [r"belongs to", r"is part of", r"is a part of"],
-                            "updated_every": [r"updated every", r"updates every", r"is updated every"],
-                            "manages": [r"manages", r"managed by", r"oversees"],
-                            "developed_by": [r"developed by", r"is developed by", r"built by"],
-                            "offers": [r"offers", r"provides"],
-                            "covers_region": [r"covers", r"covering", r"is for", r"available for", r"over"],
-                            "available_in": [r"available in", r"in format"],
-                            "measures": [r"measures", r"measures the"],
-                            "is_derived_from": [r"is derived from", r"derived from", r"using"],
-                            "supports": [r"supports", r"for supporting"],
-                            "includes": [r"includes", r"including"],
-                            "utilizes": [r"utilizes", r"uses"],
-                            "uses": [r"uses", r"utilizes"],
-                            "located_at": [r"located at", r"in", r"from"],
-                            "has_processing_level": [r"processing level"],
-                            "provides_format": [r"in text", r"and png formats"]
-                        }
-
-                        if rel_name in keywords_for_rel:
-                            for kw_pattern in keywords_for_rel[rel_name]:
-                                if re.search(kw_pattern, sent.text.lower()):
-                                    if ent1_text.lower() in sent.text.lower() and ent2_text.lower() in sent.text.lower():
-                                        if (ent1_text, rel_name, ent2_text) not in extracted_triples:
-                                            if kw_pattern == r"using" and rel_name == "is_derived_from":
-                                                if ent1_type == "Product" and (ent2_type == "Satellite" or ent2_type == "Instrument"):
-                                                    prod_idx = sent.text.lower().find(ent1_text.lower())
-                                                    inst_idx = sent.text.lower().find(ent2_text.lower())
-                                                    if prod_idx != -1 and inst_idx != -1 and prod_idx < inst_idx:
-                                                        if re.search(r'\busing\b', sent.text.lower()[prod_idx:inst_idx]):
-                                                            extracted_triples.append((ent1_text, rel_name, ent2_text))
-                                            elif rel_name == "provides_format":
-                                                if ent1_type == "Service" and ent2_type == "DataType/Format":
-                                                    if ent1_text.lower() == "online download" and kw_pattern in sent.text.lower():
-                                                        extracted_triples.append((ent1_text, rel_name, ent2_text))
-                                            else:
-                                                extracted_triples.append((ent1_text, rel_name, ent2_text))
-
-
-    return list(set(extracted_triples)), unique_entities_list
-
-def process_document_node(doc_data):
+def _prepare_metadata_tables(doc_data):
+    """
+    Reads every metadata table of a document once. Returns one (rows, table_nlp_text) pair per
+    metadata table, where rows are (element_name, element, definition_text, keywords) tuples with
+    element lowercased and keywords split for "keywords" rows (None otherwise).
+    """
+    tables = []
+    for table in doc_data.get("extracted_tables") or []:
+        rows = []
+        for element_name, definition_text in _get_metadata_rows(table):
+            element = _element_keys(element_name)[0]
+            keywords = _split_keywords(definition_text) if element == "keywords" else None
+            rows.append((element_name, element, definition_text, keywords))
+        tables.append((rows, _build_table_nlp_text(rows)))
+    return tables
+
+def _build_table_nlp_text(rows):
+    """
+    Builds the combined text of a metadata table that is run through general NLP after its rows
+    have been processed individually.
+    """
+    table_text_for_nlp = []
+    for _, element, definition_text, keywords in rows:
+        if element == "title":
+            table_text_for_nlp.append(f"The document title is: {definition_text}.")
+        elif element in ("abstract", "data lineage or quality", "responsible party", "organization", "dataset contact"):
+            table_text_for_nlp.append(definition_text)
+        elif element == "update frequency":
+            table_text_for_nlp.append(f"It is updated {definition_text}.")
+        elif element == "keywords":
+            for kw in keywords:
+                canonical_info = get_canonical_entity_info(kw)
+                if canonical_info["type"] != "Unknown":
+                    table_text_for_nlp.append(canonical_info["text"])
+    return " ".join(table_text_for_nlp)
+
+def _collect_table_nlp_texts(tables):
+    texts = []
+    for rows, table_text in tables:
+        for _, element, definition_text, _ in rows:
+            if element in NLP_FIELD_ELEMENTS:
+                texts.append(definition_text)
+        if table_text:
+            texts.append(table_text)
+    return list(dict.fromkeys(texts))
+
+def collect_nlp_texts(doc_data):
+    """
+    Returns every text process_document_node runs through extract_content_triples for this
+    document, in processing order (duplicates removed), so callers can parse them in one batch.
+    """
+    return _collect_table_nlp_texts(_prepare_metadata_tables(doc_data))
+
+# Handlers for metadata table rows, keyed by lowercase element name. Each takes the document
+# context built by process_document_node, the row's definition text and its split keywords.
+def _track_doc_level_entity(context, entity_type, entity_text, include_techniques=False):
+    if entity_type in ("Satellite", "Instrument"):
+        context["satellites_instruments"].add(entity_text)
+    if entity_type in ("Product", "Application"):
+        context["products_applications"].add(entity_text)
+    if include_techniques and entity_type == "Technique":
+        context["techniques"].add(entity_text)
+
+def _handle_title(context, definition_text, keywords):
+    current_field_triples, current_field_entities = context["parsed_texts"][definition_text]
+    context["triples"].update(current_field_triples)
+    for ent_info in current_field_entities:
+        if ent_info["type"] in ("Product", "Application", "Mission"):
+            context["triples"].add((context["doc_id"], "describes", ent_info["text"]))
+        _track_doc_level_entity(context, ent_info["type"], ent_info["text"])
+
+def _handle_abstract(context, definition_text, keywords):
+    current_field_triples, current_field_entities = context["parsed_texts"][definition_text]
+    context["triples"].update(current_field_triples)
+    for ent_info in current_field_entities:
+        if ent_info["type"] != "Unknown":
+            context["triples"].add((context["doc_id"], "mentions", ent_info["text"]))
+        _track_doc_level_entity(context, ent_info["type"], ent_info["text"])
+
+def _handle_data_lineage(context, definition_text, keywords):
+    current_field_triples, current_field_entities = context["parsed_texts"][definition_text]
+    context["triples"].update(current_field_triples)
+    # Infer (Product, uses, Instrument/Technique)
+    products_in_lineage = {e["text"] for e in current_field_entities if e["type"] == "Product"}
+    instruments_techniques_in_lineage = {e["text"] for e in current_field_entities if e["type"] in ("Instrument", "Technique")}
+    for prod in products_in_lineage:
+        for inst_tech in instruments_techniques_in_lineage:
+            context["triples"].add((prod, "uses", inst_tech))
+    for ent_info in current_field_entities:
+        _track_doc_level_entity(context, ent_info["type"], ent_info["text"], include_techniques=True)
+
+def _handle_update_frequency(context, definition_text, keywords):
+    canonical_time = get_canonical_entity_info(definition_text)
+    if canonical_time["type"] == "TimeInterval":
+        context["triples"].add((context["doc_id"], "updated_every", canonical_time["text"]))
+    else:
+        context["triples"].add((context["doc_id"], "has_update_frequency", definition_text))
+
+def _handle_contact(context, definition_text, keywords):
+    # Extract organizations
+    for org_match in set(CONTACT_ORGANIZATION_PATTERN.findall(definition_text)):
+        canonical_org_contact = get_canonical_entity_info(org_match)
+        if canonical_org_contact["type"] == "Organization":
+            context["triples"].add((context["doc_id"], "has_contact_organization", canonical_org_contact["text"]))
+
+    # Simple name extraction: multi-word capitalized phrases that are not known organizations
+    for name in CONTACT_PERSON_PATTERN.findall(definition_text):
+        if len(name.split()) > 1 and name.lower() not in ORGANIZATION_PHRASES:
+            context["triples"].add((context["doc_id"], "has_contact_person", name))
+
+def _handle_keywords(context, definition_text, keywords):
+    for kw in keywords:
+        context["triples"].add((context["doc_id"], "has_keyword", kw))
+        canonical_info = get_canonical_entity_info(kw)
+        if canonical_info["type"] != "Unknown":
+            _track_doc_level_entity(context, canonical_info["type"], canonical_info["text"], include_techniques=True)
+            context["keyword_entities"].add(canonical_info["text"])
+
+def _handle_geographic_extent(context, definition_text, keywords):
+    for loc_match in set(GEOGRAPHIC_LOCATION_PATTERN.findall(definition_text)):
+        canonical_loc = get_canonical_entity_info(loc_match)
+        if canonical_loc["type"] == "Location":
+            context["triples"].add((context["doc_id"], "covers_region", canonical_loc["text"]))
+
+def _handle_distribution_information(context, definition_text, keywords):
+    for fmt_match in set(DISTRIBUTION_FORMAT_PATTERN.findall(definition_text)):
+        canonical_format = get_canonical_entity_info(fmt_match)
+        if canonical_format["type"] == "DataType/Format":
+            context["triples"].add((context["doc_id"], "available_in", canonical_format["text"]))
+    if "online download" in definition_text.lower():
+        context["triples"].add((context["doc_id"], "provides", get_canonical_entity_info("Online Download")["text"]))
+
+def _handle_topic_category(context, definition_text, keywords):
+    canonical_app = get_canonical_entity_info(definition_text)
+    if canonical_app["type"] == "Application":
+        context["triples"].add((context["doc_id"], "is_about_topic", canonical_app["text"]))
+        # Link the satellites/instruments seen so far in this document to the application
+        for sat_inst in context["satellites_instruments"]:
+            context["triples"].add((sat_inst, "supports", canonical_app["text"]))
+
+METADATA_ELEMENT_HANDLERS = {
+    "title": _handle_title,
+    "abstract": _handle_abstract,
+    "data lineage or quality": _handle_data_lineage,
+    "update frequency": _handle_update_frequency,
+    "responsible party": _handle_contact,
+    "organization": _handle_contact,
+    "dataset contact": _handle_contact,
+    "keywords": _handle_keywords,
+    "geographic extent": _handle_geographic_extent,
+    "geographic name, geographic identifier": _handle_geographic_extent,
+    "bounding box": _handle_geographic_extent,
+    "distribution information": _handle_distribution_information,
+    "topic category": _handle_topic_category,
+}
+
+def process_document_node(doc_data, parsed_texts=None):
     """
     Processes a single DOCUMENT NODE to extract all types of triples.
 
     Args:
         doc_data (dict): A dictionary representing a single DOCUMENT NODE.
                          Expected to have a 'doc_id' key (which will now be the original URL or shortened URL).
+        parsed_texts (dict): Optional {text: (triples, entities)} results of extract_content_triples_batch
+                             for this document's collect_nlp_texts(). Missing texts are parsed here in one batch.
 
     Returns:
         list: A list of all extracted triples for this document.
     """
-    all_doc_triples = []
     doc_id = doc_data.get("doc_id") # This doc_id is now expected to be the original URL or shortened URL
     if not doc_id:
         print(f"Warning: Document node missing 'doc_id'. Skipping: {doc_data}")
         return []
+    all_doc_triples = set()
+
+    # Read the metadata tables once, then parse every text this node needs in a single nlp.pipe batch
+    with stage_timer("table_handling"):
+        metadata_tables = _prepare_metadata_tables(doc_data)
+    existing_entities = doc_data.get("entities")
+    parsed_texts = dict(parsed_texts) if parsed_texts else {}
+    pending_texts = [text for text in _collect_table_nlp_texts(metadata_tables) if text not in parsed_texts]
+    if pending_texts:
+        batch_results = extract_content_triples_batch((text, existing_entities) for text in pending_texts)
+        parsed_texts.update(zip(pending_texts, batch_results))
 
     # 1. Triples from Metadata (Document Properties)
     metadata_fields = ["original_url", "file_type", "language", "html_meta_title", "html_meta_description", "html_meta_abstract", "html_meta_keywords", "html_meta_generator"]
@@ -415,208 +959,56 @@ def process_document_node(doc_data):
             # This handles cases where the doc_id IS the full original URL.
             if key == "original_url" and str(value) == doc_id:
                 continue
-            all_doc_triples.append((doc_id, f"has_{key}", str(value)))
-
-    # Track entities found in the document's main descriptive fields for higher-level inference
-    doc_level_satellites_instruments = set()
-    doc_level_products_applications = set()
-    doc_level_techniques = set()
-
-    # 2. Extract from extracted_tables (Primary content source)
-    if doc_data.get("extracted_tables"):
-        for table in doc_data["extracted_tables"]:
-            headers = [h.lower() for h in table.get("headers", [])]
-            data = table.get("data", [])
-
-            try:
-                core_metadata_col_idx = headers.index("core metadata elements")
-                definition_col_idx = headers.index("definition")
-            except ValueError:
-                continue
-
-            table_text_for_nlp = []
-
-            for row in data:
-                if len(row) > max(core_metadata_col_idx, definition_col_idx):
-                    element_name = row[core_metadata_col_idx].strip()
-                    definition_text = row[definition_col_idx].strip()
-
-                    if element_name and definition_text:
-                        clean_element_name = re.sub(r'[^a-zA-Z0-9_]', '', element_name.lower().replace(" ", "_"))
-                        if clean_element_name:
-                            all_doc_triples.append((doc_id, f"has_{clean_element_name}", definition_text))
-
-                        # --- Enhanced Inference based on specific metadata fields ---
-                        current_field_entities = []
-                        current_field_triples = []
-
-                        if element_name.lower() == "title":
-                            table_text_for_nlp.append(f"The document title is: {definition_text}.")
-                            current_field_triples, current_field_entities = extract_content_triples(definition_text, doc_data.get("entities"))
-                            all_doc_triples.extend(current_field_triples)
-                            for ent_info in current_field_entities:
-                                if ent_info["type"] in ["Product", "Application", "Mission"]:
-                                    all_doc_triples.append((doc_id, "describes", ent_info["text"]))
-                                if ent_info["type"] in ["Satellite", "Instrument"]:
-                                    doc_level_satellites_instruments.add(ent_info["text"])
-                                if ent_info["type"] in ["Product", "Application"]:
-                                    doc_level_products_applications.add(ent_info["text"])
-
-                        elif element_name.lower() == "abstract":
-                            table_text_for_nlp.append(definition_text)
-                            current_field_triples, current_field_entities = extract_content_triples(definition_text, doc_data.get("entities"))
-                            all_doc_triples.extend(current_field_triples)
-                            for ent_info in current_field_entities:
-                                if ent_info["type"] != "Unknown":
-                                    all_doc_triples.append((doc_id, "mentions", ent_info["text"]))
-                                if ent_info["type"] in ["Satellite", "Instrument"]:
-                                    doc_level_satellites_instruments.add(ent_info["text"])
-                                if ent_info["type"] in ["Product", "Application"]:
-                                    doc_level_products_applications.add(ent_info["text"])
-
-                        elif element_name.lower() == "data lineage or quality":
-                            table_text_for_nlp.append(definition_text)
-                            current_field_triples, current_field_entities = extract_content_triples(definition_text, doc_data.get("entities"))
-                            all_doc_triples.extend(current_field_triples)
-                            # Infer (Product, uses, Instrument/Technique)
-                            products_in_lineage = {e["text"] for e in current_field_entities if e["type"] == "Product"}
-                            instruments_techniques_in_lineage = {e["text"] for e in current_field_entities if e["type"] in ["Instrument", "Technique"]}
-                            for prod in products_in_lineage:
-                                for inst_tech in instruments_techniques_in_lineage:
-                                    all_doc_triples.append((prod, "uses", inst_tech))
-                            for ent_info in current_field_entities: # Add to doc-level tracking
-                                if ent_info["type"] in ["Satellite", "Instrument"]:
-                                    doc_level_satellites_instruments.add(ent_info["text"])
-                                if ent_info["type"] in ["Product", "Application"]:
-                                    doc_level_products_applications.add(ent_info["text"])
-                                if ent_info["type"] == "Technique":
-                                    doc_level_techniques.add(ent_info["text"])
-
-
-                        elif element_name.lower() == "update frequency":
-                            table_text_for_nlp.append(f"It is updated {definition_text}.")
-                            canonical_time = get_canonical_entity_info(definition_text)
-                            if canonical_time["type"] == "TimeInterval":
-                                all_doc_triples.append((doc_id, "updated_every", canonical_time["text"]))
-                            else:
-                                all_doc_triples.append((doc_id, "has_update_frequency", definition_text))
-                        
-                        elif element_name.lower() == "responsible party" or element_name.lower() == "organization" or element_name.lower() == "dataset contact":
-                            # Process contact info for organization and person
-                            table_text_for_nlp.append(definition_text) # Add for general NLP
-                            
-                            # Extract organizations
-                            org_matches = re.findall(r'(SAC \(ISRO\)|ISRO|MOSDAC|Indian Navy|WMO|IMD)', definition_text, re.IGNORECASE)
-                            for org_match in set(org_matches):
-                                canonical_org_contact = get_canonical_entity_info(org_match)
-                                if canonical_org_contact["type"] == "Organization":
-                                    all_doc_triples.append((doc_id, "has_contact_organization", canonical_org_contact["text"]))
-                            
-                            # Simple name extraction (can be improved with NER for PERSON)
-                            # Look for capitalized words that are not common stop words or known organizations
-                            potential_names = re.findall(r'\b[A-Z][a-z]+(?: [A-Z][a-z]+)*\b', definition_text)
-                            for name in potential_names:
-                                # Simple filter to avoid common single words or known orgs
-                                if len(name.split()) > 1 and name.lower() not in [o.lower() for o in CANONICAL_ENTITIES if CANONICAL_ENTITIES[o]["type"] == "Organization"]:
-                                    all_doc_triples.append((doc_id, "has_contact_person", name))
-
-
-                        elif element_name.lower() == "keywords":
-                            keywords = [k.strip() for k in re.split(r'[,/]', definition_text) if k.strip()]
-                            for kw in keywords:
-                                all_doc_triples.append((doc_id, "has_keyword", kw))
-                                canonical_info = get_canonical_entity_info(kw)
-                                if canonical_info["type"] != "Unknown":
-                                    table_text_for_nlp.append(canonical_info["text"]) # Add keywords for general NLP processing
-                                    # Add keywords to relevant doc-level sets
-                                    if canonical_info["type"] in ["Satellite", "Instrument"]:
-                                        doc_level_satellites_instruments.add(canonical_info["text"])
-                                    if canonical_info["type"] in ["Product", "Application"]:
-                                        doc_level_products_applications.add(canonical_info["text"])
-                                    if canonical_info["type"] == "Technique":
-                                        doc_level_techniques.add(canonical_info["text"])
-
-
-                        elif element_name.lower() == "geographic extent" or element_name.lower() == "geographic name, geographic identifier" or element_name.lower() == "bounding box":
-                             loc_matches = re.findall(r'\b(Indian Region|India|Ukai reservoir|Brahmaputra River|Tropics|Ocean|Indian Ocean|Asia Sector|Western Himalayan region|All-India beaches|New Delhi|Ahmedabad)\b', definition_text, re.IGNORECASE)
-                             for loc_match in set(loc_matches):
-                                 canonical_loc = get_canonical_entity_info(loc_match)
-                                 if canonical_loc["type"] == "Location":
-                                     all_doc_triples.append((doc_id, "covers_region", canonical_loc["text"]))
-                        
-                        elif element_name.lower() == "distribution information":
-                            dist_format_matches = re.findall(r'\b(text|PNG|HDF|netCDF|geoTiff|JPG|GIF)\b', definition_text, re.IGNORECASE)
-                            for fmt_match in set(dist_format_matches):
-                                canonical_format = get_canonical_entity_info(fmt_match)
-                                if canonical_format["type"] == "DataType/Format":
-                                    all_doc_triples.append((doc_id, "available_in", canonical_format["text"]))
-                            if "online download" in definition_text.lower():
-                                all_doc_triples.append((doc_id, "provides", get_canonical_entity_info("Online Download")["text"]))
-                        
-                        elif element_name.lower() == "topic category":
-                            canonical_app = get_canonical_entity_info(definition_text)
-                            if canonical_app["type"] == "Application":
-                                all_doc_triples.append((doc_id, "is_about_topic", canonical_app["text"]))
-                                # If we have a primary satellite/instrument for this document, link it to the application
-                                for sat_inst in doc_level_satellites_instruments:
-                                    all_doc_triples.append((sat_inst, "supports", canonical_app["text"]))
-
+            all_doc_triples.add((doc_id, f"has_{key}", str(value)))
+
+    # Entities found in the document's main descriptive fields, for higher-level inference
+    context = {
+        "doc_id": doc_id,
+        "triples": all_doc_triples,
+        "parsed_texts": parsed_texts,
+        "satellites_instruments": set(),
+        "products_applications": set(),
+        "techniques": set(),
+        "keyword_entities": set() # Canonical entities listed under "keywords"
+    }
+
+    # 2. Extract from extracted_tables (Primary content source), one pass over the rows
+    with stage_timer("table_handling"):
+        for rows, table_text in metadata_tables:
+            for element_name, element, definition_text, keywords in rows:
+                predicate = _element_keys(element_name)[1]
+                if predicate:
+                    all_doc_triples.add((doc_id, predicate, definition_text))
+                handler = METADATA_ELEMENT_HANDLERS.get(element)
+                if handler is not None:
+                    handler(context, definition_text, keywords)
 
             # After processing all rows, ensure general NLP is run on combined text
-            if table_text_for_nlp:
-                full_table_content_text = " ".join(table_text_for_nlp)
-                content_triples, _ = extract_content_triples(full_table_content_text, doc_data.get("entities"))
-                all_doc_triples.extend(content_triples)
-
+            if table_text:
+                content_triples, _ = parsed_texts[table_text]
+                all_doc_triples.update(content_triples)
 
     # --- Post-table processing for higher-level inference (using collected doc-level entities) ---
+    doc_level_satellites_instruments = context["satellites_instruments"]
+    doc_level_products_applications = context["products_applications"]
+    doc_level_techniques = context["techniques"]
+
     # Infer (Satellite/Instrument, provides, Product/Application)
     for sat_inst in doc_level_satellites_instruments:
         for prod_app in doc_level_products_applications:
-            # Add a direct 'provides' triple if not already present
-            if (sat_inst, "provides", prod_app) not in all_doc_triples:
-                all_doc_triples.append((sat_inst, "provides", prod_app))
-    
+            all_doc_triples.add((sat_inst, "provides", prod_app))
+
     # Infer (Product, uses, Technique) from doc-level entities
     for prod_app in doc_level_products_applications:
         for tech in doc_level_techniques:
-            if (prod_app, "uses", tech) not in all_doc_triples:
-                all_doc_triples.append((prod_app, "uses", tech))
+            all_doc_triples.add((prod_app, "uses", tech))
 
 
     # 3. "CONTAINS" relationships (Document -> Entity)
-    # Re-collect all entities found during NLP processing of table data and other fields
-    all_found_entities_in_text = set() # Use a set to avoid duplicates
-    
-    # Add entities from doc_level_sets (these were populated during table processing)
-    all_found_entities_in_text.update(doc_level_satellites_instruments)
-    all_found_entities_in_text.update(doc_level_products_applications)
-    all_found_entities_in_text.update(doc_level_techniques)
-
-    # Also add entities from keywords (already handled in keywords section, but ensure consistency)
-    for table in doc_data.get("extracted_tables", []):
-        headers = [h.lower() for h in table.get("headers", [])]
-        data = table.get("data", [])
-        try:
-            core_metadata_col_idx = headers.index("core metadata elements")
-            definition_col_idx = headers.index("definition")
-            for row in data:
-                if len(row) > max(core_metadata_col_idx, definition_col_idx):
-                    element_name = row[core_metadata_col_idx].strip().lower()
-                    definition_text = row[definition_col_idx].strip()
-                    if element_name == "keywords":
-                        keywords = [k.strip() for k in re.split(r'[,/]', definition_text) if k.strip()]
-                        for kw in keywords:
-                            canonical_info = get_canonical_entity_info(kw)
-                            if canonical_info["type"] != "Unknown":
-                                all_found_entities_in_text.add(canonical_info["text"])
-        except ValueError:
-            pass # Table format not as expected
-            
+    # Entities collected from the table fields and keywords during table processing
+    all_found_entities_in_text = doc_level_satellites_instruments | doc_level_products_applications | doc_level_techniques | context["keyword_entities"]
     for entity_text in all_found_entities_in_text:
-        # Ensure the doc_id contains the entity, if it's not already there
-        if (doc_id, "contains", entity_text) not in all_doc_triples:
-            all_doc_triples.append((doc_id, "contains", entity_text))
+        all_doc_triples.add((doc_id, "contains", entity_text))
 
 
     # 4. "LINKS_TO" relationships (Document -> Other Document/URL)
@@ -626,18 +1018,18 @@ def process_document_node(doc_data):
             # If the link is to the doc_id itself, it's redundant
             if href == doc_id:
                 continue
-            all_doc_triples.append((doc_id, "links_to", href))
+            all_doc_triples.add((doc_id, "links_to", href))
 
     # 5. "HAS_TABLE" relationships
     if doc_data.get("extracted_tables"):
+        # Use a table ID that incorporates the doc_id for clarity
+        # Replace characters that might be problematic in a file path or simple string ID
+        safe_doc_id = doc_id.replace('https://', '').replace('http://', '').replace('/', '_').replace(':', '_').replace('.', '_').replace('?', '_').replace('=', '_').replace('&', '_')
         for i, table_data in enumerate(doc_data["extracted_tables"]):
-            # Use a table ID that incorporates the doc_id for clarity
-            # Replace characters that might be problematic in a file path or simple string ID
-            safe_doc_id = doc_id.replace('https://', '').replace('http://', '').replace('/', '_').replace(':', '_').replace('.', '_').replace('?', '_').replace('=', '_').replace('&', '_')
             table_id = f"Table_{safe_doc_id}_{i+1}"
-            all_doc_triples.append((doc_id, "has_table", table_id))
+            all_doc_triples.add((doc_id, "has_table", table_id))
 
 
-    return list(set(all_doc_triples)) # Ensure uniqueness across all types of triples for the doc
+    return list(all_doc_triples) # Triples are collected in a set, so they are unique across all types
 
 # No __main__ block here, as this file is now a module to be imported.
\ No newline at end of file
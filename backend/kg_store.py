@@ -0,0 +1,213 @@
+# kg_store.py
+#
+# Sharded, streaming storage for the knowledge graph.
+# A KG directory holds JSON Lines shards (one {"doc_id": ..., "triples": [[s, p, o], ...]} record per line)
+# and a manifest.json listing each shard with its record count and md5 (and the md5 of extra files such as
+# the alias table), written last.
+# Records are appended as documents finish, so the same doc_id may appear in several records;
+# readers merge them. A legacy single-file KG ({doc_id: [[s, p, o], ...]}) is read as well.
+
+import os
+import json
+import shutil
+import hashlib
+
+MANIFEST_FILE = "manifest.json"
+ALIASES_FILE = "aliases.json" # Alias table written by the consolidation pass (kg_consolidate.py)
+SHARD_FILE_TEMPLATE = "kg-{:05d}.jsonl"
+FORMAT_NAME = "mosdac-kg-jsonl"
+FORMAT_VERSION = 2 # 2: extra_files lists {"file", "md5"} entries instead of bare file names
+SHARD_MAX_RECORDS = 5000 # Records per shard before a new shard is started
+
+class KGStoreError(Exception):
+    """Raised when a KG directory is incomplete or fails its manifest checks."""
+
+
+class KGShardWriter:
+    """
+    Writes KG records to JSON Lines shards as they are produced. Shards are written into a temporary
+    sibling directory that replaces output_dir on close(), so readers never see a partial build.
+    """
+    def __init__(self, output_dir, shard_max_records=SHARD_MAX_RECORDS):
+        self.output_dir = output_dir
+        self.temp_dir = output_dir.rstrip("/\\") + ".tmp"
+        self.shard_max_records = shard_max_records
+        self.shards = []
+        self.documents = set()
+        self.records = 0
+        self.triples = 0
+        self._file = None
+        self._md5 = None
+        self._shard_records = 0
+        self._shard_triples = 0
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+        os.makedirs(self.temp_dir)
+
+    def write(self, doc_id, triples):
+        """
+        Appends one document record.
+        """
+        if self._file is None or self._shard_records >= self.shard_max_records:
+            self._close_shard()
+            self._open_shard()
+        line = json.dumps({"doc_id": doc_id, "triples": [list(triple) for triple in triples]}, ensure_ascii=False) + "\n"
+        data = line.encode("utf-8")
+        self._file.write(data)
+        self._md5.update(data)
+        self._shard_records += 1
+        self._shard_triples += len(triples)
+        self.records += 1
+        self.triples += len(triples)
+        self.documents.add(doc_id)
+
+    def _open_shard(self):
+        file_name = SHARD_FILE_TEMPLATE.format(len(self.shards))
+        self._file = open(os.path.join(self.temp_dir, file_name), "wb")
+        self._md5 = hashlib.md5()
+        self._shard_records = 0
+        self._shard_triples = 0
+        self.shards.append({"file": file_name})
+
+    def _close_shard(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self.shards[-1].update({"records": self._shard_records, "triples": self._shard_triples, "md5": self._md5.hexdigest()})
+        self._file = None
+
+    def close(self, extra_files=None):
+        """
+        Finishes the last shard, writes any extra_files ({file_name: JSON-serializable object}, e.g. the
+        alias table) and the manifest, and moves the build into place. Returns the manifest.
+        """
+        self._close_shard()
+        extra_file_entries = []
+        for file_name, content in sorted((extra_files or {}).items()):
+            data = json.dumps(content, ensure_ascii=False).encode("utf-8")
+            with open(os.path.join(self.temp_dir, file_name), "wb") as f:
+                f.write(data)
+            extra_file_entries.append({"file": file_name, "md5": hashlib.md5(data).hexdigest()})
+        manifest = {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "documents": len(self.documents),
+            "records": self.records,
+            "triples": self.triples,
+            "shards": self.shards,
+            "extra_files": extra_file_entries
+        }
+        with open(os.path.join(self.temp_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        old_dir = self.output_dir.rstrip("/\\") + ".old"
+        if os.path.exists(old_dir):
+            shutil.rmtree(old_dir)
+        if os.path.exists(self.output_dir):
+            os.replace(self.output_dir, old_dir)
+        os.replace(self.temp_dir, self.output_dir)
+        if os.path.exists(old_dir):
+            shutil.rmtree(old_dir)
+        return manifest
+
+    def abort(self):
+        """
+        Discards the partial build, leaving any existing output_dir untouched.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+
+def read_manifest(kg_dir):
+    manifest_path = os.path.join(kg_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        raise KGStoreError(f"No {MANIFEST_FILE} in {kg_dir}; the KG build may be incomplete.")
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_NAME:
+        raise KGStoreError(f"{manifest_path} is not a {FORMAT_NAME} manifest.")
+    return manifest
+
+
+def iter_kg_records(kg_dir, verify=True):
+    """
+    Streams (doc_id, triples) records from a KG directory, one line at a time.
+    With verify=True each shard's md5 is checked against the manifest once the shard has been read.
+    """
+    manifest = read_manifest(kg_dir)
+    for shard in manifest["shards"]:
+        shard_path = os.path.join(kg_dir, shard["file"])
+        md5 = hashlib.md5()
+        with open(shard_path, "rb") as f:
+            for line in f:
+                md5.update(line)
+                record = json.loads(line)
+                yield record["doc_id"], record["triples"]
+        if verify and md5.hexdigest() != shard.get("md5"):
+            raise KGStoreError(f"Checksum mismatch for {shard_path}.")
+
+
+def load_kg(kg_path, verify=True):
+    """
+    Loads a KG as {doc_id: [[s, p, o], ...]} from a shard directory (streamed) or a legacy JSON file.
+    Triples of repeated doc_id records are merged without duplicates.
+    """
+    if not os.path.isdir(kg_path):
+        with open(kg_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    kg = {}
+    seen_by_doc = {} # doc_id -> set of its triples, built when the doc_id is first repeated
+    for doc_id, triples in iter_kg_records(kg_path, verify=verify):
+        if doc_id not in kg:
+            kg[doc_id] = triples
+            continue
+        doc_triples = kg[doc_id]
+        seen = seen_by_doc.get(doc_id)
+        if seen is None:
+            seen = seen_by_doc[doc_id] = {tuple(triple) for triple in doc_triples}
+        for triple in triples:
+            if tuple(triple) not in seen:
+                seen.add(tuple(triple))
+                doc_triples.append(triple)
+    return kg
+
+
+def get_aliases_path(kg_path):
+    """
+    Alias table location for a KG: inside a shard directory, or "<name>.aliases.json" next to a JSON KG.
+    """
+    if os.path.isdir(kg_path):
+        return os.path.join(kg_path, ALIASES_FILE)
+    return os.path.splitext(kg_path)[0] + ".aliases.json"
+
+
+def load_aliases(kg_path):
+    """
+    Returns the KG's alias table ({surface_form_lower: node_id}), or {} if it has none.
+    """
+    aliases_path = get_aliases_path(kg_path)
+    if not os.path.exists(aliases_path):
+        return {}
+    with open(aliases_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def kg_fingerprint(kg_path):
+    """
+    Short content hash of a KG: of the manifest (which holds the md5 of every shard and of the alias table)
+    for a shard directory, or of the whole file and its alias table for a legacy JSON KG.
+    """
+    if os.path.isdir(kg_path):
+        paths = [os.path.join(kg_path, MANIFEST_FILE)]
+    else:
+        aliases_path = get_aliases_path(kg_path)
+        paths = [kg_path, aliases_path] if os.path.exists(aliases_path) else [kg_path]
+    md5 = hashlib.md5()
+    for path in paths:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                md5.update(block)
+    return md5.hexdigest()[:12]
@@ -0,0 +1,82 @@
+import os
+import sys
+import json
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+PROCESSED_DIR = os.path.join(BACKEND_DIR, "data", "layer2", "processed")
+
+# A small KG in the legacy single-file format, shaped like the crawled MOSDAC pages
+SAMPLE_KG = {
+    "https://www.mosdac.gov.in/insat-3d": [
+        ["INSAT-3D", "carries", "Imager"],
+        ["INSAT-3D", "carries", "Sounder"],
+        ["INSAT-3D", "provides", "Sea Surface Temperature (SST)"],
+        ["INSAT-3D", "available_in", "HDF5"],
+        ["INSAT-3D", "updated_every", "30 minutes"],
+        ["INSAT-3D", "launched_in", "2013"],
+    ],
+    "https://www.mosdac.gov.in/insat-3dr": [
+        ["INSAT-3DR", "carries", "Imager"],
+        ["INSAT-3DR", "carries", "Sounder"],
+        ["INSAT-3DR", "provides", "Rainfall"],
+        ["INSAT-3DR", "available_in", "HDF5"],
+        ["INSAT-3DR", "available_in", "GeoTIFF"],
+        ["INSAT-3DR", "launched_in", "2016"],
+    ],
+    "https://www.mosdac.gov.in/": [
+        ["MOSDAC", "provides", "Sea Surface Temperature (SST)"],
+        ["MOSDAC", "provides", "Rainfall"],
+        ["MOSDAC", "links_to", "https://www.mosdac.gov.in/insat-3d"],
+        ["Meteorological and Oceanographic Satellite Data Archival Centre", "provides", "Rainfall"],
+    ],
+}
+
+
+def fixture_documents():
+    """
+    The layer-2 processed documents checked in under data/layer2/processed, as (path, document node).
+    """
+    documents = []
+    for root, _, files in os.walk(PROCESSED_DIR):
+        for name in sorted(files):
+            if name.endswith(".json"):
+                path = os.path.join(root, name)
+                with open(path, "r", encoding="utf-8") as f:
+                    documents.append((path, json.load(f)))
+    return sorted(documents, key=lambda item: item[0])
+
+
+def fixture_texts():
+    """
+    Every text of the processed documents that carries canonical phrases: the texts the extractor parses,
+    plus the table cells and link texts they are built from.
+    """
+    from kg_extractor import collect_nlp_texts
+    texts = []
+    for _, doc_data in fixture_documents():
+        texts.extend(collect_nlp_texts(doc_data))
+        if doc_data.get("cleaned_text"):
+            texts.append(doc_data["cleaned_text"])
+        for table in doc_data.get("extracted_tables") or []:
+            for row in table.get("data") or []:
+                texts.extend(cell for cell in row if isinstance(cell, str))
+        texts.extend(link.get("text") for link in doc_data.get("extracted_links") or [])
+    return list(dict.fromkeys(text for text in texts if text and text.strip()))
+
+
+@pytest.fixture(scope="session")
+def sample_kg_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("kg") / "all_extracted_kg.json"
+    path.write_text(json.dumps(SAMPLE_KG), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def chatbot(sample_kg_path):
+    from kg_chatbot import KnowledgeGraphChatbot
+    return KnowledgeGraphChatbot(sample_kg_path)
@@ -0,0 +1,46 @@
+import sys
+import threading
+import time
+
+THREADS = 8
+QUERIES_PER_THREAD = 20000
+
+
+def test_answer_stats_are_counted_exactly_under_concurrent_queries(chatbot):
+    before = chatbot.get_status()["answer_stats"]
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6) # Switch threads as often as possible to provoke lost updates
+    snapshots = []
+    stop = threading.Event()
+
+    def serve(path):
+        started_at = time.perf_counter()
+        for _ in range(QUERIES_PER_THREAD):
+            chatbot._record_answer_path(path, started_at)
+
+    def poll_status():
+        while not stop.is_set():
+            snapshots.append(chatbot.get_status()["answer_stats"])
+
+    workers = [threading.Thread(target=serve, args=("template" if i % 2 else "llm",)) for i in range(THREADS)]
+    poller = threading.Thread(target=poll_status)
+    try:
+        poller.start()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    finally:
+        stop.set()
+        poller.join()
+        sys.setswitchinterval(switch_interval)
+
+    after = chatbot.get_status()["answer_stats"]
+    for path in ("template", "llm"):
+        assert after[path]["count"] - before[path]["count"] == THREADS // 2 * QUERIES_PER_THREAD
+    # Snapshots are copies and counters never go backwards between them
+    assert snapshots and all(snapshot is not chatbot.answer_stats for snapshot in snapshots)
+    for earlier, later in zip(snapshots, snapshots[1:]):
+        assert all(earlier[path]["count"] <= later[path]["count"] for path in ("template", "llm"))
+    after["llm"]["count"] = -1
+    assert chatbot.get_status()["answer_stats"]["llm"]["count"] >= 0
@@ -0,0 +1,58 @@
+import pytest
+
+
+@pytest.fixture(scope="module")
+def app_module(chatbot):
+    import app as app_module
+    original = app_module.chatbot
+    app_module.chatbot = chatbot # The module's own chatbot has no KG outside the deployment
+    yield app_module
+    app_module.chatbot = original
+
+
+def _get(app_module, path, headers=None):
+    # Dispatches through the full request cycle (after_request hooks included) without a test client
+    with app_module.app.test_request_context(path, headers=headers or {}):
+        return app_module.app.full_dispatch_request()
+
+
+@pytest.mark.parametrize("header, gzip_only, with_brotli", [
+    ("gzip, deflate, br", "gzip", "br"),
+    ("gzip;q=0, *", None, "br"),
+    ("br;q=0, *", "gzip", "gzip"),
+    ("br;q=0, gzip;q=0, *", None, None),
+    ("*;q=0", None, None),
+    ("identity", None, None),
+    ("*", "gzip", "br"),
+])
+def test_choose_encoding_respects_refused_codings(app_module, monkeypatch, header, gzip_only, with_brotli):
+    monkeypatch.setattr(app_module, "_BROTLI_AVAILABLE", False)
+    assert app_module._choose_encoding(header) == gzip_only
+    monkeypatch.setattr(app_module, "_BROTLI_AVAILABLE", True)
+    assert app_module._choose_encoding(header) == with_brotli
+
+
+def test_revalidation_returns_304_without_building_the_payload(app_module, chatbot, monkeypatch):
+    first = _get(app_module, "/api/entity/INSAT-3D")
+    assert first.status_code == 200
+    assert first.get_json()["entity"] == "INSAT-3D"
+    etag = first.headers["ETag"]
+
+    calls = []
+    monkeypatch.setattr(chatbot, "get_entity_summary", lambda name: calls.append(name))
+    revalidated = _get(app_module, "/api/entity/INSAT-3D", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
+    assert revalidated.headers["Vary"] == first.headers["Vary"] == "Accept-Encoding"
+    assert calls == []
+
+    other_entity = _get(app_module, "/api/entity/INSAT-3DR", headers={"If-None-Match": etag})
+    assert other_entity.status_code == 200
+    assert calls == ["INSAT-3DR"]
+
+
+def test_kg_stats_etag_follows_the_kg_version(app_module, chatbot, monkeypatch):
+    etag = _get(app_module, "/api/kg/stats").headers["ETag"]
+    assert _get(app_module, "/api/kg/stats", headers={"If-None-Match": etag}).status_code == 304
+    monkeypatch.setattr(chatbot, "kg_version", "rebuilt")
+    assert _get(app_module, "/api/kg/stats", headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,38 @@
+import re
+
+import pytest
+
+import kg_extractor
+from conftest import fixture_texts
+
+
+def regex_canonical_entities(text):
+    """
+    The per-phrase regex loop the PhraseMatcher replaced, kept as the reference.
+    """
+    found_entities = []
+    for phrase, info in kg_extractor.CANONICAL_ENTITIES.items():
+        for match in re.finditer(r'\b' + re.escape(phrase) + r'\b', text.lower()):
+            start_char, end_char = match.span()
+            found_entities.append({"text": info["text"], "type": info["type"], "span": (start_char, end_char)})
+    return found_entities
+
+
+EDGE_CASES = [
+    "INSAT-3D. INSAT-3DR and INSAT-3D/3DR carry an Imager.",
+    "SAC (ISRO), Ahmedabad-380015, India. Email:someone@sac.isro.gov.in",
+    "Data over the Indian\nRegion and the Indian  Ocean; see www.mosdac.gov.in/insat-3d.",
+    "Space Applications Centre (SAC) and Space Applications Centre (SAC)x products.",
+    "OCEANSAT-2 and Oceansat-2's OCM; sea surface temperature (SST), SST-based products.",
+]
+
+
+def test_fixture_texts_cover_canonical_phrases():
+    matches = sum(len(regex_canonical_entities(text)) for text in fixture_texts())
+    assert matches > 100
+
+
+@pytest.mark.parametrize("texts", [fixture_texts(), EDGE_CASES], ids=["fixtures", "edge_cases"])
+def test_phrase_matcher_matches_regex_loop(texts):
+    for doc in kg_extractor.nlp.pipe(texts):
+        assert kg_extractor.match_canonical_entities(doc) == regex_canonical_entities(doc.text), doc.text[:200]
@@ -0,0 +1,123 @@
+import tracemalloc
+
+import pytest
+
+import kg_extractor
+
+# Sentence without entities, made of long words so a multi-MB text stays cheap to parse
+FILLER = ("Radiometriccalibrationcoefficientswererecomputedagainstonboardblackbodyreferences "
+          "beforegeolocationprocessingcontinuedwithoutinterruptionacrossthearchive. ")
+SATELLITES = ["INSAT-3D", "KALPANA-1", "OCEANSAT-2", "SCATSAT-1", "INSAT-3DS", "OCEANSAT-3"]
+PRODUCTS = ["Rainfall Estimate", "Cloud Mask", "Soil Wetness Index", "Cloud Burst Nowcast", "Sea State Forecast"]
+STRESS_TEXT_CHARS = 2_000_000
+SENTENCE_STRIDE = 9973 # Chars between the entity sentences placed in the filler
+
+
+def filler(length):
+    """
+    Filler text of exactly length characters (at least 4), ending at a sentence boundary.
+    """
+    copies, remainder = divmod(length, len(FILLER))
+    if copies and remainder < 4:
+        copies, remainder = copies - 1, remainder + len(FILLER)
+    return FILLER * copies + ("W" * (remainder - 2) + ". " if remainder else "")
+
+
+def build_stress_text(sentences):
+    """
+    Filler with the entity sentences placed every SENTENCE_STRIDE chars and across every multiple of
+    MAX_CHUNK_CHARS (where a chunker unaware of sentences would cut). Returns the text and the
+    (offset, sentence) placements.
+    """
+    positions = set(range(SENTENCE_STRIDE, STRESS_TEXT_CHARS, SENTENCE_STRIDE))
+    positions.update(cut - 25 for cut in range(kg_extractor.MAX_CHUNK_CHARS, STRESS_TEXT_CHARS, kg_extractor.MAX_CHUNK_CHARS))
+    parts = []
+    placements = []
+    offset = 0
+    for i, position in enumerate(sorted(positions)):
+        if position - offset < 4:
+            continue
+        sentence = sentences[i % len(sentences)]
+        parts.append(filler(position - offset))
+        parts.append(sentence)
+        placements.append((position, sentence))
+        offset = position + len(sentence)
+    parts.append(filler(STRESS_TEXT_CHARS - offset))
+    return "".join(parts), placements
+
+
+@pytest.fixture(scope="module")
+def sentence_results():
+    """
+    {sentence: extract_content_triples(sentence)} for the entity sentences that yield a triple on their own.
+    """
+    results = {}
+    for satellite in SATELLITES:
+        for product in PRODUCTS:
+            sentence = f"{satellite} provides {product} products. "
+            triples, entities = kg_extractor.extract_content_triples(sentence.strip())
+            if triples:
+                results[sentence] = (triples, entities)
+    assert len(results) >= 20
+    return results
+
+
+def traced_extraction(text):
+    """
+    Runs extract_content_triples(text) under tracemalloc. Returns the result and the peak traced memory
+    beyond what the result itself holds.
+    """
+    tracemalloc.start()
+    try:
+        result = kg_extractor.extract_content_triples(text)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak - retained
+
+
+def test_split_text_into_chunks_covers_text_at_sentence_boundaries():
+    text = filler(450_000)
+    chunks = list(kg_extractor.split_text_into_chunks(text))
+    assert chunks[0][0] == 0 and chunks[-1][0] + len(chunks[-1][1]) == len(text)
+    for (start, chunk), (next_start, _) in zip(chunks, chunks[1:]):
+        assert len(chunk) <= kg_extractor.MAX_CHUNK_CHARS
+        assert chunk == text[start:start + len(chunk)]
+        assert start < next_start <= start + len(chunk) # Consecutive chunks overlap or touch
+        assert start + len(chunk) - next_start <= kg_extractor.CHUNK_OVERLAP_CHARS
+        assert text[next_start - 2:next_start] == ". "
+
+
+def test_multi_mb_text_is_extracted_in_bounded_memory_and_merged_across_chunks(sentence_results):
+    text, placements = build_stress_text(list(sentence_results))
+    assert len(text) == STRESS_TEXT_CHARS > kg_extractor.nlp.max_length
+
+    chunk_ranges = [(start, start + len(chunk)) for start, chunk in kg_extractor.split_text_into_chunks(text)]
+    overlaps = [(next_start, end) for (_, end), (next_start, _) in zip(chunk_ranges, chunk_ranges[1:])]
+    assert len(chunk_ranges) >= STRESS_TEXT_CHARS // kg_extractor.MAX_CHUNK_CHARS
+    straddling_cuts = [offset for offset, sentence in placements
+                       if any(offset < cut < offset + len(sentence) for cut in range(kg_extractor.MAX_CHUNK_CHARS, STRESS_TEXT_CHARS, kg_extractor.MAX_CHUNK_CHARS))]
+    in_overlaps = [offset for offset, sentence in placements
+                   if any(start <= offset and offset + len(sentence) <= end for start, end in overlaps)]
+    assert len(straddling_cuts) == STRESS_TEXT_CHARS // kg_extractor.MAX_CHUNK_CHARS - 1
+    assert in_overlaps # Sentences parsed in two chunks
+
+    (_, one_chunk_peak) = traced_extraction(text[:kg_extractor.MAX_CHUNK_CHARS - 1000])
+    (triples, entities), peak = traced_extraction(text)
+
+    # Peak working memory is that of parsing one chunk, not proportional to the 20x longer text
+    assert peak < 2 * one_chunk_peak
+    assert peak < len(text)
+
+    # Every sentence, including those at the cuts and in the overlaps, yields its entities exactly once,
+    # at document offsets, and its triples
+    expected_triples = set()
+    expected_entities = []
+    for offset, sentence in placements:
+        sentence_triples, sentence_entities = sentence_results[sentence]
+        expected_triples.update(sentence_triples)
+        expected_entities.extend({**ent_data, "span": (ent_data["span"][0] + offset, ent_data["span"][1] + offset)}
+                                 for ent_data in sentence_entities)
+    assert set(triples) == expected_triples
+    assert len(triples) == len(expected_triples)
+    assert entities == expected_entities
@@ -0,0 +1,66 @@
+import os
+import json
+import importlib
+
+import pytest
+
+import build_kg
+from conftest import BACKEND_DIR
+
+LAYER2_DIR = os.path.join(BACKEND_DIR, "data", "layer2")
+PIPELINES = ["non_api_pipeline", "non_image_pipeline", "preprocessing_pipeline"]
+
+PAGE = """<html><head><title>INSAT-3D</title><meta name="description" content="INSAT-3D products"></head><body>
+<p>INSAT-3D provides Rainfall Estimate products over the Indian Region. The Imager on INSAT-3D measures Temperature.</p>
+<p>MOSDAC provides Sea Surface Temperature data. Oceansat-2 provides Sea Surface Temperature products,
+and SCATSAT-1 supports Weather Forecasting.</p>
+<table><tr><th>Sr. No</th><th>Core Metadata Elements</th><th>Definition</th></tr>
+<tr><td>1</td><td>Title</td><td>INSAT-3D Rainfall Estimate</td></tr>
+<tr><td>2</td><td>Keywords</td><td>Rainfall, INSAT-3D, Indian Region</td></tr></table>
+</body></html>"""
+
+
+def import_pipeline(name, monkeypatch, tmp_path):
+    # The pipelines open their log file and output directory relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(LAYER2_DIR)
+    pipeline = importlib.import_module(name)
+    monkeypatch.setattr(pipeline, "OUTPUT_DIR", str(tmp_path / "processed"))
+    monkeypatch.setattr(pipeline, "SAVE_SPACY_DOCBIN", True)
+    return pipeline
+
+
+def build(input_dir, output_file, use_docbin, monkeypatch):
+    monkeypatch.setattr(build_kg, "USE_SPACY_DOCBIN", use_docbin)
+    loaded = []
+    load_body_doc = build_kg.load_body_doc
+    def recording_load_body_doc(file_path, body):
+        doc = load_body_doc(file_path, body)
+        loaded.append(doc is not None)
+        return doc
+    monkeypatch.setattr(build_kg, "load_body_doc", recording_load_body_doc)
+    build_kg.build_kg([input_dir], output_file, 1, cache_file=None, output_format="json", consolidate=False)
+    with open(output_file, "r", encoding="utf-8") as f:
+        return json.load(f), loaded
+
+
+@pytest.mark.parametrize("pipeline_name", PIPELINES)
+def test_layer2_docbin_is_reused_by_the_kg_build(pipeline_name, monkeypatch, tmp_path):
+    pipeline = import_pipeline(pipeline_name, monkeypatch, tmp_path)
+    page_path = tmp_path / "insat-3d.html"
+    page_path.write_text(PAGE, encoding="utf-8")
+
+    success, _, _, output_path = pipeline._process_single_file(
+        str(page_path), {"url": "https://www.mosdac.gov.in/insat-3d", "language": "en"}, {"html": "HtmlParser"}, ["en"])
+    assert success
+    with open(output_path, "r", encoding="utf-8") as f:
+        document = json.load(f)
+    assert document["cleaned_text"].startswith("INSAT-3D")
+    assert os.path.exists(os.path.splitext(output_path)[0] + ".spacy")
+
+    input_dir = str(tmp_path / "processed")
+    reused_kg, reused = build(input_dir, str(tmp_path / "kg_docbin.json"), True, monkeypatch)
+    parsed_kg, _ = build(input_dir, str(tmp_path / "kg_parsed.json"), False, monkeypatch)
+    assert reused == [True]
+    assert reused_kg == parsed_kg
+    assert any(p == "provides" for _, p, _ in reused_kg["https://www.mosdac.gov.in/insat-3d"])
@@ -0,0 +1,99 @@
+import random
+
+import pytest
+
+import kg_extractor
+from conftest import fixture_documents, fixture_texts
+
+
+def quadratic_entity_overlaps(found_entities):
+    """
+    The pairwise overlap resolution resolve_entity_overlaps replaced, kept as the reference.
+    """
+    unique_entities_list = []
+    found_entities.sort(key=lambda x: (x["span"][0], -len(x["text"])))
+
+    for ent_data in found_entities:
+        start_char, end_char = ent_data["span"]
+        is_overlap = False
+        for existing_ent in unique_entities_list:
+            ex_start, ex_end = existing_ent["span"]
+            if start_char >= ex_start and end_char <= ex_end:
+                is_overlap = True
+                break
+            elif start_char <= ex_start and end_char >= ex_end:
+                unique_entities_list.remove(existing_ent)
+                unique_entities_list.append(ent_data)
+                is_overlap = True
+                break
+        if not is_overlap:
+            unique_entities_list.append(ent_data)
+
+    unique_entities_list.sort(key=lambda x: x["span"][0])
+    return unique_entities_list
+
+
+def scan_entity_tokens(doc, entities):
+    """
+    The per-entity scan over every token map_entity_tokens replaced, kept as the reference.
+    """
+    token_to_entity_map = {}
+    for ent_data in entities:
+        start_char, end_char = ent_data["span"]
+        entity_tokens_in_doc = [token for token in doc if token.idx >= start_char and (token.idx + len(token.text)) <= end_char]
+        for token in entity_tokens_in_doc:
+            token_to_entity_map[token.i] = ent_data
+    return token_to_entity_map
+
+
+def fixture_cases():
+    """
+    (Doc, candidate entities) for every fixture text, with each document's pre-extracted entities
+    passed along with the texts built from it.
+    """
+    existing_by_text = {}
+    for _, doc_data in fixture_documents():
+        for text in kg_extractor.collect_nlp_texts(doc_data):
+            existing_by_text.setdefault(text, doc_data.get("entities"))
+    texts = fixture_texts()
+    return [(doc, kg_extractor.collect_candidate_entities(doc, existing_by_text.get(text)))
+            for text, doc in zip(texts, kg_extractor.nlp.pipe(texts))]
+
+
+@pytest.fixture(scope="module")
+def cases():
+    return fixture_cases()
+
+
+def assert_same_resolution(doc, candidates):
+    expected = quadratic_entity_overlaps(list(candidates))
+    resolved = kg_extractor.resolve_entity_overlaps(list(candidates))
+    assert resolved == expected, doc.text[:200]
+    assert kg_extractor.map_entity_tokens(doc, resolved) == scan_entity_tokens(doc, expected), doc.text[:200]
+
+
+def test_fixture_texts_have_overlapping_entities(cases):
+    overlapping = sum(len(kg_extractor.resolve_entity_overlaps(list(candidates))) < len(candidates) for _, candidates in cases)
+    assert overlapping >= 10
+
+
+def test_sweep_line_matches_quadratic_reference_on_fixtures(cases):
+    for doc, candidates in cases:
+        assert_same_resolution(doc, candidates)
+
+
+def test_sweep_line_matches_quadratic_reference_on_shifted_fixture_spans(cases):
+    # The fixture entities with their spans nudged by a few characters, which produces the partial and
+    # nested overlaps the well-formed fixture entities rarely have
+    rng = random.Random(0)
+    for doc, candidates in cases:
+        if not candidates:
+            continue
+        for _ in range(20):
+            shifted = []
+            for ent_data in rng.sample(candidates, min(len(candidates), 12)):
+                start_char, end_char = ent_data["span"]
+                start_char = max(0, start_char + rng.randint(-4, 4))
+                end_char = max(start_char + 1, end_char + rng.randint(-4, 4))
+                shifted.append({**ent_data, "span": (start_char, end_char)})
+            assert_same_resolution(doc, shifted)
@@ -0,0 +1,45 @@
+import json
+import shutil
+import sqlite3
+
+import build_kg
+from conftest import fixture_documents
+
+
+def cache_rows(cache_file):
+    with sqlite3.connect(cache_file) as conn:
+        return sorted(conn.execute('SELECT content_hash, fingerprint FROM extractions'))
+
+
+def test_build_prunes_cache_entries_of_changed_and_removed_documents(tmp_path):
+    input_dir = tmp_path / "processed"
+    input_dir.mkdir()
+    paths = [path for path, _ in fixture_documents()[:3]]
+    for path in paths:
+        shutil.copy(path, input_dir)
+    cache_file = str(tmp_path / "cache.db")
+    output_file = str(tmp_path / "kg.json")
+
+    stats = build_kg.build_kg([str(input_dir)], output_file, 1, cache_file=cache_file, output_format="json", consolidate=False)
+    assert stats["cached_documents"] == 0
+    rows = cache_rows(cache_file)
+    assert [content_hash for content_hash, _ in rows] == sorted(build_kg.file_content_hash(path) for path in paths)
+    fingerprint = rows[0][1]
+
+    # An entry left by earlier extraction rules, one document edited and one removed from the input
+    with sqlite3.connect(cache_file) as conn:
+        conn.execute("INSERT INTO extractions VALUES ('old-hash', 'old-rules', 'old-doc', '[]', '')")
+    edited, removed, unchanged = sorted(input_dir.iterdir())
+    doc_data = json.loads(edited.read_text(encoding="utf-8"))
+    doc_data["metadata"]["edited"] = True
+    edited.write_text(json.dumps(doc_data), encoding="utf-8")
+    removed.unlink()
+
+    stats = build_kg.build_kg([str(input_dir)], output_file, 1, cache_file=cache_file, output_format="json", consolidate=False)
+    assert stats["cached_documents"] == 1
+    expected_hashes = sorted(build_kg.file_content_hash(str(path)) for path in (edited, unchanged))
+    assert cache_rows(cache_file) == [(content_hash, fingerprint) for content_hash in expected_hashes]
+
+    # A third build reuses both remaining entries
+    stats = build_kg.build_kg([str(input_dir)], output_file, 1, cache_file=cache_file, output_format="json", consolidate=False)
+    assert stats["cached_documents"] == 2
@@ -0,0 +1,61 @@
+from kg_consolidate import build_consolidation_map, consolidate_triples
+
+CANONICAL_ENTITIES = {
+    "insat-3d": {"text": "INSAT-3D", "type": "Satellite"},
+    "ocean": {"text": "Ocean", "type": "Location"},
+}
+
+KG = {
+    "https://www.mosdac.gov.in/": [
+        ["https://www.mosdac.gov.in/", "links_to", "/insat-3d"],
+        ["https://www.mosdac.gov.in/", "links_to", "/contact-us"],
+        ["https://www.mosdac.gov.in/", "links_to", "http://mosdac.gov.in/insat-3d/"],
+        ["https://www.mosdac.gov.in/", "mentions", "INSAT 3D data"],
+        ["https://www.mosdac.gov.in/", "has_keyword", "Ocean data"],
+        ["https://www.mosdac.gov.in/", "has_keyword", "insat 3d"],
+    ],
+    "https://www.mosdac.gov.in/insat-3d": [
+        ["insat-3d", "provides", "Rainfall"],
+        ["https://www.mosdac.gov.in/insat-3d", "covers_region", "Ocean"],
+        ["https://www.mosdac.gov.in/insat-3d", "has_keyword", "Ocean"],
+        ["https://www.mosdac.gov.in/insat-3d", "has_keyword", "Ocean data"],
+        ["https://www.mosdac.gov.in/insat-3d", "updated_every", "30 minutes"],
+    ],
+}
+
+
+def consolidated_kg():
+    node_map, aliases, stats = build_consolidation_map(KG.items(), CANONICAL_ENTITIES)
+    kg = {}
+    for doc_id, triples in KG.items():
+        new_doc_id, new_triples = consolidate_triples(doc_id, triples, node_map)
+        kg.setdefault(new_doc_id, set()).update(new_triples)
+    return kg, aliases, stats
+
+
+def test_entity_positions_are_merged():
+    kg, aliases, _ = consolidated_kg()
+    home = kg["https://www.mosdac.gov.in/"]
+    assert ("https://www.mosdac.gov.in/", "mentions", "INSAT-3D") in home
+    assert ("INSAT-3D", "provides", "Rainfall") in kg["https://www.mosdac.gov.in/insat-3d"]
+    assert aliases["insat 3d data"] == "INSAT-3D"
+
+
+def test_literal_values_are_kept_verbatim():
+    kg, aliases, _ = consolidated_kg()
+    home = kg["https://www.mosdac.gov.in/"]
+    page = kg["https://www.mosdac.gov.in/insat-3d"]
+    assert ("https://www.mosdac.gov.in/", "has_keyword", "Ocean data") in home
+    assert ("https://www.mosdac.gov.in/", "has_keyword", "insat 3d") in home
+    assert {("https://www.mosdac.gov.in/insat-3d", "has_keyword", "Ocean"),
+            ("https://www.mosdac.gov.in/insat-3d", "has_keyword", "Ocean data"),
+            ("https://www.mosdac.gov.in/insat-3d", "updated_every", "30 minutes")} <= page
+    assert "ocean data" not in aliases
+
+
+def test_relative_links_are_only_rewritten_when_merged():
+    kg, _, stats = consolidated_kg()
+    links = {o for s, p, o in kg["https://www.mosdac.gov.in/"] if p == "links_to"}
+    # "/insat-3d" and "http://mosdac.gov.in/insat-3d/" are the KG page; "/contact-us" matches nothing
+    assert links == {"https://www.mosdac.gov.in/insat-3d", "/contact-us"}
+    assert stats["merged_forms"] == 3 # "insat-3d", "INSAT 3D data" and "http://mosdac.gov.in/insat-3d/"
@@ -0,0 +1,43 @@
+import json
+
+import kg_store
+from kg_store import ALIASES_FILE, KGShardWriter, kg_fingerprint, load_kg, read_manifest
+
+
+def write_shards(kg_dir, records, aliases):
+    writer = KGShardWriter(str(kg_dir), shard_max_records=2)
+    for doc_id, triples in records:
+        writer.write(doc_id, triples)
+    return writer.close(extra_files={ALIASES_FILE: aliases})
+
+
+def test_repeated_records_are_merged_without_duplicates(tmp_path):
+    records = [("doc", [["a", "p", "b"]]), ("other", [["x", "p", "y"]])]
+    records += [("doc", [["a", "p", "b"], ["a", "p", f"c{i}"], ["a", "p", f"c{i // 2}"]]) for i in range(50)]
+    records.append(("other", [["x", "p", "y"], ["x", "p", "z"]]))
+    write_shards(tmp_path / "kg", records, {})
+
+    kg = load_kg(str(tmp_path / "kg"))
+    assert kg["doc"] == [["a", "p", "b"]] + [["a", "p", f"c{i}"] for i in range(50)]
+    assert kg["other"] == [["x", "p", "y"], ["x", "p", "z"]]
+
+
+def test_alias_table_changes_the_fingerprint(tmp_path):
+    records = [("doc", [["a", "p", "b"]])]
+    manifest = write_shards(tmp_path / "kg", records, {"a form": "A"})
+    aliases_bytes = (tmp_path / "kg" / ALIASES_FILE).read_bytes()
+    assert manifest["extra_files"] == [{"file": ALIASES_FILE, "md5": kg_store.hashlib.md5(aliases_bytes).hexdigest()}]
+    assert read_manifest(str(tmp_path / "kg")) == manifest
+    fingerprint = kg_fingerprint(str(tmp_path / "kg"))
+
+    write_shards(tmp_path / "kg", records, {"a form": "A", "another form": "A"})
+    assert kg_fingerprint(str(tmp_path / "kg")) != fingerprint
+
+    # A legacy JSON KG is fingerprinted together with the alias table next to it
+    kg_file = tmp_path / "kg.json"
+    kg_file.write_text(json.dumps(dict(records)), encoding="utf-8")
+    without_aliases = kg_fingerprint(str(kg_file))
+    (tmp_path / "kg.aliases.json").write_text(json.dumps({"a form": "A"}), encoding="utf-8")
+    with_aliases = kg_fingerprint(str(kg_file))
+    (tmp_path / "kg.aliases.json").write_text(json.dumps({"b form": "A"}), encoding="utf-8")
+    assert len({without_aliases, with_aliases, kg_fingerprint(str(kg_file))}) == 3
@@ -0,0 +1,28 @@
+LONG_URL = "https://www.mosdac.gov.in/catalog/satellite.php?product=3RIMG_L2B_SST&satellite=INSAT-3D"
+
+
+def _alias_lines(facts):
+    return [line for line in facts.splitlines() if line.startswith("E") and " = " in line]
+
+
+def test_subject_only_value_is_not_aliased(chatbot):
+    # The URL is printed once, as the subject of one line, however many triples it has
+    triples = [(LONG_URL, "provides", "Sea Surface Temperature"), (LONG_URL, "available_in", "HDF5"), (LONG_URL, "updated_every", "30 minutes")]
+    facts = chatbot._serialize_facts(triples)
+    assert _alias_lines(facts) == []
+    assert facts.count(LONG_URL) == 1
+
+
+def test_repeated_object_is_aliased_when_it_saves_characters(chatbot):
+    triples = [(f"Page {i}", "links_to", LONG_URL) for i in range(5)]
+    facts = chatbot._serialize_facts(triples)
+    assert _alias_lines(facts) == [f"E1 = {LONG_URL}"]
+    assert facts.count(LONG_URL) == 1
+
+
+def test_alias_never_makes_the_block_longer(chatbot):
+    value = "x" * 40 # Long enough for ALIAS_MIN_LENGTH, but used only twice
+    triples = [("A", "provides", value), ("B", "provides", value)]
+    facts = chatbot._serialize_facts(triples)
+    unaliased = "Facts (subject | predicate: object; object | ...):\n" + f"A | provides: {value}\nB | provides: {value}"
+    assert len(facts) <= len(unaliased)
@@ -0,0 +1,155 @@
+import re
+
+import pytest
+
+import kg_extractor
+from conftest import fixture_texts
+from kg_extractor import CANONICAL_ENTITIES, RELATIONSHIP_KEYWORDS, RELATIONSHIP_RULES
+
+
+def linear_sentence_relationships(sent, sentence_entities, extracted_triples):
+    """
+    The rule scan _extract_sentence_relationships replaced, kept as the reference: every RELATIONSHIP_RULES
+    entry is tried for every entity pair, appending to the extracted_triples list.
+    """
+    for i, ent1_data in enumerate(sentence_entities):
+        for j, ent2_data in enumerate(sentence_entities):
+            if i == j:
+                continue
+
+            ent1_text = ent1_data["text"]
+            ent1_type = ent1_data["type"]
+            ent2_text = ent2_data["text"]
+            ent2_type = ent2_data["type"]
+
+            ent1_token_obj = None
+            for token in sent:
+                if token.idx == ent1_data["span"][0]:
+                    ent1_token_obj = token
+                    break
+            ent2_token_obj = None
+            for token in sent:
+                if token.idx == ent2_data["span"][0]:
+                    ent2_token_obj = token
+                    break
+
+            if not ent1_token_obj or not ent2_token_obj:
+                continue
+
+            for rule_e1_type, verb_lemma, rule_e2_type, rel_name in RELATIONSHIP_RULES:
+                if (ent1_type == rule_e1_type) and (ent2_type == rule_e2_type):
+
+                    if ent1_token_obj.dep_ == "nsubj" and ent1_token_obj.head.lemma_ == verb_lemma:
+                        for child in ent1_token_obj.head.children:
+                            if child in sent and child.idx >= ent2_data["span"][0] and (child.idx + len(child.text)) <= ent2_data["span"][1] and \
+                               (child.dep_ == "dobj" or child.dep_ == "attr" or child.dep_ == "pobj"):
+                                extracted_triples.append((ent1_text, rel_name, ent2_text))
+                                break
+
+                    elif ent2_token_obj.dep_ == "nsubjpass" and ent2_token_obj.head.lemma_ == verb_lemma:
+                         for child in ent2_token_obj.head.children:
+                             if child.dep_ == "agent":
+                                 for grand_child in child.children:
+                                     if grand_child in sent and grand_child.idx >= ent1_data["span"][0] and (grand_child.idx + len(grand_child.text)) <= ent1_data["span"][1]:
+                                        extracted_triples.append((ent1_text, rel_name, ent2_text))
+                                        break
+                             if child.dep_ == "prep" and child.lemma_ == "by":
+                                 for grand_child in child.children:
+                                     if grand_child in sent and grand_child.idx >= ent1_data["span"][0] and (grand_child.idx + len(grand_child.text)) <= ent1_data["span"][1]:
+                                        extracted_triples.append((ent1_text, rel_name, ent2_text))
+                                        break
+
+                    if rel_name == "covers_region" and verb_lemma == "cover" and ent1_token_obj.head.lemma_ == "be":
+                        span_between_lower = sent.text[ent1_data["span"][1]-sent.start_char : ent2_data["span"][0]-sent.start_char].lower()
+                        if re.search(r'\b(over)\b', span_between_lower):
+                            extracted_triples.append((ent1_text, rel_name, ent2_text))
+
+                    if rel_name in RELATIONSHIP_KEYWORDS:
+                        for kw_pattern in RELATIONSHIP_KEYWORDS[rel_name]:
+                            if re.search(kw_pattern, sent.text.lower()):
+                                if ent1_text.lower() in sent.text.lower() and ent2_text.lower() in sent.text.lower():
+                                    if (ent1_text, rel_name, ent2_text) not in extracted_triples:
+                                        if kw_pattern == r"using" and rel_name == "is_derived_from":
+                                            if ent1_type == "Product" and (ent2_type == "Satellite" or ent2_type == "Instrument"):
+                                                prod_idx = sent.text.lower().find(ent1_text.lower())
+                                                inst_idx = sent.text.lower().find(ent2_text.lower())
+                                                if prod_idx != -1 and inst_idx != -1 and prod_idx < inst_idx:
+                                                    if re.search(r'\busing\b', sent.text.lower()[prod_idx:inst_idx]):
+                                                        extracted_triples.append((ent1_text, rel_name, ent2_text))
+                                        elif rel_name == "provides_format":
+                                            if ent1_type == "Service" and ent2_type == "DataType/Format":
+                                                if ent1_text.lower() == "online download" and kw_pattern in sent.text.lower():
+                                                    extracted_triples.append((ent1_text, rel_name, ent2_text))
+                                        else:
+                                            extracted_triples.append((ent1_text, rel_name, ent2_text))
+
+
+def rule_sentences(doc):
+    """
+    (sentence, sentence_entities) pairs of a Doc with at least two entities, built as in extract_content_triples_from_doc.
+    """
+    entities = kg_extractor.resolve_entity_overlaps(kg_extractor.collect_candidate_entities(doc))
+    token_to_entity_map = kg_extractor.map_entity_tokens(doc, entities)
+    for sent in doc.sents:
+        sentence_entities = []
+        added_sent_entities_texts = set()
+        for token in sent:
+            ent_data = token_to_entity_map.get(token.i)
+            if ent_data and ent_data["text"] not in added_sent_entities_texts:
+                sentence_entities.append(ent_data)
+                added_sent_entities_texts.add(ent_data["text"])
+        sentence_entities.sort(key=lambda x: x["span"][0])
+        if len(sentence_entities) > 1:
+            yield sent, sentence_entities
+
+
+def keyword_table_texts():
+    """
+    Sentences pairing entities of the types of every RELATIONSHIP_RULES entry through its verb and through
+    every keyword of its relationship, so both the dependency patterns and the keyword table fire.
+    """
+    entities_by_type = {}
+    # Single-word entities first: the dependency patterns look at the first token of an entity
+    for info in sorted(CANONICAL_ENTITIES.values(), key=lambda info: len(info["text"].split())):
+        entities_by_type.setdefault(info["type"], []).append(info["text"])
+    texts = []
+    for e1_type, verb_lemma, e2_type, rel_name in RELATIONSHIP_RULES:
+        for e1 in entities_by_type.get(e1_type, [])[:2]:
+            for e2 in entities_by_type.get(e2_type, [])[:2]:
+                texts.append(f"{e1} {verb_lemma}s {e2}. {e2} is {verb_lemma}d by {e1}. {e1} is available over {e2}.")
+                texts.extend(f"The {e1} {kw} the {e2} products." for kw in RELATIONSHIP_KEYWORDS.get(rel_name, []))
+                texts.append(f"{e2} derived using {e1}, online download in text and png formats of {e2}.")
+    return texts
+
+
+@pytest.fixture(scope="module")
+def rule_docs():
+    return list(kg_extractor.nlp.pipe(fixture_texts() + keyword_table_texts()))
+
+
+def test_compiled_rules_match_the_linear_scan_in_order(rule_docs):
+    sentence_count = 0
+    for doc in rule_docs:
+        reference = []
+        compiled = {}
+        for sent, sentence_entities in rule_sentences(doc):
+            linear_sentence_relationships(sent, sentence_entities, reference)
+            kg_extractor._extract_sentence_relationships(sent, sentence_entities, compiled)
+            sentence_count += 1
+        assert list(compiled) == list(dict.fromkeys(reference)), doc.text
+    assert sentence_count > 500
+
+
+def test_extraction_returns_triples_in_rule_order(rule_docs):
+    found_relations = set()
+    for doc in rule_docs:
+        reference = []
+        for sent, sentence_entities in rule_sentences(doc):
+            linear_sentence_relationships(sent, sentence_entities, reference)
+        triples, _ = kg_extractor.extract_content_triples_from_doc(doc)
+        assert triples == list(dict.fromkeys(reference))
+        found_relations.update(rel_name for _, rel_name, _ in triples)
+    # Every relationship of the rule table whose entity types occur in CANONICAL_ENTITIES is exercised
+    entity_types = {info["type"] for info in CANONICAL_ENTITIES.values()}
+    assert found_relations >= {rel_name for e1_type, _, e2_type, rel_name in RELATIONSHIP_RULES
+                               if e1_type in entity_types and e2_type in entity_types}
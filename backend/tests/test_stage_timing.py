@@ -0,0 +1,54 @@
+import pytest
+
+import kg_extractor
+from conftest import fixture_texts
+
+
+def extract_all(texts, long_text):
+    batch = kg_extractor.extract_content_triples_batch([(text, None) for text in texts])
+    single = [kg_extractor.extract_content_triples(text) for text in texts[:50]]
+    return batch, single, kg_extractor.extract_content_triples(long_text)
+
+
+def test_stage_timing_does_not_change_results(monkeypatch):
+    texts = list(fixture_texts())
+    long_text = " ".join(texts * 20)
+    untimed = extract_all(texts, long_text)
+    kg_extractor.reset_stage_timings()
+    monkeypatch.setattr(kg_extractor, "TIME_STAGES", True)
+    try:
+        timed = extract_all(texts, long_text)
+    finally:
+        timings = dict(kg_extractor.STAGE_TIMINGS)
+        kg_extractor.reset_stage_timings()
+    assert timed == untimed
+    assert set(timings) <= set(kg_extractor.STAGE_NAMES)
+    assert timings["spacy_pipeline"] > 0
+
+
+@pytest.mark.skipif("ner" not in kg_extractor.nlp.pipe_names, reason="needs a pipeline with a ner component")
+def test_ner_component_is_timed_separately_with_identical_results(monkeypatch):
+    texts = list(fixture_texts())
+    long_text = " ".join(texts * 20)
+    assert len(long_text) > kg_extractor.MAX_CHUNK_CHARS
+    untimed = extract_all(texts, long_text)
+
+    kg_extractor.reset_stage_timings()
+    monkeypatch.setattr(kg_extractor, "TIME_STAGES", True)
+    ner = kg_extractor.nlp.get_pipe("ner")
+    ner_calls = []
+    def recording_ner(doc):
+        # Only the pipeline (with ner disabled) runs inside "spacy_pipeline" while timing
+        assert not doc.ents
+        ner_calls.append(len(doc))
+        return ner(doc)
+    monkeypatch.setattr(kg_extractor, "_separately_timed_ner", lambda: recording_ner)
+    try:
+        timed = extract_all(texts, long_text)
+    finally:
+        timings = dict(kg_extractor.STAGE_TIMINGS)
+        kg_extractor.reset_stage_timings()
+
+    assert timed == untimed
+    assert len(ner_calls) > len(texts) + 50
+    assert timings["ner"] > 0 and timings["spacy_pipeline"] > 0
@@ -0,0 +1,42 @@
+import pytest
+
+
+@pytest.mark.parametrize("query, predicates", [
+    ("What formats is INSAT-3D distributed in?", ["available_in"]),
+    ("How often is INSAT-3D updated?", ["updated_every", "has_update_frequency"]),
+    ("What does MOSDAC provide?", ["provides"]),
+    ("Which tables does the INSAT-3D page have?", ["has_table"]),
+    # "and" inside an entity name is not a second clause
+    ("What does the Meteorological and Oceanographic Satellite Data Archival Centre provide?", ["provides"]),
+])
+def test_single_predicate_queries_use_a_template(chatbot, query, predicates):
+    entities = chatbot._extract_query_entities(query)
+    assert chatbot._match_template_intent(query, entities) == predicates
+
+
+@pytest.mark.parametrize("query", [
+    # Two intents
+    "What data does INSAT-3D provide and in what format?",
+    "Which formats does MOSDAC provide?",
+    "Which tables link to INSAT-3D?",
+    "How often is INSAT-3D updated and which formats is it distributed in?",
+    # One intent plus another clause or question
+    "What does MOSDAC provide, and who operates it?",
+    "What does MOSDAC provide? Who operates it?",
+    "What does INSAT-3D provide and when was it launched?",
+    "What does INSAT-3D provide or measure?",
+    "What does INSAT-3D provide as well as carry?",
+    # No intent
+    "Tell me about INSAT-3D",
+])
+def test_mixed_queries_fall_back_to_the_llm(chatbot, query):
+    entities = chatbot._extract_query_entities(query)
+    assert chatbot._match_template_intent(query, entities) is None
+    assert chatbot._render_template_answer(query, entities, chatbot._find_relevant_triples(entities)) is None
+
+
+def test_template_answer_lists_every_value(chatbot):
+    query = "What formats is INSAT-3DR distributed in?"
+    entities = chatbot._extract_query_entities(query)
+    answer = chatbot._render_template_answer(query, entities, chatbot._find_relevant_triples(entities))
+    assert answer == "INSAT-3DR is available in GeoTIFF and HDF5."